@@ -0,0 +1,156 @@
+"""
+Solves a lot of board.txt files at once, without the game window, for checking big sets of boards.
+
+    python batchsolve.py boards/ more/*.txt -o solved.jsonl -j 8
+
+Every argument is a board file, a folder (every .txt file in it and the folders under it), or a glob. The boards are
+split between worker processes, and each one gets a line in the output as soon as it's solved, so a long run that
+stops part way still keeps what it did.
+
+Each output line is a JSON object:
+    - path, width, height
+    - solved: 1 if a solution was found, and solution: its rows of slants (top to bottom, "1"/"2" per cell)
+    - unique: 1 if it's the only solution, 0 if there's another one (only with --unique)
+    - nodes, backtracks, gaveup: the search counts from solver.py (or conflicts from satsolver.py with --sat)
+    - seconds: time spent on the board, not counting reading it
+    - error: what went wrong, if the file couldn't be read or solved
+
+A few things:
+    - slants: 1 = slant top left to bottom right, 2 = slant top right to bottom left, 0 = not filled in
+    - the boards are solved in any order, so the lines are in the order they finished
+"""
+
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from boardstate import readboard
+import satsolver
+import solver
+
+
+# Returns every board file the arguments name, in order, each one once
+def boardpaths(args):
+    paths = []
+    for arg in args:
+        if os.path.isdir(arg):
+            found = []
+            for folder, subfolders, files in os.walk(arg):
+                for name in files:
+                    if name.endswith(".txt"):
+                        found.append(os.path.join(folder, name))
+            paths += sorted(found)
+        elif os.path.isfile(arg):
+            paths.append(arg)
+        else:
+            paths += sorted(glob.glob(arg))
+    seen = set()
+    unique = []
+    for path in paths:
+        if path not in seen:
+            seen.add(path)
+            unique.append(path)
+    return unique
+
+
+# Returns the slants as rows of digits, top to bottom
+def slantrows(width, height, slants):
+    rows = []
+    for y in range(0, height):
+        rows.append("".join(str(slant) for slant in slants[y * width:(y + 1) * width]))
+    return rows
+
+
+# Solves one board file. Returns its output line as a dict
+# job = [path, guess limit (0 = no limit), 1 to check for a second solution, 1 to use the SAT solver]
+def solvefile(job):
+    path, maxnodes, unique, sat = job
+    result = {"path": path}
+    try:
+        state = readboard(path)
+        result["width"] = state.bs_width
+        result["height"] = state.bs_height
+        start = time.perf_counter()
+        if sat:
+            slants, cdcl = satsolver.solve(state, maxnodes)
+            result["seconds"] = time.perf_counter() - start
+            result["solved"] = int(slants is not None)
+            result["conflicts"] = cdcl.cd_conflicts
+            result["decisions"] = cdcl.cd_decisions
+        else:
+            ai = solver.solve(state, maxnodes, 2 if unique else 1)
+            result["seconds"] = time.perf_counter() - start
+            result["solved"] = int(len(ai.s_solutions) > 0)
+            if ai.s_solutions:
+                slants = ai.s_solutions[0]
+            if unique and not ai.s_gaveUp:
+                result["unique"] = int(len(ai.s_solutions) == 1)
+            result["nodes"] = ai.s_nodes
+            result["backtracks"] = ai.s_backtracks
+            result["gaveup"] = ai.s_gaveUp
+        if result["solved"]:
+            result["solution"] = slantrows(state.bs_width, state.bs_height, slants)
+    except Exception as error:
+        result["error"] = type(error).__name__ + ": " + str(error)
+    return result
+
+
+# Solves every board file and writes a line for each one to the output (a path, or "-" for stdout)
+# Returns [boards solved, boards looked at]
+def solvefiles(paths, outpath, workers=0, maxnodes=0, unique=0, sat=0):
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    jobs = [[path, maxnodes, unique, sat] for path in paths]
+
+    if outpath == "-":
+        out = sys.stdout
+    else:
+        out = open(outpath, "w")
+    solved = 0
+    try:
+        if workers == 1:
+            results = map(solvefile, jobs)
+            pool = None
+        else:
+            pool = multiprocessing.Pool(workers)
+            # Small boards go by quickly, so hand them out a few at a time
+            results = pool.imap_unordered(solvefile, jobs, max(1, min(16, len(jobs) // (workers * 8))))
+        for result in results:
+            solved += result.get("solved", 0)
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+        if pool is not None:
+            pool.close()
+            pool.join()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return [solved, len(jobs)]
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Solve board.txt files without the game window.")
+    parser.add_argument("boards", nargs="+", help="board files, folders of them, or globs")
+    parser.add_argument("-o", "--out", default="-", help="JSONL file to write (default: stdout)")
+    parser.add_argument("-j", "--workers", type=int, default=0, help="worker processes (default: one per core)")
+    parser.add_argument("--maxnodes", type=int, default=0,
+                        help="give up on a board after this many guesses (or conflicts with --sat)")
+    parser.add_argument("--unique", action="store_true",
+                        help="check that each board has only one solution (rule solver only)")
+    parser.add_argument("--sat", action="store_true", help="use the SAT solver instead of the rule solver")
+    args = parser.parse_args(argv)
+
+    paths = boardpaths(args.boards)
+    start = time.perf_counter()
+    solved, total = solvefiles(paths, args.out, args.workers, args.maxnodes, int(args.unique), int(args.sat))
+    print(str(solved) + " of " + str(total) + " boards solved in " +
+          str(round(time.perf_counter() - start, 2)) + " s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
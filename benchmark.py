@@ -0,0 +1,280 @@
+"""
+Benchmarks for the parts of Slants that run the most, on fixed boards from 4x4 up to 40x40 (g_boardSize_max).
+
+    python benchmark.py [-o benchresults.jsonl] [--sizes 4 10 20 40] [--only solve generate] [--mintime 0.5]
+
+Each benchmark is run over and over for at least mintime seconds, and reports operations per second. It's then run
+once more under tracemalloc for its peak memory, so the timing isn't slowed down by it. Every run is added to the
+results file as one JSON line, and the table shows how much faster or slower each one is than the last run there. The
+results file is benchresults.jsonl by default, which .gitignore leaves out, since it's for this machine only.
+
+The benchmarks:
+    - loopcheck: what Engine.loopcheck() does, setting every cell to its slant and then clearing them (per slant)
+    - cluecheck: what Engine.solvednumbertest() does, for every cell (per cell)
+    - wincheck: Engine.iswon() on a solved board (per check)
+    - bitcheck: checking a whole solved board from scratch with bitboard.py: numbers, filled in, and loops (per board)
+    - solve / satsolve: solving a medium board with solver.py / satsolver.py (per board)
+    - generate: making a medium board with generator.py (per board)
+    - drawgame: a click on the board and the drawgame() frame after it, drawn to a Surface instead of the window (per
+      click, needs pygame). Only the cells and numbers the click changed get drawn again
+    - drawfull: a drawgame() frame that draws the whole game screen, like the first one after a menu closes (per frame,
+      needs pygame)
+    - drawmenu: a drawgame() frame with the game menu open (per frame, needs pygame)
+
+A few things:
+    - the boards are made by generator.py from fixed seeds, so every run uses the same ones
+    - drawgame, drawfull and drawmenu are skipped (and say so) if pygame can't be imported or game.py can't start,
+      e.g. without assets/
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from bitboard import fromstate
+from boardstate import BoardState
+from engine import Engine
+from loopcheck import LoopChecker
+import generator
+import satsolver
+import solver
+
+
+# Board sizes from the smallest to g_boardSize_max in game.py
+sizes = [4, 10, 20, 40]
+
+# Medium boards for each size, so they're only made once per run
+boardcache = {}
+
+
+# Returns [the medium board of that size with its numbers, its solution]
+def fixedboard(size):
+    if size not in boardcache:
+        boardcache[size] = generator.generate(size, size, 1, size)
+    return boardcache[size]
+
+
+# Each benchmark takes a size and returns [function to time, operations it does per call], or None if it can't run
+
+def loopcheckbench(size):
+    state, solution = fixedboard(size)
+    checker = LoopChecker(size, size)
+    cells = range(0, size * size)
+
+    def run():
+        for cell in cells:
+            checker.setslant(cell, solution[cell])
+        for cell in cells:
+            checker.setslant(cell, 0)
+    return [run, 2 * size * size]
+
+
+def cluecheckbench(size):
+    state, solution = fixedboard(size)
+    board = BoardState(size, size)
+    board.bs_clues = state.bs_clues
+    board.bs_cluePoints = state.bs_cluePoints
+    board.bs_slants[:] = solution
+    board.recount()
+    cells = range(0, size * size)
+
+    def run():
+        for cell in cells:
+            board.updatestatus(cell)
+    return [run, size * size]
+
+
+def wincheckbench(size):
+    state, solution = fixedboard(size)
+    board = BoardState(size, size)
+    board.bs_clues = state.bs_clues
+    board.bs_cluePoints = state.bs_cluePoints
+    board.bs_slants[:] = solution
+    game = Engine(board)
+    return [game.iswon, 1]
+
+
+def bitcheckbench(size):
+    state, solution = fixedboard(size)
+    board = fromstate(state)
+    board.setslants(solution)
+    return [board.issolution, 1]
+
+
+def solvebench(size):
+    state = fixedboard(size)[0]
+    return [lambda: solver.solve(state), 1]
+
+
+def satsolvebench(size):
+    state = fixedboard(size)[0]
+    return [lambda: satsolver.solve(state), 1]
+
+
+def generatebench(size):
+    return [lambda: generator.generate(size, size, 1, size), 1]
+
+
+# Sets the game up with the board of that size half filled in, drawing to a Surface instead of the window
+# Returns the game module, or None if pygame can't be imported or the game can't start
+def gamesetup(size):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    try:
+        import pygame
+    except ImportError:
+        return None
+
+    # game.py opens the window and loads its fonts and pictures (assets/) when it's imported
+    try:
+        import game
+    except (OSError, pygame.error):
+        return None
+
+    state, solution = fixedboard(size)
+
+    # Set the game up the way restart() does, with this board instead of board.txt and no pool of new boards
+    game.boardpool = generator.BoardPool(0)
+    game.general = game.General()
+    game.board = game.Board()
+    game.startboard = state
+    game.boardbuilder()
+
+    # Half the board filled in, so every kind of cell and number gets drawn
+    for cell in range(0, size * size, 2):
+        game.general.g_engine.setslant(cell, solution[cell])
+    game.win = pygame.Surface([game.general.g_width, game.general.g_height])
+    return game
+
+
+def drawgamebench(size):
+    game = gamesetup(size)
+    if game is None:
+        return None
+    slants = game.general.g_state.bs_slants
+    clicks = [0]
+
+    # One click's worth: the next cell cycles to its next slant, and the frame after it is drawn
+    def run():
+        cell = clicks[0] % len(slants)
+        clicks[0] += 1
+        game.general.g_engine.turn(cell, "left")
+        game.drawgame("30", "none")
+    return [run, 1]
+
+
+def drawfullbench(size):
+    game = gamesetup(size)
+    if game is None:
+        return None
+
+    def run():
+        game.board.b_drawnMenu = "menu"
+        game.drawgame("30", "none")
+    return [run, 1]
+
+
+def drawmenubench(size):
+    game = gamesetup(size)
+    if game is None:
+        return None
+    return [lambda: game.drawgame("30", "menu"), 1]
+
+
+benchmarks = [["loopcheck", loopcheckbench],
+              ["cluecheck", cluecheckbench],
+              ["wincheck", wincheckbench],
+              ["bitcheck", bitcheckbench],
+              ["solve", solvebench],
+              ["satsolve", satsolvebench],
+              ["generate", generatebench],
+              ["drawgame", drawgamebench],
+              ["drawfull", drawfullbench],
+              ["drawmenu", drawmenubench]]
+
+
+# Times the function. Returns [operations per second, calls made]
+def timeit(func, ops, mintime):
+    func()
+    calls = 0
+    start = time.perf_counter()
+    elapsed = 0
+    while elapsed < mintime:
+        func()
+        calls += 1
+        elapsed = time.perf_counter() - start
+    return [(calls * ops) / elapsed, calls]
+
+
+# Returns the most memory (in KB) the function had allocated at once during one call
+def peakmemory(func):
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+# Returns the results of the last run in the results file, by (name, size)
+def lastrun(path):
+    last = {}
+    if os.path.exists(path):
+        resultsfile = open(path, "r")
+        lines = resultsfile.readlines()
+        resultsfile.close()
+        if lines:
+            for result in json.loads(lines[-1])["results"]:
+                last[(result["name"], result["size"])] = result
+    return last
+
+
+# Runs the benchmarks and adds the run to the results file
+# Returns the results, each as {"name", "size", "opsPerSec", "peakKB", "calls"}
+def runbenchmarks(outpath, runsizes, only=None, mintime=0.5, out=sys.stdout):
+    last = lastrun(outpath)
+    results = []
+    out.write("{:<10} {:>5} {:>14} {:>10} {:>10}\n".format("benchmark", "size", "ops/s", "peak KB", "vs last"))
+    for name, bench in benchmarks:
+        if only and name not in only:
+            continue
+        for size in runsizes:
+            setup = bench(size)
+            if setup is None:
+                out.write("{:<10} {:>5} {:>14}\n".format(name, size, "skipped"))
+                continue
+            func, ops = setup
+            opspersec, calls = timeit(func, ops, mintime)
+            peak = peakmemory(func)
+            result = {"name": name, "size": size, "opsPerSec": opspersec, "peakKB": peak, "calls": calls}
+            results.append(result)
+
+            change = ""
+            if (name, size) in last:
+                change = "{:+.1%}".format((opspersec / last[(name, size)]["opsPerSec"]) - 1)
+            line = "{:<10} {:>5} {:>14.1f} {:>10.1f} {:>10}".format(name, size, opspersec, peak, change)
+            out.write(line.rstrip() + "\n")
+
+    run = {"time": time.strftime("%Y-%m-%d %H:%M:%S"), "python": platform.python_version(),
+           "machine": platform.machine(), "results": results}
+    resultsfile = open(outpath, "a")
+    resultsfile.write(json.dumps(run) + "\n")
+    resultsfile.close()
+    return results
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Benchmark the hot paths of Slants.")
+    parser.add_argument("-o", "--out", default="benchresults.jsonl", help="results file to add this run to")
+    parser.add_argument("--sizes", type=int, nargs="+", default=sizes, help="board sizes (width = height)")
+    parser.add_argument("--only", nargs="+", help="benchmarks to run (default: all)")
+    parser.add_argument("--mintime", type=float, default=0.5, help="seconds to run each benchmark for")
+    args = parser.parse_args(argv)
+    runbenchmarks(args.out, args.sizes, args.only, args.mintime)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
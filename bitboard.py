@@ -0,0 +1,229 @@
+"""
+A board of Slants held as bitmasks, for checking whole boards at a time with a few integer operations per row
+instead of a few per cell.
+
+A few things:
+    - each row of cells is two Python ints: bt_down has bit x set where cell x has slant 1, bt_up where it has slant 2
+    - the numbers are one int per row of lattice points for each value: bt_clues[value][y] has bit x set where the
+      point at x, y has that number
+    - the slants touching the points of a row of lattice points come from the cell rows above and below it, each
+      shifted onto the corners it touches, and are added up 4 bits at a time into 3 ints of count bits (see
+      countbits()), so every point in the row is counted at once
+    - loops are found by filling out from the edge of the board along the gaps between slants: a slant cuts its cell
+      in two, and a loop shuts in the cell sides inside it, so with no loops every cell side can be reached from the
+      edge (see loopfree(), which joins the rows into one int for it)
+    - the methods are named the same as BoardState's where they do the same thing, so the two can be swapped for
+      those
+    - cells, lattice points, and slants are numbered the same way as in boardstate.py
+"""
+
+
+# Every byte with each of its bits moved to the bottom of a byte of its own, for turning count bits into counts
+spreadtable = [sum(((byte >> bit) & 1) << (bit * 8) for bit in range(0, 8)) for byte in range(0, 256)]
+
+# Slants to the digits of each row's bitmasks: "1" where the cell has that slant, "0" where it doesn't
+downdigits = bytes.maketrans(b"\x00\x01\x02", b"010")
+updigits = bytes.maketrans(b"\x00\x01\x02", b"001")
+
+
+# Adds up four rows of bits, point by point. Returns the sums as [1s bits, 2s bits, 4s bits]
+def countbits(a, b, c, d):
+    ab = a ^ b
+    abcarry = a & b
+    cd = c ^ d
+    cdcarry = c & d
+    carry = ab & cd
+    return [ab ^ cd, abcarry ^ cdcarry ^ carry, (abcarry & cdcarry) | (carry & (abcarry | cdcarry))]
+
+
+# Returns the bits where the sums from countbits() equal the value
+def countis(bits, value, mask):
+    for place in range(0, 3):
+        if (value >> place) & 1:
+            mask &= bits[place]
+        else:
+            mask &= ~bits[place]
+    return mask
+
+
+# Returns a row of bits as one byte per bit, for length bits
+def spreadbits(bits, length):
+    spread = 0
+    for chunk in range(0, (length + 7) // 8):
+        spread |= spreadtable[(bits >> (chunk * 8)) & 255] << (chunk * 64)
+    return spread
+
+
+# Holds a board's slants and numbers as bitmasks
+class BitBoard:
+    def __init__(self, width, height):
+        self.bt_width = width
+        self.bt_height = height
+        self.bt_rowMask = (1 << width) - 1
+        self.bt_pointMask = (1 << (width + 1)) - 1
+
+        self.bt_down = [0] * height
+        self.bt_up = [0] * height
+        self.bt_clues = [[0] * (height + 1) for value in range(0, 5)]
+
+    # Sets the numbers from a BoardState's bs_clues (-1 for no number, in lattice point order)
+    def setclues(self, clues):
+        pw = self.bt_width + 1
+        self.bt_clues = [[0] * (self.bt_height + 1) for value in range(0, 5)]
+        for point in range(0, len(clues)):
+            if clues[point] != -1:
+                self.bt_clues[clues[point]][point // pw] |= 1 << (point % pw)
+
+    # Sets every slant from a bytearray in cell order
+    # Each row is read as a binary number backwards, so cell x is bit x
+    def setslants(self, slants):
+        width = self.bt_width
+        for y in range(0, self.bt_height):
+            row = bytes(slants[y * width:(y + 1) * width])[::-1]
+            self.bt_down[y] = int(row.translate(downdigits), 2)
+            self.bt_up[y] = int(row.translate(updigits), 2)
+
+    # Puts a slant (or 0 to clear it) in a cell
+    def setslant(self, cell, slant):
+        y = cell // self.bt_width
+        bit = 1 << (cell % self.bt_width)
+        self.bt_down[y] &= ~bit
+        self.bt_up[y] &= ~bit
+        if slant == 1:
+            self.bt_down[y] |= bit
+        elif slant == 2:
+            self.bt_up[y] |= bit
+
+    # Returns the slants as a bytearray in cell order
+    def slants(self):
+        slants = bytearray()
+        for y in range(0, self.bt_height):
+            spread = spreadbits(self.bt_down[y], self.bt_width) + 2 * spreadbits(self.bt_up[y], self.bt_width)
+            slants += spread.to_bytes(((self.bt_width + 7) // 8) * 8, "little")[0:self.bt_width]
+        return slants
+
+    # Returns, for the lattice points in row y, the slants touching them as count bits (see countbits())
+    # Slant 1 touches the up left and down right corners of its cell, slant 2 the other two, so the cell row below
+    # touches point x with slant 1 in cell x and slant 2 in cell x - 1, and the row above the other way around
+    def touchbits(self, y):
+        a = b = c = d = 0
+        if y < self.bt_height:
+            a = self.bt_down[y]
+            b = self.bt_up[y] << 1
+        if y > 0:
+            c = self.bt_down[y - 1] << 1
+            d = self.bt_up[y - 1]
+        return countbits(a, b, c, d)
+
+    # Returns the bits of the lattice points in row y that have an empty cell around them
+    def emptybits(self, y):
+        empty = 0
+        if y < self.bt_height:
+            row = self.bt_rowMask & ~(self.bt_down[y] | self.bt_up[y])
+            empty |= row | (row << 1)
+        if y > 0:
+            row = self.bt_rowMask & ~(self.bt_down[y - 1] | self.bt_up[y - 1])
+            empty |= row | (row << 1)
+        return empty
+
+    # Returns how many slants touch every lattice point, as bytes in lattice point order
+    def touchcounts(self):
+        length = self.bt_width + 1
+        counts = bytearray()
+        for y in range(0, self.bt_height + 1):
+            bits = self.touchbits(y)
+            spread = spreadbits(bits[0], length) + 2 * spreadbits(bits[1], length) + 4 * spreadbits(bits[2], length)
+            counts += spread.to_bytes(((length + 7) // 8) * 8, "little")[0:length]
+        return bytes(counts)
+
+    # Returns how many slants touch the number at the point, how many don't, and how many cells around it are empty
+    def cluecounts(self, point):
+        pw = self.bt_width + 1
+        x = point % pw
+        y = point // pw
+        touching = 0
+        nottouching = 0
+        empty = 0
+        for cellx, celly, touch in ((x - 1, y - 1, 1), (x, y - 1, 2), (x - 1, y, 2), (x, y, 1)):
+            if 0 <= cellx < self.bt_width and 0 <= celly < self.bt_height:
+                slant = ((self.bt_down[celly] >> cellx) & 1) | (((self.bt_up[celly] >> cellx) & 1) << 1)
+                if slant == 0:
+                    empty += 1
+                elif slant == touch:
+                    touching += 1
+                else:
+                    nottouching += 1
+        return touching, nottouching, empty
+
+    # Returns 1 if every cell has a slant
+    def isfilled(self):
+        for y in range(0, self.bt_height):
+            if self.bt_down[y] | self.bt_up[y] != self.bt_rowMask:
+                return 0
+        return 1
+
+    # Returns 1 if every number is solved: no empty cells around it, and as many slants touching it as it says
+    def allsolved(self):
+        for y in range(0, self.bt_height + 1):
+            bits = self.touchbits(y)
+            empty = self.emptybits(y)
+            for value in range(0, 5):
+                clues = self.bt_clues[value][y]
+                if clues and clues & (empty | ~countis(bits, value, self.bt_pointMask)):
+                    return 0
+        return 1
+
+    # Returns every row of a list of row bits as one int, row y starting at bit y * (width + 1)
+    def joinrows(self, rows):
+        stride = self.bt_width + 1
+        joined = 0
+        for y in range(0, len(rows)):
+            joined |= rows[y] << (y * stride)
+        return joined
+
+    # Returns 1 if no slants make a loop
+    # The whole board is one int here, so every cell takes a step at once. The cell sides reached from the edge are
+    # kept as bits at the place of the cell they're the top / left side of: across for the tops (the bottom of a cell
+    # is the top of the one below it, width + 1 bits on), and sides for the left sides (the right side of a cell is the
+    # left side of the next one, 1 bit on). Inside a cell, slant 1 joins its top and right sides and its left and
+    # bottom ones, slant 2 its top and left and its right and bottom, and an empty cell joins all four
+    def loopfree(self):
+        stride = self.bt_width + 1
+        height = self.bt_height
+        down = self.joinrows(self.bt_down)
+        up = self.joinrows(self.bt_up)
+        cells = self.joinrows([self.bt_rowMask] * height)
+        empty = cells & ~(down | up)
+        allacross = self.joinrows([self.bt_rowMask] * (height + 1))
+        allsides = self.joinrows([self.bt_pointMask] * height)
+
+        across = self.bt_rowMask | (self.bt_rowMask << (height * stride))
+        sides = self.joinrows([1 | (1 << self.bt_width)] * height)
+        while True:
+            top = across & cells
+            bottom = (across >> stride) & cells
+            left = sides & cells
+            right = (sides >> 1) & cells
+            newtop = (right & down) | (left & up) | ((left | right | bottom) & empty)
+            newbottom = (left & down) | (right & up) | ((left | right | top) & empty)
+            newleft = (top & up) | (bottom & down) | ((top | right | bottom) & empty)
+            newright = (top & down) | (bottom & up) | ((top | left | bottom) & empty)
+            reached = across | newtop | (newbottom << stride)
+            reachedsides = sides | newleft | (newright << 1)
+            if reached == across and reachedsides == sides:
+                break
+            across = reached
+            sides = reachedsides
+        return int(across == allacross and sides == allsides)
+
+    # Returns 1 if the board is solved: every cell filled in, every number solved and no loops
+    def issolution(self):
+        return self.isfilled() and self.allsolved() and self.loopfree()
+
+
+# Returns a BitBoard with the numbers and slants of a BoardState
+def fromstate(state):
+    board = BitBoard(state.bs_width, state.bs_height)
+    board.setclues(state.bs_clues)
+    board.setslants(state.bs_slants)
+    return board
@@ -0,0 +1,191 @@
+"""
+A compact binary format for Slants boards, for keeping a lot of them in one file.
+
+    python boardpack.py boards/ more/*.txt -o boards.slants
+
+converts board.txt files (the same arguments as batchsolve.py) into one packed file.
+
+The file starts with the 8 byte header b"SLNT", then the format version (1) and 3 zero bytes. Each board after it is:
+    - 5 bytes: width, height, encoding, and the length of the numbers in bytes (little endian, 2 bytes)
+    - the numbers, one per lattice point in lattice point order (see boardstate.py), packed into 4 bit nibbles, the
+      high nibble of each byte first
+
+Encoding 0 (plain) has a nibble for every lattice point: 0 to 4 for a number, 15 for no number. Encoding 1 (run
+length) is the same, except 5 to 15 stand for a run of 1 to 11 lattice points with no number, which is most of them.
+packboard() uses whichever is smaller. A 40x40 board is 841 bytes plain, and usually about half that run length
+encoded, against 1.8 KB as a board.txt.
+
+A few things:
+    - a board's numbers can be found without reading the rest of the file: boardoffsets() only reads the 5 byte
+      headers to step over them, and unpackboard() reads a board's numbers straight out of the mapped file
+    - a packed file with one board in it works anywhere a board.txt does (see boardstate.readboard())
+"""
+
+import argparse
+import binascii
+import mmap
+import struct
+import sys
+from array import array
+
+from batchsolve import boardpaths
+from boardstate import BoardState, PACKMAGIC, readboard
+
+fileheader = PACKMAGIC + bytes([1, 0, 0, 0])
+boardheader = struct.Struct("<BBBH")
+
+# Nibble for no number in the plain encoding, and the nibbles for runs of them in the run length encoding
+blank = 15
+runstart = 5
+longestrun = blank - runstart + 1
+
+# The plain encoding's nibbles as hex digits (see unpackboard()) to the numbers they are, with 255 (-1 as a signed
+# byte) for no number
+hextable = bytes.maketrans(b"0123456789abcdef", bytes([0, 1, 2, 3, 4] + [255] * 11))
+
+
+# Returns a list of nibbles as bytes, two to a byte
+def packnibbles(nibbles):
+    if len(nibbles) % 2:
+        nibbles = nibbles + [blank]
+    return bytes([(nibbles[i] << 4) | nibbles[i + 1] for i in range(0, len(nibbles), 2)])
+
+
+# Returns the board's numbers as the nibbles of each encoding: [plain, run length]
+def boardnibbles(state):
+    plain = []
+    rle = []
+    run = 0
+    for clue in state.bs_clues:
+        if clue == -1:
+            plain.append(blank)
+            run += 1
+            if run == longestrun:
+                rle.append(blank)
+                run = 0
+        else:
+            plain.append(clue)
+            if run:
+                rle.append(runstart + run - 1)
+                run = 0
+            rle.append(clue)
+    if run:
+        rle.append(runstart + run - 1)
+    return [plain, rle]
+
+
+# Returns the board packed as bytes. rle: 1 to run length encode it, 0 not to, None for whichever is smaller
+def packboard(state, rle=None):
+    plain, runs = boardnibbles(state)
+    if rle is None:
+        rle = len(runs) < len(plain)
+    if rle:
+        numbers = packnibbles(runs)
+    else:
+        numbers = packnibbles(plain)
+    return boardheader.pack(state.bs_width, state.bs_height, int(rle), len(numbers)) + numbers
+
+
+# Reads the board that starts at the offset in a buffer (bytes, or a mapped file). Returns [BoardState, where the
+# next board starts]
+# The numbers are read through a memoryview, so they aren't copied out of the buffer first
+def unpackboard(buffer, offset):
+    width, height, encoding, length = boardheader.unpack_from(buffer, offset)
+    start = offset + boardheader.size
+    state = BoardState(width, height)
+    points = len(state.bs_clues)
+
+    with memoryview(buffer) as view:
+        numbers = view[start:start + length]
+        if encoding == 0:
+            # hexlify() splits every byte into its two nibbles, high one first, as hex digits
+            clues = bytearray(binascii.hexlify(numbers).translate(hextable))
+            del clues[points:]
+        else:
+            clues = bytearray(b"\xff") * points
+            point = 0
+            for byte in numbers:
+                for nibble in [byte >> 4, byte & 15]:
+                    if point >= points:
+                        break
+                    if nibble < runstart:
+                        clues[point] = nibble
+                        point += 1
+                    else:
+                        point += nibble - runstart + 1
+        numbers.release()
+
+    state.bs_clues = array('b', clues)
+    state.bs_cluePoints = [point for point in range(0, points) if clues[point] != 255]
+    state.bs_unsolved = len(state.bs_cluePoints)
+    return [state, start + length]
+
+
+# Writes the boards to a packed file. Returns how many there were
+def saveboards(path, states, rle=None):
+    packfile = open(path, "wb")
+    packfile.write(fileheader)
+    count = 0
+    for state in states:
+        packfile.write(packboard(state, rle))
+        count += 1
+    packfile.close()
+    return count
+
+
+# Maps a packed file into memory. Returns the mapped file
+def openboards(path):
+    packfile = open(path, "rb")
+    try:
+        mapped = mmap.mmap(packfile.fileno(), 0, access=mmap.ACCESS_READ)
+    finally:
+        packfile.close()
+    if mapped[0:len(fileheader)] != fileheader:
+        mapped.close()
+        raise ValueError(path + " is not a packed board file")
+    return mapped
+
+
+# Returns where each board in a mapped packed file starts, without reading their numbers
+def boardoffsets(mapped):
+    offsets = []
+    offset = len(fileheader)
+    end = len(mapped)
+    while offset < end:
+        offsets.append(offset)
+        offset += boardheader.size + boardheader.unpack_from(mapped, offset)[3]
+    return offsets
+
+
+# Goes through the boards in a packed file one at a time, so a file of millions of them is never read in all at once
+def boards(path):
+    mapped = openboards(path)
+    try:
+        offset = len(fileheader)
+        end = len(mapped)
+        while offset < end:
+            state, offset = unpackboard(mapped, offset)
+            yield state
+    finally:
+        mapped.close()
+
+
+# Packs board.txt files into one packed file. Returns how many boards were packed
+def convert(paths, outpath, rle=None):
+    return saveboards(outpath, (readboard(path) for path in paths), rle)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Pack board.txt files into one packed board file.")
+    parser.add_argument("boards", nargs="+", help="board files, folders of them, or globs")
+    parser.add_argument("-o", "--out", required=True, help="packed file to write")
+    parser.add_argument("--plain", action="store_true", help="don't run length encode any of the boards")
+    args = parser.parse_args(argv)
+
+    count = convert(boardpaths(args.boards), args.out, 0 if args.plain else None)
+    print(str(count) + " boards packed into " + args.out, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
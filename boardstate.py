@@ -0,0 +1,243 @@
+"""
+Board state for Slants, held in flat buffers with integer indexing.
+
+A few things:
+    - cells and lattice points are numbered the same way as in loopcheck.py
+    - a cell in game coordinates (x, y, starting at 1) is stored at index (y - 1) * width + (x - 1)
+    - a lattice point (x, y, starting at 0, same as the lines) is stored at index y * (width + 1) + x
+    - the numbers in board.txt sit on the lattice points
+    - slants: 0 = no slant, 1 = slant top left to bottom right, 2 = slant top right to bottom left
+    - clues: -1 = no number, otherwise the number (0 to 4)
+    - status: 0 = neutral, 1 = solved, 2 = wrong (only means something where there's a number)
+    - updatestatus() keeps counts of the slants touching each point, the empty cells, and the unsolved numbers, from
+      the one cell that changed, so a number's status and whether the board is filled and solved never need a scan
+"""
+
+from array import array
+
+# Packed board files start with this (see boardpack.py)
+PACKMAGIC = b"SLNT"
+
+
+# Cell / lattice point tables for each board size, shared by everything that works on a board of that size
+geometrycache = {}
+
+
+# Returns the tables for a board size:
+#   cellpoints[cell] = (up left, up right, down left, down right) corners of the cell
+#   pointcells[point] = [(cell, slant in that cell that touches the point, corner across the cell), ...]
+# A slant that touches a point always joins it to the corner across the cell from it
+def geometry(width, height):
+    key = (width, height)
+    if key not in geometrycache:
+        pw = width + 1
+        cellpoints = []
+        pointcells = [[] for p in range(0, pw * (height + 1))]
+        for cell in range(0, width * height):
+            ul = cell + (cell // width)
+            ur = ul + 1
+            dl = ul + pw
+            dr = dl + 1
+            cellpoints.append((ul, ur, dl, dr))
+            pointcells[ul].append((cell, 1, dr))
+            pointcells[ur].append((cell, 2, dl))
+            pointcells[dl].append((cell, 2, ur))
+            pointcells[dr].append((cell, 1, ul))
+        geometrycache[key] = [cellpoints, pointcells]
+    return geometrycache[key]
+
+
+# Returns the status of a number from how many slants touch it, how many don't, and how many cells around it are empty
+# If any cells are empty:
+#   if the number of touching cells is greater than the number, wrong
+#   if the number of not touching cells is greater than 4 - the number, wrong
+#   otherwise neutral
+# If no cells are empty:
+#   if the number of touching cells is equal to the number, solved
+#   otherwise wrong
+def statusof(num, touching, nottouching, empty):
+    if empty:
+        if touching > num or nottouching > 4 - num:
+            return 2
+        return 0
+    if touching == num:
+        return 1
+    return 2
+
+
+# Holds the slants, the numbers, and the solve state of the numbers
+class BoardState:
+    def __init__(self, width, height):
+        self.bs_width = width
+        self.bs_height = height
+        self.bs_pointWidth = width + 1
+
+        self.bs_slants = bytearray(width * height)
+        self.bs_clues = array('b', [-1]) * ((width + 1) * (height + 1))
+        self.bs_status = bytearray((width + 1) * (height + 1))
+
+        # Points that have a number, so nothing has to scan for them
+        self.bs_cluePoints = []
+
+        self.bs_cellPoints, self.bs_pointCells = geometry(width, height)
+
+        # Counts kept by updatestatus(): the slants touching and not touching each point, the slant each cell had when
+        # it was counted, how many cells have no slant, and how many numbers aren't solved
+        self.bs_touching = bytearray((width + 1) * (height + 1))
+        self.bs_notTouching = bytearray((width + 1) * (height + 1))
+        self.bs_counted = bytearray(width * height)
+        self.bs_empty = width * height
+        self.bs_unsolved = 0
+
+    # Fills in the numbers from the rows of board.txt (with the "NN=" taken off), e.g. "x11xx1xxxxx"
+    def setclues(self, rows):
+        self.bs_cluePoints = []
+        for y in range(0, len(rows)):
+            row = rows[y]
+            for x in range(0, len(row)):
+                point = (y * self.bs_pointWidth) + x
+                if row[x] == "x":
+                    self.bs_clues[point] = -1
+                else:
+                    self.bs_clues[point] = int(row[x])
+                    self.bs_cluePoints.append(point)
+        self.recount()
+
+    # Counts everything again from the slants and the numbers, for when they were set some other way than one cell at
+    # a time with updatestatus() (numbers read from a file, or slants copied in all at once)
+    def recount(self):
+        self.bs_status = bytearray(len(self.bs_clues))
+        self.bs_touching = bytearray(len(self.bs_clues))
+        self.bs_notTouching = bytearray(len(self.bs_clues))
+        self.bs_counted = bytearray(len(self.bs_slants))
+        self.bs_empty = len(self.bs_slants)
+        # With every cell empty, every number is neutral
+        self.bs_unsolved = len(self.bs_cluePoints)
+        for cell in range(0, len(self.bs_slants)):
+            if self.bs_slants[cell] != 0:
+                self.updatestatus(cell)
+
+    # Returns a new board with the same numbers and no slants
+    def cluecopy(self):
+        state = BoardState(self.bs_width, self.bs_height)
+        state.bs_clues = array('b', self.bs_clues)
+        state.bs_cluePoints = list(self.bs_cluePoints)
+        state.bs_unsolved = len(state.bs_cluePoints)
+        return state
+
+    # Returns the game coordinates of a cell index
+    def cellxy(self, cell):
+        return (cell % self.bs_width) + 1, (cell // self.bs_width) + 1
+
+    # Returns the x/y of a lattice point
+    def pointxy(self, point):
+        return point % self.bs_pointWidth, point // self.bs_pointWidth
+
+    # Returns the four corners of a cell: up left, up right, down left, down right
+    def cellpoints(self, cell):
+        return self.bs_cellPoints[cell]
+
+    # Returns how many slants touch the number at the point, how many don't, and how many cells around it are empty
+    def cluecounts(self, point):
+        slants = self.bs_slants
+        touching = 0
+        nottouching = 0
+        empty = 0
+        for cell, touch, across in self.bs_pointCells[point]:
+            slant = slants[cell]
+            if slant == 0:
+                empty += 1
+            elif slant == touch:
+                touching += 1
+            else:
+                nottouching += 1
+        return touching, nottouching, empty
+
+    # Determine if the number at the point is neutral, solved, or wrong, by looking at the cells around it (see
+    # statusof())
+    def cluestatus(self, point):
+        return statusof(self.bs_clues[point], *self.cluecounts(point))
+
+    # Counts the slant just put in a cell (bs_slants[cell]) and re-checks the numbers on its four corners
+    # Only the slant the cell had before and the one it has now are looked at, not the cells around the corners
+    def updatestatus(self, cell):
+        old = self.bs_counted[cell]
+        slant = self.bs_slants[cell]
+        self.bs_counted[cell] = slant
+        if old == 0 and slant != 0:
+            self.bs_empty -= 1
+        elif old != 0 and slant == 0:
+            self.bs_empty += 1
+
+        touching = self.bs_touching
+        nottouching = self.bs_notTouching
+        status = self.bs_status
+        ul, ur, dl, dr = self.bs_cellPoints[cell]
+        # Slant 1 touches the up left and down right corners, slant 2 the other two
+        for point, touch in ((ul, 1), (ur, 2), (dl, 2), (dr, 1)):
+            if old == touch:
+                touching[point] -= 1
+            elif old != 0:
+                nottouching[point] -= 1
+            if slant == touch:
+                touching[point] += 1
+            elif slant != 0:
+                nottouching[point] += 1
+
+            num = self.bs_clues[point]
+            if num != -1:
+                new = statusof(num, touching[point], nottouching[point],
+                               len(self.bs_pointCells[point]) - touching[point] - nottouching[point])
+                if new != status[point]:
+                    if new == 1:
+                        self.bs_unsolved -= 1
+                    elif status[point] == 1:
+                        self.bs_unsolved += 1
+                    status[point] = new
+
+    # Returns 1 if every cell has a slant
+    def isfilled(self):
+        return self.bs_empty == 0
+
+    # Returns 1 if every number is solved
+    def allsolved(self):
+        return self.bs_unsolved == 0
+
+
+# Reads a board.txt into a BoardState:
+#   w=10
+#   h=12
+#   00=x11xx1xxxxx    (one row of numbers per line of lattice points)
+#   ...
+#   !
+# A packed board file (see boardpack.py) can be read too, and its first board is returned
+def readboard(path):
+    boardfile = open(path, "rb")
+    data = boardfile.read()
+    boardfile.close()
+
+    if data.startswith(PACKMAGIC):
+        import boardpack
+        return boardpack.unpackboard(data, len(boardpack.fileheader))[0]
+    return parseboard(data.decode("ascii").splitlines())
+
+
+# Reads the lines of a board.txt into a BoardState. Each line is split at its "=", so the row numbers can have any
+# number of digits, and the "!" at the end can be left off
+def parseboard(lines):
+    values = {}
+    rows = []
+    for line in lines:
+        line = line.strip()
+        if line == "!":
+            break
+        if line != "":
+            key, value = line.split("=", 1)
+            if key == "w" or key == "h":
+                values[key] = int(value)
+            else:
+                rows.append([int(key), value])
+
+    state = BoardState(values["w"], values["h"])
+    state.setclues([row for number, row in sorted(rows)])
+    return state
@@ -0,0 +1,196 @@
+"""
+A puzzle corpus: one file holding a lot of boards, with an index, so any board of a size and difficulty can be read
+straight out of it without reading the rest.
+
+    python corpus.py build -o boards.corpus --sizes 5x5 7x7 10x10 --difficulties 0 1 --count 100 -j 8
+    python corpus.py info boards.corpus
+
+build makes the boards with generator.py, split between worker processes. The game takes its new boards from
+boards.corpus when there is one (see newgameokay() in game.py).
+
+The file is:
+    - 28 byte header: b"SLNC", the format version (1), 3 zero bytes, how many groups there are, and where the board
+      offsets and the group table start (little endian, 4, 8 and 8 bytes)
+    - the boards, each one packed the same way as in a packed board file (see boardpack.py)
+    - the board offsets: where each board starts (8 bytes each), the boards of each group one after the other, in id
+      order
+    - the group table, one 12 byte entry per (width, height, difficulty): width, height, difficulty, a zero byte, how
+      many boards the group has, and where its first one is in the board offsets (4 bytes each)
+
+A few things:
+    - a board's id is its place in its group, from 0, so (width, height, difficulty, id) finds it with one lookup in
+      the group table and one read of its offset
+    - only the group table is read when the file is opened; the boards and offsets stay in the mapped file
+    - difficulty: 0 = easy, 1 = medium (see generator.py)
+"""
+
+import argparse
+import mmap
+import multiprocessing
+import random
+import struct
+import sys
+
+from boardpack import packboard, unpackboard
+import generator
+
+CORPUSMAGIC = b"SLNC"
+corpusheader = struct.Struct("<4sB3xIQQ")
+groupentry = struct.Struct("<BBBxII")
+offsetentry = struct.Struct("<Q")
+
+
+# Writes boards to a corpus file. boards: [difficulty, board] pairs in any order, each board a BoardState or already
+# packed by boardpack.packboard(). Each board's id is how many of its group came before it. Returns how many there were
+def writecorpus(path, boards):
+    corpusfile = open(path, "wb")
+    corpusfile.write(bytes(corpusheader.size))
+    offset = corpusheader.size
+
+    # Only the offsets are kept while writing, so the boards can come from a generator
+    groups = {}
+    for difficulty, packed in boards:
+        if not isinstance(packed, bytes):
+            packed = packboard(packed)
+        width, height = packed[0], packed[1]
+        key = (width, height, difficulty)
+        if key not in groups:
+            groups[key] = []
+        groups[key].append(offset)
+        corpusfile.write(packed)
+        offset += len(packed)
+
+    offsetstart = offset
+    first = 0
+    table = b""
+    for key in sorted(groups):
+        offsets = groups[key]
+        corpusfile.write(struct.pack("<" + str(len(offsets)) + "Q", *offsets))
+        table += groupentry.pack(key[0], key[1], key[2], len(offsets), first)
+        first += len(offsets)
+    corpusfile.write(table)
+
+    corpusfile.seek(0)
+    groupstart = offsetstart + first * offsetentry.size
+    corpusfile.write(corpusheader.pack(CORPUSMAGIC, 1, len(groups), offsetstart, groupstart))
+    corpusfile.close()
+    return first
+
+
+# An open corpus file
+class Corpus:
+    def __init__(self, path):
+        corpusfile = open(path, "rb")
+        try:
+            self.cp_mapped = mmap.mmap(corpusfile.fileno(), 0, access=mmap.ACCESS_READ)
+        finally:
+            corpusfile.close()
+        magic, version, groups, offsetstart, groupstart = corpusheader.unpack_from(self.cp_mapped, 0)
+        if magic != CORPUSMAGIC or version != 1:
+            self.cp_mapped.close()
+            raise ValueError(path + " is not a corpus file")
+        self.cp_offsetStart = offsetstart
+
+        # [how many boards, where the first one's offset is] by (width, height, difficulty)
+        self.cp_groups = {}
+        for group in range(0, groups):
+            width, height, difficulty, count, first = groupentry.unpack_from(self.cp_mapped,
+                                                                             groupstart + group * groupentry.size)
+            self.cp_groups[(width, height, difficulty)] = [count, first]
+
+    # Returns how many boards there are of a size and difficulty
+    def count(self, width, height, difficulty):
+        if (width, height, difficulty) not in self.cp_groups:
+            return 0
+        return self.cp_groups[(width, height, difficulty)][0]
+
+    # Returns every (width, height, difficulty) there are boards of, in order
+    def groups(self):
+        return sorted(self.cp_groups)
+
+    # Returns a board as a BoardState, or None if there's no board with that id
+    def board(self, width, height, difficulty, boardid):
+        if not 0 <= boardid < self.count(width, height, difficulty):
+            return None
+        first = self.cp_groups[(width, height, difficulty)][1]
+        where = self.cp_offsetStart + (first + boardid) * offsetentry.size
+        offset = offsetentry.unpack_from(self.cp_mapped, where)[0]
+        return unpackboard(self.cp_mapped, offset)[0]
+
+    # Returns a random board of a size and difficulty, or None if there aren't any
+    def randomboard(self, width, height, difficulty, rng=random):
+        count = self.count(width, height, difficulty)
+        if count == 0:
+            return None
+        return self.board(width, height, difficulty, rng.randrange(0, count))
+
+    # Goes through every board, a group at a time: [width, height, difficulty, id, BoardState]
+    def entries(self):
+        for width, height, difficulty in self.groups():
+            for boardid in range(0, self.count(width, height, difficulty)):
+                yield [width, height, difficulty, boardid, self.board(width, height, difficulty, boardid)]
+
+    def close(self):
+        self.cp_mapped.close()
+
+
+# Makes a board in a worker. job = [width, height, difficulty, seed]. Returns [difficulty, the board packed]
+def buildboard(job):
+    width, height, difficulty, seed = job
+    return [difficulty, packboard(generator.generate(width, height, difficulty, seed)[0])]
+
+
+# Makes count boards of every size and difficulty and writes them to a corpus file. Returns how many there were
+# The seeds are seed, seed + 1, ..., so the same arguments make the same file
+def buildcorpus(path, sizes, difficulties, count, seed=0, workers=0):
+    jobs = []
+    for width, height in sizes:
+        for difficulty in difficulties:
+            for board in range(0, count):
+                jobs.append([width, height, difficulty, seed + len(jobs)])
+
+    if workers == 1:
+        return writecorpus(path, (buildboard(job) for job in jobs))
+    pool = multiprocessing.Pool(workers or None)
+    try:
+        return writecorpus(path, pool.imap(buildboard, jobs, chunksize=4))
+    finally:
+        pool.close()
+        pool.join()
+
+
+# Returns "10x12" as [10, 12]
+def boardsize(text):
+    width, height = text.lower().split("x")
+    return [int(width), int(height)]
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Build or look at a puzzle corpus file.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="make boards with the generator and write them to a corpus file")
+    build.add_argument("-o", "--out", required=True, help="corpus file to write")
+    build.add_argument("--sizes", nargs="+", type=boardsize, required=True, help="board sizes, e.g. 5x5 10x12")
+    build.add_argument("--difficulties", nargs="+", type=int, choices=[0, 1], default=[0, 1],
+                       help="0 = easy, 1 = medium")
+    build.add_argument("--count", type=int, default=20, help="boards of each size and difficulty")
+    build.add_argument("--seed", type=int, default=0, help="seed of the first board")
+    build.add_argument("-j", "--workers", type=int, default=0, help="worker processes (default: one per core)")
+    info = commands.add_parser("info", help="print how many boards of each size and difficulty a corpus file has")
+    info.add_argument("corpus", help="corpus file")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        count = buildcorpus(args.out, args.sizes, args.difficulties, args.count, args.seed, args.workers)
+        print(str(count) + " boards written to " + args.out, file=sys.stderr)
+    else:
+        corpus = Corpus(args.corpus)
+        for width, height, difficulty in corpus.groups():
+            print(str(width) + "x" + str(height) + " difficulty " + str(difficulty) + ": " +
+                  str(corpus.count(width, height, difficulty)))
+        corpus.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,153 @@
+"""
+The rules of a game of Slants being played, without pygame, so they can run with no window or video driver (tests,
+batch tools, servers). game.py draws an Engine and sends the player's clicks to it.
+
+A few things:
+    - an Engine holds the board being played (a BoardState) and its loop checker, and keeps the two in step
+    - every change to a cell goes through setslant(), which re-checks the numbers on the cell's corners and its loops
+    - moves (turn() and move()) are kept in a Journal so they can be undone and redone; setslant() on its own isn't
+    - nothing here draws or knows about menus: game.py asks iswon() and opens the win screen itself
+    - slants: 0 = no slant, 1 = slant top left to bottom right, 2 = slant top right to bottom left
+    - clicks: "left" turns a cell 0 -> 1 -> 2 -> 0, "right" turns it the other way
+"""
+
+from array import array
+
+from boardstate import readboard
+from loopcheck import LoopChecker
+
+
+# The moves that can be undone and redone, as (cell, slant before, slant after) records
+# The records are kept in a ring of at most limit slots, which grows as it's needed: once it's full, each new move
+# takes the slot of the oldest one. Making a move, undoing, redoing, and dropping the moves that were undone (when a
+# new move is made after undoing) all take the same time however many moves there are
+class Journal:
+    def __init__(self, limit):
+        self.j_limit = limit
+        self.j_cells = array('I')
+        self.j_slants = bytearray()  # slant before * 4 + slant after
+        self.j_start = 0  # Slot of the oldest move kept
+        self.j_done = 0  # Moves that can be undone
+        self.j_end = 0  # Moves that can be undone or redone: the ones from j_done on were undone
+
+    # Returns the slot of the nth move kept, from the oldest
+    def slot(self, move):
+        return (self.j_start + move) % self.j_limit
+
+    # Adds a move, and forgets the moves that were undone
+    def record(self, cell, before, after):
+        if self.j_limit == 0:
+            return
+        if self.j_done == self.j_limit:
+            self.j_start = self.slot(1)
+            self.j_done -= 1
+        slot = self.slot(self.j_done)
+        if slot == len(self.j_cells):
+            self.j_cells.append(cell)
+            self.j_slants.append(before * 4 + after)
+        else:
+            self.j_cells[slot] = cell
+            self.j_slants[slot] = before * 4 + after
+        self.j_done += 1
+        self.j_end = self.j_done
+
+    # Steps back over the last move done. Returns [cell, slant before it], or None if there's nothing to undo
+    def undo(self):
+        if self.j_done == 0:
+            return None
+        self.j_done -= 1
+        slot = self.slot(self.j_done)
+        return [self.j_cells[slot], self.j_slants[slot] >> 2]
+
+    # Steps forward over the next move undone. Returns [cell, slant after it], or None if there's nothing to redo
+    def redo(self):
+        if self.j_done == self.j_end:
+            return None
+        slot = self.slot(self.j_done)
+        self.j_done += 1
+        return [self.j_cells[slot], self.j_slants[slot] & 3]
+
+    # Returns every move kept, oldest first, as [cell, slant before, slant after], and how many of them are done
+    def moves(self):
+        moves = []
+        for move in range(0, self.j_end):
+            slot = self.slot(move)
+            moves.append([self.j_cells[slot], self.j_slants[slot] >> 2, self.j_slants[slot] & 3])
+        return [moves, self.j_done]
+
+
+# Holds a board being played and everything worked out from its slants
+class Engine:
+    def __init__(self, state, undolimit=999999):
+        self.e_state = state
+        self.e_loopChecker = LoopChecker(state.bs_width, state.bs_height)
+        self.e_journal = Journal(undolimit)
+
+        # A board can come with slants already in it, or its numbers set straight into bs_clues
+        state.recount()
+        for cell in range(0, len(state.bs_slants)):
+            if state.bs_slants[cell] != 0:
+                self.loopcheck(cell)
+
+    # Determine if the numbers are neutral, solved, or wrong
+    # 0 = neutral, 1 = solved, 2 = wrong
+    # Only counts the slant in the cell that changed (see BoardState.updatestatus())
+    def solvednumbertest(self, cell):
+        self.e_state.updatestatus(cell)
+
+    # Update the loop checker with the slant in the cell that changed
+    # Only the group of slants touching the cell gets looked at, not the whole board
+    def loopcheck(self, cell):
+        self.e_loopChecker.setslant(cell, self.e_state.bs_slants[cell])
+
+    # Puts a slant (or 0 to clear it) in a cell
+    def setslant(self, cell, slant):
+        self.e_state.bs_slants[cell] = slant
+        self.solvednumbertest(cell)
+        self.loopcheck(cell)
+
+    # Puts a slant in a cell as a move, which can be undone
+    def move(self, cell, slant):
+        self.e_journal.record(cell, self.e_state.bs_slants[cell], slant)
+        self.setslant(cell, slant)
+
+    # Turns the slant in a cell the way a click does, as a move, and returns the new slant
+    def turn(self, cell, click):
+        if click == "left":
+            slant = (self.e_state.bs_slants[cell] + 1) % 3
+        else:
+            slant = (self.e_state.bs_slants[cell] + 2) % 3
+        self.move(cell, slant)
+        return slant
+
+    # Takes back the last move. Returns the cell it was in, or -1 if there's nothing to undo
+    def undo(self):
+        undone = self.e_journal.undo()
+        if undone is None:
+            return -1
+        self.setslant(undone[0], undone[1])
+        return undone[0]
+
+    # Makes the last move undone again. Returns the cell it was in, or -1 if there's nothing to redo
+    def redo(self):
+        redone = self.e_journal.redo()
+        if redone is None:
+            return -1
+        self.setslant(redone[0], redone[1])
+        return redone[0]
+
+    # Returns 1 if the board is solved: every cell filled in, every number solved and no loops
+    # All three are counts kept up to date move by move, so this doesn't look at the board
+    def iswon(self):
+        if not self.e_state.isfilled():
+            return 0
+        if not self.e_state.allsolved():
+            return 0
+        if self.e_loopChecker.lc_loopCount:
+            return 0
+        return 1
+
+
+# Starts a game of the board in a board file (see boardstate.readboard())
+def loadgame(path):
+    return Engine(readboard(path))
@@ -45,8 +45,8 @@ The Game to-do list:
         - check for solved numbers DONE
         - check for loops DONE
 
-    - New game okay
-    - Solve with AI
+    - New game okay DONE
+    - Solve with AI DONE
     - Main Menu
     - Win screen
 
@@ -54,18 +54,62 @@ The Game to-do list:
 
 """
 
+import time
+
+# When each stage of starting up finished, for --profile-startup (see startupreport())
+startup = [["start", time.perf_counter()]]
+
+import argparse
 import pygame
 import sys
 import random
 import os
+from boardstate import parseboard, readboard
+from corpus import Corpus
+from engine import Engine
+import solver
+import generator
+
+
+# Marks the end of a stage of starting up
+def startupstage(name):
+    startup.append([name, time.perf_counter()])
+
+
+# Prints how long each stage of starting up took
+def startupreport():
+    print("Stage".ljust(16) + "ms".rjust(8))
+    for i in range(1, len(startup)):
+        name, end = startup[i]
+        print(name.ljust(16) + ("%.1f" % ((end - startup[i - 1][1]) * 1000)).rjust(8))
+    print("Total".ljust(16) + ("%.1f" % ((startup[-1][1] - startup[0][1]) * 1000)).rjust(8))
+
+
+startupstage("imports")
 pygame.init()
+startupstage("pygame.init()")
+
+# Every font the game uses, by file and size, so each one is only loaded once however many menus use it
+fonts = {}
+
+
+# Returns a font, loading it the first time it's asked for
+def font(file, size):
+    if (file, size) not in fonts:
+        fonts[(file, size)] = pygame.font.Font(file, size)
+    return fonts[(file, size)]
 
 
 # Holds general variables, including functional variables
 class General:
     def __init__(self):
-        self.g_fps = 30
-        self.g_undolimit = 999999
+        self.g_fps = 30  # Most frames drawn in a second. With no input, none are drawn (see nextevents())
+        self.g_idleWait = 1000  # ms a screen waits for input before drawing a frame anyway
+        self.g_undolimit = 999999  # Most moves kept for undo; the oldest are forgotten past it
+        self.g_aiGuessLimit = 3000
+        self.g_difficulty = 1  # 0 = easy, 1 = medium (see generator.py)
+        self.g_poolKeep = 2  # Boards kept ready for each size and difficulty
+        self.g_corpusFile = "boards.corpus"  # New games come from here first, if it exists (see corpus.py)
         self.g_boardSize_max = 40
         self.g_boardSize_min = 4
 
@@ -83,21 +127,18 @@ class General:
         self.g_testing_winscreen = 1
 
         # Don't change these
-        self.g_cellMouseover = "none"
-        self.g_moveList = [[""]]
-        self.g_currentMove = 0
+        self.g_cellMouseover = -1
+        self.g_screens = ["none"]  # The open screens, the top one last (see gameloop())
         self.g_widthInput = ""
         self.g_heightInput = ""
         self.g_widthActive = 0
         self.g_heightActive = 0
-        self.g_solvedMatrix = []
-        self.g_slantDict = {}
-
-        self.g_loopDict = {}
-        self.g_connectDict = {}
-        self.g_pathDict = {}
+        self.g_engine = None  # The board being played (see engine.py)
+        self.g_state = None  # The engine's board and loop checker, which drawing reads every frame
+        self.g_loopChecker = None
 
         self.g_alreadywon = 0
+        self.g_message = ""
 
 
 general = General()
@@ -146,8 +187,19 @@ class Gamescreen:
         self.gs_slantColor = [255, 255, 255]
         self.gs_slantColor_loop = [255, 0, 0]
 
+        # Message (shown above the board, e.g. after the AI runs)
+        self.gs_message_textColor = [255, 255, 255]
+        self.gs_message_textSize = 20
+        self.gs_message_textFont = "opensans.ttf"
+        self.gs_message_buffery = 10
+
+        # =====Dependent Variables=====
+        self.gs_messageFont = font(self.gs_message_textFont, self.gs_message_textSize)
+        self.gs_fpsFont = None  # Loaded by drawgame() the first time the FPS is shown
+
 
 gamescreen = Gamescreen()
+startupstage("game screen")
 
 
 # Holds BotBar visual variables
@@ -216,7 +268,7 @@ class BotBar:
                              self.bb_help_borderRect[2] - (self.bb_button_borderSize * 2),
                              self.bb_help_borderRect[3] - (self.bb_button_borderSize * 2)]
 
-        self.bb_helpFont = pygame.font.Font(self.bb_help_textFont, self.bb_help_textSize)
+        self.bb_helpFont = font(self.bb_help_textFont, self.bb_help_textSize)
         self.bb_helpText = self.bb_helpFont.render(self.bb_help_textStr, 1, self.bb_help_textColor)
         helptextw = self.bb_helpText.get_rect().width
         helptexth = self.bb_helpText.get_rect().height
@@ -297,6 +349,7 @@ class BotBar:
 
 
 botbar = BotBar()
+startupstage("bottom bar")
 
 
 # Holds Game Menu visual variables
@@ -377,13 +430,6 @@ class GameMenu:
                         self.gm_borderRect[2] - (self.gm_borderSize * 2),
                         self.gm_borderRect[3] - (self.gm_borderSize * 2)]
 
-        # Title
-        titlefont = pygame.font.Font(self.gm_title_textFont, self.gm_title_textSize)
-        self.gm_titleText = titlefont.render("Menu", 1, self.gm_title_textColor)
-        titletext_w = self.gm_titleText.get_rect().width
-        self.gm_titleText_x = self.gm_rect[0] + (self.gm_rect[2] / 2) - (titletext_w / 2)
-        self.gm_titleText_y = self.gm_rect[1] + self.gm_title_buffery
-
         # Buttons X/Y
         button_x = (general.g_width / 2) - (self.gm_button_width / 2)
         newgame_y = self.gm_mainmenu_buffery + self.gm_button_height + self.gm_button_spacing
@@ -402,14 +448,6 @@ class GameMenu:
                                  self.gm_mainmenu_borderRect[2] - (self.gm_button_borderSize * 2),
                                  self.gm_mainmenu_borderRect[3] - (self.gm_button_borderSize * 2)]
 
-        mainmenufont = pygame.font.Font(self.gm_button_text_font, self.gm_mainmenu_textSize)
-        self.gm_mainmenuText = mainmenufont.render(self.gm_mainmenu_textStr, 1, self.gm_button_textColor)
-        mainmenutxt_w = self.gm_mainmenuText.get_rect().width
-        mainmenutxt_h = self.gm_mainmenuText.get_rect().height
-        self.gm_mainmenuText_x = (general.g_width / 2) - (mainmenutxt_w / 2) + self.gm_mainmenu_text_nudgex
-        self.gm_mainmenuText_y = (self.gm_mainmenu_rect[1] + (self.gm_mainmenu_rect[3] / 2) - (mainmenutxt_h / 2) +
-                                  self.gm_mainmenu_text_nudgey)
-
         # New Game Button
         self.gm_newgame_borderRect = [button_x,
                                       newgame_y,
@@ -421,14 +459,6 @@ class GameMenu:
                                 self.gm_newgame_borderRect[2] - (self.gm_button_borderSize * 2),
                                 self.gm_newgame_borderRect[3] - (self.gm_button_borderSize * 2)]
 
-        newgamefont = pygame.font.Font(self.gm_button_text_font, self.gm_newgame_textSize)
-        self.gm_newgameText = newgamefont.render(self.gm_newgame_textStr, 1, self.gm_button_textColor)
-        newgametext_w = self.gm_newgameText.get_rect().width
-        newgametext_h = self.gm_newgameText.get_rect().height
-        self.gm_newgameText_x = (general.g_width / 2) - (newgametext_w / 2) + self.gm_newgame_text_nudgex
-        self.gm_newgameText_y = (self.gm_newgame_rect[1] + (self.gm_newgame_rect[3] / 2) - (newgametext_h / 2) +
-                                 self.gm_newgame_text_nudgey)
-
         # Restart Button
         self.gm_restart_borderRect = [button_x,
                                       restart_y,
@@ -440,14 +470,6 @@ class GameMenu:
                                 self.gm_restart_borderRect[2] - (self.gm_button_borderSize * 2),
                                 self.gm_restart_borderRect[3] - (self.gm_button_borderSize * 2)]
 
-        restartfont = pygame.font.Font(self.gm_button_text_font, self.gm_restart_textSize)
-        self.gm_restartText = restartfont.render(self.gm_restart_textStr, 1, self.gm_button_textColor)
-        restarttext_w = self.gm_restartText.get_rect().width
-        restarttext_h = self.gm_restartText.get_rect().height
-        self.gm_restartText_x = (general.g_width / 2) - (restarttext_w / 2) + self.gm_restart_text_nudgex
-        self.gm_restartText_y = (self.gm_restart_rect[1] + (self.gm_restart_rect[3] / 2) - (restarttext_h / 2) +
-                                 self.gm_restart_text_nudgey)
-
         # AI Button
         self.gm_ai_borderRect = [button_x,
                                  ai_y,
@@ -459,14 +481,6 @@ class GameMenu:
                            self.gm_ai_borderRect[2] - (self.gm_button_borderSize * 2),
                            self.gm_ai_borderRect[3] - (self.gm_button_borderSize * 2)]
 
-        aifont = pygame.font.Font(self.gm_button_text_font, self.gm_ai_textSize)
-        self.gm_aiText = aifont.render(self.gm_ai_textStr, 1, self.gm_button_textColor)
-        aitext_w = self.gm_aiText.get_rect().width
-        aitext_h = self.gm_aiText.get_rect().height
-        self.gm_aiText_x = (general.g_width / 2) - (aitext_w / 2) + self.gm_ai_text_nudgex
-        self.gm_aiText_y = (self.gm_ai_rect[1] + (self.gm_ai_rect[3] / 2) - (aitext_h / 2) +
-                            self.gm_ai_text_nudgey)
-
         # Back Button
         self.gm_back_borderRect = [button_x,
                                    back_y,
@@ -478,7 +492,60 @@ class GameMenu:
                              self.gm_back_borderRect[2] - (self.gm_button_borderSize * 2),
                              self.gm_back_borderRect[3] - (self.gm_button_borderSize * 2)]
 
-        backfont = pygame.font.Font(self.gm_button_text_font, self.gm_back_textSize)
+        # The text is rendered the first time the menu is shown (see render())
+        self.gm_rendered = 0
+
+    # Renders the text of the menu, if it hasn't been yet
+    def render(self):
+        if self.gm_rendered:
+            return
+        self.gm_rendered = 1
+
+        # Title
+        titlefont = font(self.gm_title_textFont, self.gm_title_textSize)
+        self.gm_titleText = titlefont.render("Menu", 1, self.gm_title_textColor)
+        titletext_w = self.gm_titleText.get_rect().width
+        self.gm_titleText_x = self.gm_rect[0] + (self.gm_rect[2] / 2) - (titletext_w / 2)
+        self.gm_titleText_y = self.gm_rect[1] + self.gm_title_buffery
+
+        # Main Menu Button
+        mainmenufont = font(self.gm_button_text_font, self.gm_mainmenu_textSize)
+        self.gm_mainmenuText = mainmenufont.render(self.gm_mainmenu_textStr, 1, self.gm_button_textColor)
+        mainmenutxt_w = self.gm_mainmenuText.get_rect().width
+        mainmenutxt_h = self.gm_mainmenuText.get_rect().height
+        self.gm_mainmenuText_x = (general.g_width / 2) - (mainmenutxt_w / 2) + self.gm_mainmenu_text_nudgex
+        self.gm_mainmenuText_y = (self.gm_mainmenu_rect[1] + (self.gm_mainmenu_rect[3] / 2) - (mainmenutxt_h / 2) +
+                                  self.gm_mainmenu_text_nudgey)
+
+        # New Game Button
+        newgamefont = font(self.gm_button_text_font, self.gm_newgame_textSize)
+        self.gm_newgameText = newgamefont.render(self.gm_newgame_textStr, 1, self.gm_button_textColor)
+        newgametext_w = self.gm_newgameText.get_rect().width
+        newgametext_h = self.gm_newgameText.get_rect().height
+        self.gm_newgameText_x = (general.g_width / 2) - (newgametext_w / 2) + self.gm_newgame_text_nudgex
+        self.gm_newgameText_y = (self.gm_newgame_rect[1] + (self.gm_newgame_rect[3] / 2) - (newgametext_h / 2) +
+                                 self.gm_newgame_text_nudgey)
+
+        # Restart Button
+        restartfont = font(self.gm_button_text_font, self.gm_restart_textSize)
+        self.gm_restartText = restartfont.render(self.gm_restart_textStr, 1, self.gm_button_textColor)
+        restarttext_w = self.gm_restartText.get_rect().width
+        restarttext_h = self.gm_restartText.get_rect().height
+        self.gm_restartText_x = (general.g_width / 2) - (restarttext_w / 2) + self.gm_restart_text_nudgex
+        self.gm_restartText_y = (self.gm_restart_rect[1] + (self.gm_restart_rect[3] / 2) - (restarttext_h / 2) +
+                                 self.gm_restart_text_nudgey)
+
+        # AI Button
+        aifont = font(self.gm_button_text_font, self.gm_ai_textSize)
+        self.gm_aiText = aifont.render(self.gm_ai_textStr, 1, self.gm_button_textColor)
+        aitext_w = self.gm_aiText.get_rect().width
+        aitext_h = self.gm_aiText.get_rect().height
+        self.gm_aiText_x = (general.g_width / 2) - (aitext_w / 2) + self.gm_ai_text_nudgex
+        self.gm_aiText_y = (self.gm_ai_rect[1] + (self.gm_ai_rect[3] / 2) - (aitext_h / 2) +
+                            self.gm_ai_text_nudgey)
+
+        # Back Button
+        backfont = font(self.gm_button_text_font, self.gm_back_textSize)
         self.gm_backText = backfont.render(self.gm_back_textStr, 1, self.gm_button_textColor)
         backtext_w = self.gm_backText.get_rect().width
         backtext_h = self.gm_backText.get_rect().height
@@ -570,7 +637,17 @@ class HelpMenu:
                           self.hm_x_borderRect[2] - (self.hm_x_borderSize * 2),
                           self.hm_x_borderRect[3] - (self.hm_x_borderSize * 2)]
 
-        xfont = pygame.font.Font(self.hm_x_textFont, self.hm_x_textSize)
+        # The text is rendered the first time the menu is shown (see render())
+        self.hm_rendered = 0
+
+    # Renders the text of the menu, if it hasn't been yet
+    def render(self):
+        if self.hm_rendered:
+            return
+        self.hm_rendered = 1
+
+        # X Button
+        xfont = font(self.hm_x_textFont, self.hm_x_textSize)
         self.hm_xText = xfont.render("x", 1, self.hm_x_textColor)
         xtext_w = self.hm_xText.get_rect().width
         xtext_h = self.hm_xText.get_rect().height
@@ -580,14 +657,14 @@ class HelpMenu:
                            (xtext_h / 2) + self.hm_x_text_nudgey)
 
         # Title Text
-        titlefont = pygame.font.Font(self.hm_title_textFont, self.hm_title_textSize)
+        titlefont = font(self.hm_title_textFont, self.hm_title_textSize)
         self.hm_titleText = titlefont.render("Help", 1, self.hm_title_textColor)
         titletext_w = self.hm_titleText.get_rect().width
         self.hm_titleText_x = self.hm_rect[0] + (self.hm_rect[2] / 2) - (titletext_w / 2) + self.hm_title_nudgex
         self.hm_titleText_y = self.hm_rect[1] + self.hm_title_buffery
 
         # Info Text
-        infotextfont = pygame.font.Font(self.hm_info_textFont, self.hm_info_textSize)
+        infotextfont = font(self.hm_info_textFont, self.hm_info_textSize)
         self.hm_infoText1 = infotextfont.render(self.hm_info_textStr1, 1, self.hm_info_textColor)
         self.hm_infoText2 = infotextfont.render(self.hm_info_textStr2, 1, self.hm_info_textColor)
         self.hm_infoText3 = infotextfont.render(self.hm_info_textStr3, 1, self.hm_info_textColor)
@@ -743,21 +820,11 @@ class NewGameMenu:
                         self.ng_borderRect[2] - (self.ng_borderSize * 2),
                         self.ng_borderRect[3] - (self.ng_borderSize * 2)]
 
-        # Title
-        titlefont = pygame.font.Font(self.ng_title_textFont, self.ng_title_textSize)
-        self.ng_titleText = titlefont.render(self.ng_title_textStr, 1, self.ng_title_textColor)
-        title_w = self.ng_titleText.get_rect().width
-        self.ng_title_x = (general.g_width / 2) - (title_w / 2)
-        self.ng_title_y = self.ng_rect[1] + self.ng_title_buffery
-
         # Labels
-        labelfont = pygame.font.Font(self.ng_inputLabel_textFont, self.ng_inputLabel_textSize)
-        self.ng_label_widthText = labelfont.render(self.ng_inputLabel_width_textStr, 1,
-                                                   self.ng_inputLabel_textColor)
-        self.ng_label_heightText = labelfont.render(self.ng_inputLabel_height_textStr, 1,
-                                                    self.ng_inputLabel_textColor)
-        label_widthtext_w = self.ng_label_widthText.get_rect().width
-        label_heighttext_w = self.ng_label_heightText.get_rect().width
+        # The boxes go next to them, so their widths are needed now. They're rendered with the rest of the text
+        labelfont = font(self.ng_inputLabel_textFont, self.ng_inputLabel_textSize)
+        label_widthtext_w = labelfont.size(self.ng_inputLabel_width_textStr)[0]
+        label_heighttext_w = labelfont.size(self.ng_inputLabel_height_textStr)[0]
         self.ng_label_widthText_x = (self.ng_rect[0] + self.ng_inputLabel_bufferx +
                                      self.ng_inputLabel_width_text_nudgex)
         self.ng_label_widthText_y = (self.ng_rect[1] + self.ng_inputLabel_buffery +
@@ -814,7 +881,31 @@ class NewGameMenu:
                              self.ng_back_borderRect[2] - (self.ng_button_borderSize * 2),
                              self.ng_back_borderRect[3] - (self.ng_button_borderSize * 2)]
 
-        buttonfont = pygame.font.Font(self.ng_button_textFont, self.ng_button_textSize)
+        # The text is rendered the first time the menu is shown (see render())
+        self.ng_rendered = 0
+
+    # Renders the text of the menu, if it hasn't been yet
+    def render(self):
+        if self.ng_rendered:
+            return
+        self.ng_rendered = 1
+
+        # Title
+        titlefont = font(self.ng_title_textFont, self.ng_title_textSize)
+        self.ng_titleText = titlefont.render(self.ng_title_textStr, 1, self.ng_title_textColor)
+        title_w = self.ng_titleText.get_rect().width
+        self.ng_title_x = (general.g_width / 2) - (title_w / 2)
+        self.ng_title_y = self.ng_rect[1] + self.ng_title_buffery
+
+        # Labels
+        labelfont = font(self.ng_inputLabel_textFont, self.ng_inputLabel_textSize)
+        self.ng_label_widthText = labelfont.render(self.ng_inputLabel_width_textStr, 1,
+                                                   self.ng_inputLabel_textColor)
+        self.ng_label_heightText = labelfont.render(self.ng_inputLabel_height_textStr, 1,
+                                                    self.ng_inputLabel_textColor)
+
+        # Buttons
+        buttonfont = font(self.ng_button_textFont, self.ng_button_textSize)
 
         self.ng_okayText = buttonfont.render(self.ng_okay_textStr, 1, self.ng_button_textColor)
         okaytext_w = self.ng_okayText.get_rect().width
@@ -833,10 +924,10 @@ class NewGameMenu:
                               (backtext_h / 2) + self.ng_back_text_nudgey)
 
         # Numbers
-        self.ng_numberFont = pygame.font.Font(self.ng_number_textFont, self.ng_number_textSize)
+        self.ng_numberFont = font(self.ng_number_textFont, self.ng_number_textSize)
 
         # Info Text
-        infotextfont = pygame.font.Font(self.ng_info_textFont, self.ng_info_textSize)
+        infotextfont = font(self.ng_info_textFont, self.ng_info_textSize)
         self.ng_infoText1 = infotextfont.render(self.ng_info_textStr1, 1, self.ng_info_textColor)
         self.ng_infoText2 = infotextfont.render(self.ng_info_textStr2, 1, self.ng_info_textColor)
         infotext1_w = self.ng_infoText1.get_rect().width
@@ -916,13 +1007,6 @@ class WinScreen:
                         self.ws_borderRect[2] - (self.ws_borderSize * 2),
                         self.ws_borderRect[3] - (self.ws_borderSize * 2)]
 
-        # Title
-        titlefont = pygame.font.Font(self.ws_title_textFont, self.ws_title_textSize)
-        self.ws_titleText = titlefont.render(self.ws_title_textStr, 1, self.ws_title_textColor)
-        titletext_w = self.ws_titleText.get_rect().width
-        self.ws_titleText_x = (general.g_width / 2) - (titletext_w / 2)
-        self.ws_titleText_y = self.ws_rect[1] + self.ws_title_buffery
-
         # Button General
         buttonx = (general.g_width / 2) - (self.ws_button_width / 2)
 
@@ -937,14 +1021,6 @@ class WinScreen:
                                 self.ws_newgame_borderRect[2] - (self.ws_button_borderSize * 2),
                                 self.ws_newgame_borderRect[3] - (self.ws_button_borderSize * 2)]
 
-        newgamefont = pygame.font.Font(self.ws_button_textFont, self.ws_newgame_textSize)
-        self.ws_newgameText = newgamefont.render(self.ws_newgame_textStr, 1, self.ws_button_textColor)
-        newgametext_w = self.ws_newgameText.get_rect().width
-        newgametext_h = self.ws_newgameText.get_rect().height
-        self.ws_newgameText_x = (general.g_width / 2) - (newgametext_w / 2) + self.ws_newgame_text_nudgex
-        self.ws_newgameText_y = (self.ws_newgame_rect[1] + (self.ws_button_height / 2) - (newgametext_h / 2) +
-                                 self.ws_newgame_text_nudgey)
-
         # Main Menu Button
         self.ws_mainmenu_borderRect = [buttonx,
                                        (self.ws_newgame_borderRect[1] + self.ws_newgame_borderRect[3] +
@@ -957,14 +1033,6 @@ class WinScreen:
                                  self.ws_mainmenu_borderRect[2] - (self.ws_button_borderSize * 2),
                                  self.ws_mainmenu_borderRect[3] - (self.ws_button_borderSize * 2)]
 
-        mainmenufont = pygame.font.Font(self.ws_button_textFont, self.ws_mainmenu_textSize)
-        self.ws_mainmenuText = mainmenufont.render(self.ws_mainmenu_textStr, 1, self.ws_button_textColor)
-        mainmenutext_w = self.ws_mainmenuText.get_rect().width
-        mainmenutext_h = self.ws_mainmenuText.get_rect().height
-        self.ws_mainmenuText_x = (general.g_width / 2) - (mainmenutext_w / 2) + self.ws_mainmenu_text_nudgex
-        self.ws_mainmenuText_y = (self.ws_mainmenu_rect[1] + (self.ws_button_height / 2) - (mainmenutext_h / 2) +
-                                  self.ws_mainmenu_text_nudgey)
-
         # Back Button
         self.ws_back_borderRect = [buttonx,
                                    (self.ws_mainmenu_borderRect[1] + self.ws_mainmenu_borderRect[3] +
@@ -977,7 +1045,42 @@ class WinScreen:
                              self.ws_back_borderRect[2] - (self.ws_button_borderSize * 2),
                              self.ws_back_borderRect[3] - (self.ws_button_borderSize * 2)]
 
-        backfont = pygame.font.Font(self.ws_button_textFont, self.ws_back_textSize)
+        # The text is rendered the first time the menu is shown (see render())
+        self.ws_rendered = 0
+
+    # Renders the text of the menu, if it hasn't been yet
+    def render(self):
+        if self.ws_rendered:
+            return
+        self.ws_rendered = 1
+
+        # Title
+        titlefont = font(self.ws_title_textFont, self.ws_title_textSize)
+        self.ws_titleText = titlefont.render(self.ws_title_textStr, 1, self.ws_title_textColor)
+        titletext_w = self.ws_titleText.get_rect().width
+        self.ws_titleText_x = (general.g_width / 2) - (titletext_w / 2)
+        self.ws_titleText_y = self.ws_rect[1] + self.ws_title_buffery
+
+        # New Game Button
+        newgamefont = font(self.ws_button_textFont, self.ws_newgame_textSize)
+        self.ws_newgameText = newgamefont.render(self.ws_newgame_textStr, 1, self.ws_button_textColor)
+        newgametext_w = self.ws_newgameText.get_rect().width
+        newgametext_h = self.ws_newgameText.get_rect().height
+        self.ws_newgameText_x = (general.g_width / 2) - (newgametext_w / 2) + self.ws_newgame_text_nudgex
+        self.ws_newgameText_y = (self.ws_newgame_rect[1] + (self.ws_button_height / 2) - (newgametext_h / 2) +
+                                 self.ws_newgame_text_nudgey)
+
+        # Main Menu Button
+        mainmenufont = font(self.ws_button_textFont, self.ws_mainmenu_textSize)
+        self.ws_mainmenuText = mainmenufont.render(self.ws_mainmenu_textStr, 1, self.ws_button_textColor)
+        mainmenutext_w = self.ws_mainmenuText.get_rect().width
+        mainmenutext_h = self.ws_mainmenuText.get_rect().height
+        self.ws_mainmenuText_x = (general.g_width / 2) - (mainmenutext_w / 2) + self.ws_mainmenu_text_nudgex
+        self.ws_mainmenuText_y = (self.ws_mainmenu_rect[1] + (self.ws_button_height / 2) - (mainmenutext_h / 2) +
+                                  self.ws_mainmenu_text_nudgey)
+
+        # Back Button
+        backfont = font(self.ws_button_textFont, self.ws_back_textSize)
         self.ws_backText = backfont.render(self.ws_back_textStr, 1, self.ws_button_textColor)
         backtext_w = self.ws_backText.get_rect().width
         backtext_h = self.ws_backText.get_rect().height
@@ -987,6 +1090,42 @@ class WinScreen:
 
 
 winscreen = WinScreen()
+startupstage("menus")
+
+# The buttons the mouse can click on each screen, as [name, border rect]. "none" is the game with no menu open
+# The screens only ever ask buttonat() and buttonrect() about them (see below)
+buttons = {"none": [["help", botbar.bb_help_borderRect],
+                    ["menu", botbar.bb_menu_borderRect],
+                    ["undo", botbar.bb_undo_borderRect],
+                    ["redo", botbar.bb_redo_borderRect]],
+           "menu": [["mainmenu", gamemenu.gm_mainmenu_borderRect],
+                    ["newgame", gamemenu.gm_newgame_borderRect],
+                    ["restart", gamemenu.gm_restart_borderRect],
+                    ["ai", gamemenu.gm_ai_borderRect],
+                    ["back", gamemenu.gm_back_borderRect]],
+           "help": [["x", helpmenu.hm_x_borderRect]],
+           "new": [["okay", newgame.ng_okay_borderRect],
+                   ["back", newgame.ng_back_borderRect],
+                   ["width", newgame.ng_width_borderRect],
+                   ["height", newgame.ng_height_borderRect]],
+           "win": [["newgame", winscreen.ws_newgame_borderRect],
+                   ["mainmenu", winscreen.ws_mainmenu_borderRect],
+                   ["back", winscreen.ws_back_borderRect]]}
+
+
+# Returns the button of the screen under the mouse, or "" if there isn't one
+def buttonat(screen, mouse):
+    for button, rect in buttons[screen]:
+        if rect[0] <= mouse[0] <= rect[0] + rect[2] and rect[1] <= mouse[1] <= rect[1] + rect[3]:
+            return button
+    return ""
+
+
+# Returns the border rect of a button of the screen
+def buttonrect(screen, button):
+    for name, rect in buttons[screen]:
+        if name == button:
+            return rect
 
 
 # Object that holds details for drawing the board.
@@ -995,13 +1134,14 @@ class Board:
     def __init__(self):
         self.b_width = 1
         self.b_height = 1
-        self.b_numMatrix = []
-        self.b_cellDict = {}
+        self.b_cellList = []
+        self.b_gridx = gamescreen.gs_board_bufferx
+        self.b_gridy = gamescreen.gs_board_bufferx
         self.b_cell_width = 1
         self.b_cell_height = 1
         self.b_lineList = []
-        self.b_lineDict_x = {}
-        self.b_lineDict_y = {}
+        self.b_lineList_x = []
+        self.b_lineList_y = []
         self.b_bufferx = gamescreen.gs_board_bufferx
         self.b_buffery = gamescreen.gs_board_bufferx
         self.b_num_textSize = gamescreen.gs_numSize_def
@@ -1011,6 +1151,28 @@ class Board:
         self.b_adjust2 = gamescreen.gs_2nudgex_def
         self.b_adjust3 = gamescreen.gs_3nudgex_def
         self.b_adjust4 = gamescreen.gs_4nudgex_def
+        self.b_clueGlyphs = []
+        self.b_slantPictures = []
+
+        # The grid lines and the bottom bar, which only change with the board size (see drawgame())
+        self.b_staticLayer = None
+
+        # Every normal slant and every looped slant, kept up to date as cells change (see drawgame())
+        self.b_normLayer = None
+        self.b_loopLayer = None
+
+        # The board greyed out behind the open menu, made when the menu opens (see drawgame())
+        self.b_backdrop = None
+
+        # What the last frame showed, so the next one only redraws what changed (see drawgame())
+        self.b_drawnSlants = None
+        self.b_drawnLoops = None
+        self.b_drawnStatus = None
+        self.b_drawnHover = -1
+        self.b_drawnButton = ""
+        self.b_drawnMenu = ""
+        self.b_drawnMessage = ["", None]
+        self.b_drawnFps = None
 
 
 board = Board()
@@ -1021,46 +1183,36 @@ win = pygame.display.set_mode([general.g_width, general.g_height])
 pygame.display.set_caption("Slants")
 win.fill(general.g_fillColor)
 clock = pygame.time.Clock()
+startupstage("window")
 
+# Boards made ahead of time in the background. It lasts the whole session, since restart() makes a new general
+boardpool = generator.BoardPool(general.g_poolKeep)
+startupstage("board pool")
 
-# Read board.txt and adjust all visual variables in the board object accordingly.
-# Build initial starting logic variables in general
+# Boards made ahead of time and kept in one file, which new games take from before the pool. None if there's no file
+corpus = None
+if os.path.exists(general.g_corpusFile):
+    corpus = Corpus(general.g_corpusFile)
+startupstage("corpus")
+
+# The board being played as it was when it started, with no slants, which Restart goes back to. None until board.txt
+# is read
+startboard = None
+
+
+# Start the board in startboard (board.txt the first time) and adjust all visual variables in the board object
+# accordingly. Build initial starting logic variables in general
 def boardbuilder():
-    # Read the file and puts every line in a list
-    boardtxt = open("board.txt", "r")
-    lines = boardtxt.readlines()
-    boardtxt.close()
-
-    # Remove the identifier characters and put width and height into variables in board object
-    width_str = lines[0]
-    width_str = width_str.replace('w', '')
-    width_str = width_str.replace('=', '')
-    board.b_width = int(width_str)
-    height_str = lines[1]
-    height_str = height_str.replace('h', '')
-    height_str = height_str.replace('=', '')
-    board.b_height = int(height_str)
-
-    # Until the ending signifier (!) is reached, strip each line of identifier characters and newlines
-    # and put them into the matrix variable in the board object
-    # Also, build the initial solved number check matrix
-    line = 1
-    while 1:
-        line += 1
-        line_str = lines[line]
-        if line_str == "!":
-            break
-        else:
-            line_str = line_str.rstrip()
-            line_str = line_str[3:]
-            board.b_numMatrix.append(line_str)  # Add to matrix
-            solve_str = ""
-            for char in line_str:
-                if char == "x":
-                    solve_str += char
-                else:
-                    solve_str += "0"
-            general.g_solvedMatrix.append(solve_str)  # Add to solved matrix
+    global startboard
+    if startboard is None:
+        startboard = readboard("board.txt")
+    general.g_engine = Engine(startboard.cluecopy(), general.g_undolimit)
+    general.g_state = general.g_engine.e_state
+    board.b_width = general.g_state.bs_width
+    board.b_height = general.g_state.bs_height
+
+    # The next new game is most likely the same size
+    boardpool.warm(board.b_width, board.b_height, general.g_difficulty)
 
     # Decide Cell Width and Cell Height
     if board.b_width > board.b_height:
@@ -1087,33 +1239,19 @@ def boardbuilder():
     board.b_bufferx = int((general.g_width - play_w) / 2)
     board.b_buffery = int((general.g_height - botbar.bb_height - play_h) / 2)
 
-    # Build a dictionary of x/y cell positions (top left corner of cell)
-    xtrack = board.b_bufferx + gamescreen.gs_lineWidth - 1
-    ytrack = board.b_buffery + gamescreen.gs_lineWidth - 1
-    for x in range(1, board.b_width + 1):
-        if x != 1:
-            xtrack += board.b_cell_width
-            xtrack = int(xtrack)
-            ytrack = board.b_buffery + gamescreen.gs_lineWidth - 1
-            ytrack = int(ytrack)
-        for y in range(1, board.b_height + 1):
-            key = str(x) + "," + str(y)
-            pos = [xtrack, ytrack]
-            board.b_cellDict[key] = list(pos)
-            ytrack += board.b_cell_height
-            ytrack = int(ytrack)
-
-            # Build dictionary of slants
-            general.g_slantDict[key] = 0
-
-            # Build dictionary of loops
-            general.g_loopDict[key] = 0
-
-            # Build dictionary of connections
-            general.g_connectDict[key] = {"top": [], "bottom": []}
-
-            # Build dictionary of paths
-            general.g_pathDict[key] = []
+    # Build a list of x/y cell positions (top left corner of cell), in cell index order
+    board.b_gridx = board.b_bufferx + gamescreen.gs_lineWidth - 1
+    board.b_gridy = board.b_buffery + gamescreen.gs_lineWidth - 1
+    ytrack = board.b_gridy
+    for y in range(1, board.b_height + 1):
+        xtrack = board.b_gridx
+        for x in range(1, board.b_width + 1):
+            board.b_cellList.append([xtrack, ytrack])
+            xtrack = int(xtrack + board.b_cell_width)
+        ytrack = int(ytrack + board.b_cell_height)
+
+    # The loop checker comes with the engine
+    general.g_loopChecker = general.g_engine.e_loopChecker
 
     # Build list of x1/y1/x2/y2 positions for each line
     # Vertical Lines:
@@ -1124,7 +1262,7 @@ def boardbuilder():
         x2 = xtrack
         y2 = board.b_buffery + play_h - gamescreen.gs_lineWidth
         board.b_lineList.append([x1, y1, x2, y2])
-        board.b_lineDict_x[str(x)] = [x1, y1, x2, y2]
+        board.b_lineList_x.append([x1, y1, x2, y2])
         xtrack += board.b_cell_width
 
     # Horizontal Lines:
@@ -1135,14 +1273,14 @@ def boardbuilder():
         x2 = board.b_bufferx + play_w - gamescreen.gs_lineWidth
         y2 = ytrack
         board.b_lineList.append([x1, y1, x2, y2])
-        board.b_lineDict_y[str(y)] = [x1, y1, x2, y2]
+        board.b_lineList_y.append([x1, y1, x2, y2])
         ytrack += board.b_cell_height
 
     # Decide number font size:
     board.b_num_textSize = int((board.b_cell_width * gamescreen.gs_numSize_def) / gamescreen.gs_sizeScale)
 
     # Decide circle size:
-    board.circlesize = int((gamescreen.gs_circleRadius_def * board.b_cell_width) / gamescreen.gs_sizeScale)
+    board.b_circleRadius = int((gamescreen.gs_circleRadius_def * board.b_cell_width) / gamescreen.gs_sizeScale)
 
     # Decide number adjustments:
     board.b_adjust0 = int((board.b_cell_width * gamescreen.gs_0nudgex_def) / gamescreen.gs_sizeScale)
@@ -1151,410 +1289,130 @@ def boardbuilder():
     board.b_adjust3 = int((board.b_cell_width * gamescreen.gs_3nudgex_def) / gamescreen.gs_sizeScale)
     board.b_adjust4 = int((board.b_cell_width * gamescreen.gs_4nudgex_def) / gamescreen.gs_sizeScale)
 
-
-# Determine if the number is neutral, solved, or wrong
-# 0 = neutral, 1 = solved, 2 = wrong
-# Only check the numbers around the cell that was just clicked
-def solvednumbertest(cell):
-    cellx = ""
-    celly = ""
-    celladd = "x"
-    for char in cell:
-        if char == ",":
-            celladd = "y"
-        else:
-            if celladd == "x":
-                cellx += char
-            else:
-                celly += char
-    cellx = int(cellx)
-    celly = int(celly)
-    numstocheck = [[cellx - 1, celly - 1], [cellx - 1, celly], [cellx, celly - 1], [cellx, celly]]
-    for number in numstocheck:
-        x = number[0]
-        y = number[1]
-        if general.g_solvedMatrix[y][x] != "x":
-            # First make sure you're only checking cells that exist
-            doul = 1
-            dour = 1
-            dodl = 1
-            dodr = 1
-            if x <= 0:
-                doul = 0
-                dodl = 0
-            if x >= board.b_width:
-                dour = 0
-                dodr = 0
-            if y <= 0:
-                doul = 0
-                dour = 0
-            if y >= board.b_height:
-                dodl = 0
-                dodr = 0
-
-            # Then check the cells that exist and set them to "0" if they're not set,
-            # "1" if they're set and not touching the number,
-            # "2" if they're set and touching the number.
-            # Increment touching if they're touching, nottouching if they're not touching
-            ul = "none"
-            ur = "none"
-            dl = "none"
-            dr = "none"
-            touching = 0
-            nottouching = 0
-            if doul == 1:
-                cellkeystr = str(x) + "," + str(y)
-                cell = general.g_slantDict[cellkeystr]
-                if cell == 0:
-                    ul = 0
-                elif cell == 1:
-                    ul = 2
-                    touching += 1
-                else:
-                    ul = 1
-                    nottouching += 1
-            if dour == 1:
-                cellkeystr = str(x + 1) + "," + str(y)
-                cell = general.g_slantDict[cellkeystr]
-                if cell == 0:
-                    ur = 0
-                elif cell == 1:
-                    ur = 1
-                    nottouching += 1
-                else:
-                    ur = 2
-                    touching += 1
-            if dodl == 1:
-                cellkeystr = str(x) + "," + str(y + 1)
-                cell = general.g_slantDict[cellkeystr]
-                if cell == 0:
-                    dl = 0
-                elif cell == 1:
-                    dl = 1
-                    nottouching += 1
-                else:
-                    dl = 2
-                    touching += 1
-            if dodr == 1:
-                cellkeystr = str(x + 1) + "," + str(y + 1)
-                cell = general.g_slantDict[cellkeystr]
-                if cell == 0:
-                    dr = 0
-                elif cell == 1:
-                    dr = 2
-                    touching += 1
-                else:
-                    dr = 1
-                    nottouching += 1
-
-            # Determine if the number is neutral, solved, or wrong
-            # If any cells are 0:
-            #   if the number of touching cells is less than the number, neutral
-            #   if the number of touching cells is equal to the number, neutral
-            #   if the number of touching cells is greater than the number, wrong
-            #   if the number of not touching cells is less than 4 - the number, no change
-            #   if the number of not touching cells is equal to 4 - the number, no change
-            #   if the number of not touching cells is greater than 4 - the number, wrong
-            # If no cells are 0:
-            #   if the number of touching cells is less than the number, wrong
-            #   if the number of touching cells is equal to the number, solved
-            #   if the number of touching cells is greater than the number, wrong
-            num = int(board.b_numMatrix[y][x])
-            if ul == 0 or ur == 0 or dl == 0 or dr == 0:
-                if touching <= num:
-                    state = "0"
-                else:
-                    state = "2"
-                if nottouching > 4 - num:
-                    state = "2"
-            else:
-                if touching < num:
-                    state = "2"
-                elif touching == num:
-                    state = "1"
-                else:
-                    state = "2"
-
-            # Finally, update the matrix
-            line = general.g_solvedMatrix[y]
-            linelist = list(line)
-            linelist[x] = state
-            line = ""
-            for i in linelist:
-                line += i
-            general.g_solvedMatrix[y] = line
-
-
-def loopcheckmain():
-    # Reset the loop dict, connection dict, and path dict
-    for cell in general.g_loopDict:
-        general.g_loopDict[cell] = 0
-        general.g_connectDict[cell] = {"top": [], "bottom": []}
-        general.g_pathDict[cell] = []
-
-    # Build the connection dict for each cell
-    for cell in general.g_loopDict:
-        if general.g_slantDict[cell] != 0:
-            loopconnectdict(cell)
-
-    # Build the path dict for each cell
-    for cell in general.g_loopDict:
-        if general.g_slantDict[cell] != 0:
-            looppathdict(cell, cell, "top", ["top", cell])
-            looppathdict(cell, cell, "bottom", ["bottom", cell])
-
-    # Build the loop dict for each cell
-    for cell in general.g_loopDict:
-        if general.g_slantDict[cell] != 0:
-            pathlist = general.g_pathDict[cell]
-
-            for path in pathlist:
-                if path[1] == path[-2] and path[0] == path[-1]:
-                    general.g_loopDict[cell] = 1
-
-
-# Determine which cells are connected to the given cell and put them in that cell's connect dict
-# Cells in the connect dict are formatted as [cell2, relation to cell]
-def loopconnectdict(cell):
-    # Separate the x and y of the cell
-    cellx = ""
-    celly = ""
-    celladd = "x"
-    for c in cell:
-        if c == ",":
-            celladd = "y"
-        elif celladd == "x":
-            cellx += c
-        elif celladd == "y":
-            celly += c
-    cellx = int(cellx)
-    celly = int(celly)
-
-    # If the slant is 1
-    if general.g_slantDict[cell] == 1:
-        # up: (x, y - 1)
-        if celly != 1:
-            cell2 = [str(cellx) + "," + str(celly - 1), "up"]
-            if general.g_slantDict[cell2[0]] == 2:
-                general.g_connectDict[cell]["top"].append(cell2)
-        # left: (x - 1, y)
-        if cellx != 1:
-            cell2 = [str(cellx - 1) + "," + str(celly), "left"]
-            if general.g_slantDict[cell2[0]] == 2:
-                general.g_connectDict[cell]["top"].append(cell2)
-        # right: (x + 1, y)
-        if cellx != board.b_width:
-            cell2 = [str(cellx + 1) + "," + str(celly), "right"]
-            if general.g_slantDict[cell2[0]] == 2:
-                general.g_connectDict[cell]["bottom"].append(cell2)
-        # down: (x, y + 1)
-        if celly != board.b_height:
-            cell2 = [str(cellx) + "," + str(celly + 1), "down"]
-            if general.g_slantDict[cell2[0]] == 2:
-                general.g_connectDict[cell]["bottom"].append(cell2)
-        # upleft: (x - 1, y - 1)
-        if cellx != 1 and celly != 1:
-            cell2 = [str(cellx - 1) + "," + str(celly - 1), "upleft"]
-            if general.g_slantDict[cell2[0]] == 1:
-                general.g_connectDict[cell]["top"].append(cell2)
-        # downright: (x + 1, y + 1)
-        if cellx != board.b_width and celly != board.b_height:
-            cell2 = [str(cellx + 1) + "," + str(celly + 1), "downright"]
-            if general.g_slantDict[cell2[0]] == 1:
-                general.g_connectDict[cell]["bottom"].append(cell2)
-
-    # If the slant is 2
-    if general.g_slantDict[cell] == 2:
-        # up: (x, y - 1)
-        if celly != 1:
-            cell2 = [str(cellx) + "," + str(celly - 1), "up"]
-            if general.g_slantDict[cell2[0]] == 1:
-                general.g_connectDict[cell]["top"].append(cell2)
-        # left: (x - 1, y)
-        if cellx != 1:
-            cell2 = [str(cellx - 1) + "," + str(celly), "left"]
-            if general.g_slantDict[cell2[0]] == 1:
-                general.g_connectDict[cell]["bottom"].append(cell2)
-        # right: (x + 1, y)
-        if cellx != board.b_width:
-            cell2 = [str(cellx + 1) + "," + str(celly), "right"]
-            if general.g_slantDict[cell2[0]] == 1:
-                general.g_connectDict[cell]["top"].append(cell2)
-        # down: (x, y + 1)
-        if celly != board.b_height:
-            cell2 = [str(cellx) + "," + str(celly + 1), "down"]
-            if general.g_slantDict[cell2[0]] == 1:
-                general.g_connectDict[cell]["bottom"].append(cell2)
-        # downleft: (x - 1, y + 1)
-        if cellx != 1 and celly != board.b_height:
-            cell2 = [str(cellx - 1) + "," + str(celly + 1), "downleft"]
-            if general.g_slantDict[cell2[0]] == 2:
-                general.g_connectDict[cell]["bottom"].append(cell2)
-        # upright: (x + 1, y - 1)
-        if cellx != board.b_width and celly != 1:
-            cell2 = [str(cellx + 1) + "," + str(celly - 1), "upright"]
-            if general.g_slantDict[cell2[0]] == 2:
-                general.g_connectDict[cell]["top"].append(cell2)
-
-
-# Determines which paths come from the cell and adds them to that cell's path list
-def looppathdict(pathstart, cell, endpoint, path):
-    cellconnections = list(general.g_connectDict[cell][endpoint])
-    for cell2 in cellconnections:
-        # Gets endpoints of cell2 for appending later
-        if general.g_slantDict[cell] == 1:
-            if cell2[1] == "up" or cell2[1] == "right" or cell2[1] == "upleft":
-                ep = "top"
-            else:
-                ep = "bottom"
-        else:
-            if cell2[1] == "up" or cell2[1] == "left" or cell2[1] == "upright":
-                ep = "top"
-            else:
-                ep = "bottom"
-        # Gets list of connections for cell2 for check later
-        cellconnections2 = list(general.g_connectDict[cell2[0]][ep])
-        newpath = list(path)
-        newpath.append(cell2[0])
-
-        # Reaches an endpoint with no connections
-        if len(cellconnections2) == 0:
-            newpath.append(ep)
-            general.g_pathDict[pathstart].append(newpath)
-
-        # Reaches a cell already in the path
-        elif cell2[0] in path:
-            newpath.append(ep)
-            general.g_pathDict[pathstart].append(newpath)
-
-        # Continues the path
-        else:
-            looppathdict(pathstart, cell2[0], ep, newpath)
-
-
-# Check if the board is solved
+    # Pictures of the numbers and slants for this cell size
+    board.b_clueGlyphs = clueglyphs()
+    board.b_slantPictures = slantpictures()
+
+    # The lines and the bottom bar get drawn once here, and every frame after copies them
+    # The slant layers and the menu backdrop are made once for the board and drawn on as things change
+    board.b_staticLayer = staticlayer()
+    board.b_normLayer = clearlayer()
+    board.b_loopLayer = clearlayer()
+    board.b_backdrop = pygame.Surface([general.g_width, general.g_height]).convert()
+
+
+# Pictures of every number (0 - 4) in every state (neutral, solved, wrong), with its circle behind it
+# Made once for each cell size, since the font, circle and nudges all come from it
+# glyphcache[cell width][state][number] = [picture, x / y of the lattice point in the picture]
+glyphcache = {}
+
+
+def clueglyphs():
+    if board.b_cell_width not in glyphcache:
+        numfont = font(gamescreen.gs_numFont, board.b_num_textSize)
+        radius = board.b_circleRadius
+        adjusts = [board.b_adjust0, board.b_adjust1, board.b_adjust2, board.b_adjust3, board.b_adjust4]
+        colors = [[gamescreen.gs_circleOutlineColor_neutral, general.g_fillColor, gamescreen.gs_numColor_neutral],
+                  [gamescreen.gs_circleOutlineColor_solved, gamescreen.gs_circleFillColor_solved,
+                   gamescreen.gs_numColor_solved],
+                  [gamescreen.gs_circleOutlineColor_wrong, gamescreen.gs_circleFillColor_wrong,
+                   gamescreen.gs_numColor_wrong]]
+
+        glyphs = []
+        for circlecolor, circlefill, numcolor in colors:
+            glyphs.append([])
+            for num in range(0, 5):
+                numtext = numfont.render(str(num), 1, numcolor)
+                numw = numtext.get_rect().width
+                numh = numtext.get_rect().height
+
+                # Big enough for the circle and the number, with the lattice point in the middle
+                middle = max(radius, int(numw / 2) + abs(adjusts[num]), int(numh / 2)) + 1
+                glyph = pygame.Surface([(middle * 2) + 1, (middle * 2) + 1], pygame.SRCALPHA)
+                pygame.draw.circle(glyph, circlefill, [middle, middle], radius)
+                pygame.draw.circle(glyph, circlecolor, [middle, middle], radius, gamescreen.gs_circleWidth)
+                glyph.blit(numtext, [middle - (numw / 2) + adjusts[num], middle - (numh / 2)])
+                glyphs[-1].append([glyph.convert_alpha(), middle])
+        glyphcache[board.b_cell_width] = glyphs
+    return glyphcache[board.b_cell_width]
+
+
+# Pictures of both slants, normal and looped, so a slant is drawn the same way whether or not only part of it is
+# being drawn again (a clipped line doesn't always land on the same pixels as the whole line)
+# slantcache[cell width][looped][slant] = picture, with the cell's top left corner at gs_slantWidth / gs_slantWidth
+slantcache = {}
+
+
+def slantpictures():
+    if board.b_cell_width not in slantcache:
+        margin = gamescreen.gs_slantWidth
+        right = margin + board.b_cell_width
+        down = margin + board.b_cell_height
+        pictures = []
+        for color in [gamescreen.gs_slantColor, gamescreen.gs_slantColor_loop]:
+            pictures.append([None])
+            for start, end in [[[margin, margin], [right, down]], [[margin, down], [right, margin]]]:
+                picture = pygame.Surface([right + margin + 1, down + margin + 1])
+                picture.fill(general.g_colorkey)
+                picture.set_colorkey(general.g_colorkey)
+                pygame.draw.line(picture, color, start, end, gamescreen.gs_slantWidth)
+                pictures[-1].append(picture.convert())
+        slantcache[board.b_cell_width] = pictures
+    return slantcache[board.b_cell_width]
+
+
+# Check if the board is solved (see engine.py), and go to the winscreen if it is
 def wincheck():
     # Only checks for winscreen if this isn't the first time they've beaten this board
-    if general.g_alreadywon == 0:
-        winner = 1
-
-        # Check if the board is filled in
-        for cell in general.g_slantDict:
-            slant = general.g_slantDict[cell]
-            if slant == 0:
-                winner = 0
-                break
-
-        # Check if all the numbers are solved
-        if winner:
-            for row in general.g_solvedMatrix:
-                for num in row:
-                    if num != "x":
-                        if num != "1":
-                            winner = 0
-                            break
-
-        # TO-DO check if there are no loops
-        if winner:
-            for cell in general.g_loopDict:
-                if general.g_loopDict[cell] == 1:
-                    winner = 0
-                    break
-
-        # Go to winscreen if winner
-        if winner:
-            general.g_alreadywon = 1
-            winscreenmenu()
+    if general.g_alreadywon == 0 and general.g_engine.iswon():
+        general.g_alreadywon = 1
+        general.g_screens.append("win")
 
 
 # Win Screen
-def winscreenmenu():
-    while 1:
-        clock.tick(general.g_fps)
-        framelength = clock.get_time()
-        realfps = str(int(1000 / framelength))
-        mouse = pygame.mouse.get_pos()
-        drawgame(realfps, "win")
+def winevent(event):
+    if event.type == pygame.MOUSEBUTTONDOWN:
+        if event.button == 1:
+            clicked = buttonat("win", event.pos)
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                sys.exit()
+            # New Game
+            if clicked == "newgame":
+                newgamebutton()
 
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:
+            # Main Menu
+            if clicked == "mainmenu":
+                menubutton()
 
-                    # New Game
-                    if ((winscreen.ws_newgame_borderRect[0] <= mouse[0] <=
-                            winscreen.ws_newgame_borderRect[0] + winscreen.ws_newgame_borderRect[2]) and
-                            (winscreen.ws_newgame_borderRect[1] <= mouse[1] <=
-                             winscreen.ws_newgame_borderRect[1] + winscreen.ws_newgame_borderRect[3])):
-                        newgamebutton("winscreen")
+            # Back
+            if clicked == "back":
+                general.g_screens.pop()
 
-                    # Main Menu
-                    if ((winscreen.ws_mainmenu_borderRect[0] <= mouse[0] <=
-                         winscreen.ws_mainmenu_borderRect[0] + winscreen.ws_mainmenu_borderRect[2]) and
-                            (winscreen.ws_mainmenu_borderRect[1] <= mouse[1] <=
-                             winscreen.ws_mainmenu_borderRect[1] + winscreen.ws_mainmenu_borderRect[3])):
-                        menubutton()
 
-                    # Back
-                    if ((winscreen.ws_back_borderRect[0] <= mouse[0] <=
-                         winscreen.ws_back_borderRect[0] + winscreen.ws_back_borderRect[2]) and
-                            (winscreen.ws_back_borderRect[1] <= mouse[1] <=
-                             winscreen.ws_back_borderRect[1] + winscreen.ws_back_borderRect[3])):
-                        gameloop()
+# Game Menu
+def menuevent(event):
+    if event.type == pygame.MOUSEBUTTONDOWN:
+        if event.button == 1:
+            clicked = buttonat("menu", event.pos)
 
+            # Main Menu
+            if clicked == "mainmenu":
+                menubutton()
 
-# Game Menu
-def menuscreen():
-    while 1:
-        clock.tick(general.g_fps)
-        framelength = clock.get_time()
-        realfps = str(int(1000 / framelength))
-        mouse = pygame.mouse.get_pos()
-        drawgame(realfps, "menu")
+            # New Game
+            if clicked == "newgame":
+                newgamebutton()
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                sys.exit()
+            # Restart
+            if clicked == "restart":
+                restart()
 
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:
-
-                    # Main Menu
-                    if ((gamemenu.gm_mainmenu_borderRect[0] <= mouse[0] <=
-                            gamemenu.gm_mainmenu_borderRect[0] + gamemenu.gm_mainmenu_borderRect[2]) and
-                            (gamemenu.gm_mainmenu_borderRect[1] <= mouse[1] <=
-                             gamemenu.gm_mainmenu_borderRect[1] + gamemenu.gm_mainmenu_borderRect[3])):
-                        menubutton()
-
-                    # New Game
-                    if ((gamemenu.gm_newgame_borderRect[0] <= mouse[0] <=
-                            gamemenu.gm_newgame_borderRect[0] + gamemenu.gm_newgame_borderRect[2]) and
-                            (gamemenu.gm_newgame_borderRect[1] <= mouse[1] <=
-                             gamemenu.gm_newgame_borderRect[1] + gamemenu.gm_newgame_borderRect[3])):
-                        newgamebutton("gamemenu")
-
-                    # Restart
-                    if ((gamemenu.gm_restart_borderRect[0] <= mouse[0] <=
-                            gamemenu.gm_restart_borderRect[0] + gamemenu.gm_restart_borderRect[2]) and
-                            (gamemenu.gm_restart_borderRect[1] <= mouse[1] <=
-                             gamemenu.gm_restart_borderRect[1] + gamemenu.gm_restart_borderRect[3])):
-                        restart()
-
-                    # Solve With AI
-                    if ((gamemenu.gm_ai_borderRect[0] <= mouse[0] <=
-                         gamemenu.gm_ai_borderRect[0] + gamemenu.gm_ai_borderRect[2]) and
-                            (gamemenu.gm_ai_borderRect[1] <= mouse[1] <=
-                             gamemenu.gm_ai_borderRect[1] + gamemenu.gm_ai_borderRect[3])):
-                        solvewithai()
-
-                    # Back
-                    if ((gamemenu.gm_back_borderRect[0] <= mouse[0] <=
-                         gamemenu.gm_back_borderRect[0] + gamemenu.gm_back_borderRect[2]) and
-                            (gamemenu.gm_back_borderRect[1] <= mouse[1] <=
-                             gamemenu.gm_back_borderRect[1] + gamemenu.gm_back_borderRect[3])):
-                        gameloop()
+            # Solve With AI
+            if clicked == "ai":
+                solvewithai()
+
+            # Back
+            if clicked == "back":
+                general.g_screens.pop()
 
 
 # Game Menu -> Main Menu
@@ -1563,591 +1421,611 @@ def menubutton():
 
 
 # Game Menu - > New Game
-def newgamebutton(backto):
+# Opens the New Game menu over the screen it was clicked on, which "Back" goes back to
+def newgamebutton():
     general.g_widthInput = str(board.b_width)
     general.g_heightInput = str(board.b_height)
     general.g_widthActive = 0
     general.g_heightActive = 0
+    general.g_screens.append("new")
+
+
+# New Game menu
+def newgameevent(event):
+    if event.type == pygame.MOUSEBUTTONDOWN:
+        if event.button == 1:
+            clicked = buttonat("new", event.pos)
+            # If a text input box is not active
+            if general.g_widthActive == 0 and general.g_heightActive == 0:
+                # User clicks "Okay"
+                if clicked == "okay":
+                    newgameokay()
+                # User clicks "Back"
+                elif clicked == "back":
+                    general.g_screens.pop()
+                # User clicks width box
+                elif clicked == "width":
+                    general.g_widthActive = 1
+                    general.g_widthInput = ""
+
+                # User clicks height box
+                elif clicked == "height":
+                    general.g_heightActive = 1
+                    general.g_heightInput = ""
+
+            # If width input box is active
+            elif general.g_widthActive == 1:
+                # User clicks height box
+                if clicked == "height":
+                    general.g_heightActive = 1
+                    general.g_widthActive = 0
+                    general.g_heightInput = ""
+                    general.g_widthInput = str(board.b_width)
+                # User clicks "Back"
+                elif clicked == "back":
+                    general.g_screens.pop()
+                # User clicks anywhere but either box
+                else:
+                    general.g_widthActive = 0
+                    general.g_widthInput = str(board.b_width)
+                    general.g_heightActive = 0
 
-    while 1:
-        clock.tick(general.g_fps)
-        framelength = clock.get_time()
-        realfps = str(int(1000 / framelength))
-        mouse = pygame.mouse.get_pos()
-        drawgame(realfps, "new")
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                sys.exit()
-
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:
-                    # If a text input box is not active
-                    if general.g_widthActive == 0 and general.g_heightActive == 0:
-                        # User clicks "Okay"
-                        if ((newgame.ng_okay_borderRect[0] <= mouse[0] <=
-                             newgame.ng_okay_borderRect[0] + newgame.ng_okay_borderRect[2]) and
-                                (newgame.ng_okay_borderRect[1] <= mouse[1] <=
-                                 newgame.ng_okay_borderRect[1] + newgame.ng_okay_borderRect[3])):
-                            newgameokay()
-                        # User clicks "Back"
-                        elif ((newgame.ng_back_borderRect[0] <= mouse[0] <=
-                                newgame.ng_back_borderRect[0] + newgame.ng_back_borderRect[2]) and
-                                (newgame.ng_back_borderRect[1] <= mouse[1] <=
-                                 newgame.ng_back_borderRect[1] + newgame.ng_back_borderRect[3])):
-                            if backto == "gamemenu":
-                                menuscreen()
-                            elif backto == "winscreen":
-                                winscreenmenu()
-                        # User clicks width box
-                        elif ((newgame.ng_width_borderRect[0] <= mouse[0] <=
-                                newgame.ng_width_borderRect[0] + newgame.ng_width_borderRect[2]) and
-                                (newgame.ng_width_borderRect[1] <= mouse[1] <=
-                                 newgame.ng_width_borderRect[1] + newgame.ng_width_borderRect[3])):
-                            general.g_widthActive = 1
-                            general.g_widthInput = ""
-
-                        # User clicks height box
-                        elif ((newgame.ng_height_borderRect[0] <= mouse[0] <=
-                                newgame.ng_height_borderRect[0] + newgame.ng_height_borderRect[2]) and
-                                (newgame.ng_height_borderRect[1] <= mouse[1] <=
-                                 newgame.ng_height_borderRect[1] + newgame.ng_height_borderRect[3])):
-                            general.g_heightActive = 1
-                            general.g_heightInput = ""
-
-                    # If width input box is active
-                    elif general.g_widthActive == 1:
-                        # User clicks height box
-                        if ((newgame.ng_height_borderRect[0] <= mouse[0] <=
-                             newgame.ng_height_borderRect[0] + newgame.ng_height_borderRect[2]) and
-                                (newgame.ng_height_borderRect[1] <= mouse[1] <=
-                                 newgame.ng_height_borderRect[1] + newgame.ng_height_borderRect[3])):
-                            general.g_heightActive = 1
-                            general.g_widthActive = 0
-                            general.g_heightInput = ""
-                            general.g_widthInput = str(board.b_width)
-                        # User clicks "Back"
-                        elif ((newgame.ng_back_borderRect[0] <= mouse[0] <=
-                                newgame.ng_back_borderRect[0] + newgame.ng_back_borderRect[2]) and
-                                (newgame.ng_back_borderRect[1] <= mouse[1] <=
-                                 newgame.ng_back_borderRect[1] + newgame.ng_back_borderRect[3])):
-                            if backto == "gamemenu":
-                                menuscreen()
-                            elif backto == "winscreen":
-                                winscreenmenu()
-                        # User clicks anywhere but either box
-                        else:
-                            general.g_widthActive = 0
-                            general.g_widthInput = str(board.b_width)
-                            general.g_heightActive = 0
-
-                    # If h input box is active
-                    elif general.g_heightActive == 1:
-                        # User clicks width box
-                        if ((newgame.ng_width_borderRect[0] <= mouse[0] <=
-                             newgame.ng_width_borderRect[0] + newgame.ng_width_borderRect[2]) and
-                            (newgame.ng_width_borderRect[1] <= mouse[1] <=
-                             newgame.ng_width_borderRect[1] + newgame.ng_width_borderRect[3])):
-                            general.g_widthActive = 1
-                            general.g_heightActive = 0
-                            general.g_widthInput = ""
-                            general.g_heightInput = str(board.b_height)
-                        # User clicks "Back"
-                        elif ((newgame.ng_back_borderRect[0] <= mouse[0] <=
-                               newgame.ng_back_borderRect[0] + newgame.ng_back_borderRect[2]) and
-                              (newgame.ng_back_borderRect[1] <= mouse[1] <=
-                               newgame.ng_back_borderRect[1] + newgame.ng_back_borderRect[3])):
-                            if backto == "gamemenu":
-                                menuscreen()
-                            elif backto == "winscreen":
-                                winscreenmenu()
-                        # User clicks anywhere but either box
-                        else:
-                            general.g_heightActive = 0
-                            general.g_widthActive = 0
-                            general.g_heightInput = str(board.b_width)
-
-            # Text input handling
-
-            # For width editing
-            if general.g_widthActive == 1:
-
-                # Basic addition of characters
-                if len(general.g_widthInput) < 2:
-                    charadd = ""
-                    if event.type == pygame.KEYDOWN:
-                        if event.key == pygame.K_0 or event.key == pygame.K_KP0:
-                            charadd = "0"
-                        elif event.key == pygame.K_1 or event.key == pygame.K_KP1:
-                            charadd = "1"
-                        elif event.key == pygame.K_2 or event.key == pygame.K_KP2:
-                            charadd = "2"
-                        elif event.key == pygame.K_3 or event.key == pygame.K_KP3:
-                            charadd = "3"
-                        elif event.key == pygame.K_4 or event.key == pygame.K_KP4:
-                            charadd = "4"
-                        elif event.key == pygame.K_5 or event.key == pygame.K_KP5:
-                            charadd = "5"
-                        elif event.key == pygame.K_6 or event.key == pygame.K_KP6:
-                            charadd = "6"
-                        elif event.key == pygame.K_7 or event.key == pygame.K_KP7:
-                            charadd = "7"
-                        elif event.key == pygame.K_8 or event.key == pygame.K_KP8:
-                            charadd = "8"
-                        elif event.key == pygame.K_9 or event.key == pygame.K_KP9:
-                            charadd = "9"
-                    if len(general.g_widthInput) == 0 and charadd == "0":
-                        # Doesn't allow leading 0s
-                        pass
-                    else:
-                        general.g_widthInput += charadd
-
-                if len(general.g_widthInput) > 0:
-                    if event.type == pygame.KEYDOWN:
-                        if event.key == pygame.K_BACKSPACE:
-                            # Handles backspacing
-                            newstr = ""
-                            for i in range(0, len(general.g_widthInput) - 1):
-                                newstr += general.g_widthInput[i]
-                            general.g_widthInput = str(newstr)
-
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER:
-                        if len(general.g_widthInput) == 0:
-                            # Same as canceling
-                            general.g_heightActive = 0
-                            general.g_heightInput = str(board.b_height)
-                            general.g_widthActive = 0
-                            general.g_widthInput = str(board.b_width)
-                        else:
-                            # Input confirmed
-                            general.g_heightActive = 0
-                            general.g_widthActive = 0
-
-                            # Doesn't allow numbers higher or lower than the set range
-                            if int(general.g_widthInput) > general.g_boardSize_max:
-                                general.g_widthInput = str(general.g_boardSize_max)
-                            if int(general.g_widthInput) < general.g_boardSize_min:
-                                general.g_widthInput = str(general.g_boardSize_min)
-                            if int(general.g_heightInput) > general.g_boardSize_max:
-                                general.g_heightInput = str(general.g_boardSize_max)
-                            if int(general.g_heightInput) < general.g_boardSize_min:
-                                general.g_heightInput = str(general.g_boardSize_min)
-
-            # For h editing
+            # If h input box is active
             elif general.g_heightActive == 1:
+                # User clicks width box
+                if clicked == "width":
+                    general.g_widthActive = 1
+                    general.g_heightActive = 0
+                    general.g_widthInput = ""
+                    general.g_heightInput = str(board.b_height)
+                # User clicks "Back"
+                elif clicked == "back":
+                    general.g_screens.pop()
+                # User clicks anywhere but either box
+                else:
+                    general.g_heightActive = 0
+                    general.g_widthActive = 0
+                    general.g_heightInput = str(board.b_width)
+
+    # Text input handling
+
+    # For width editing
+    if general.g_widthActive == 1:
+
+        # Basic addition of characters
+        if len(general.g_widthInput) < 2:
+            charadd = ""
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_0 or event.key == pygame.K_KP0:
+                    charadd = "0"
+                elif event.key == pygame.K_1 or event.key == pygame.K_KP1:
+                    charadd = "1"
+                elif event.key == pygame.K_2 or event.key == pygame.K_KP2:
+                    charadd = "2"
+                elif event.key == pygame.K_3 or event.key == pygame.K_KP3:
+                    charadd = "3"
+                elif event.key == pygame.K_4 or event.key == pygame.K_KP4:
+                    charadd = "4"
+                elif event.key == pygame.K_5 or event.key == pygame.K_KP5:
+                    charadd = "5"
+                elif event.key == pygame.K_6 or event.key == pygame.K_KP6:
+                    charadd = "6"
+                elif event.key == pygame.K_7 or event.key == pygame.K_KP7:
+                    charadd = "7"
+                elif event.key == pygame.K_8 or event.key == pygame.K_KP8:
+                    charadd = "8"
+                elif event.key == pygame.K_9 or event.key == pygame.K_KP9:
+                    charadd = "9"
+            if len(general.g_widthInput) == 0 and charadd == "0":
+                # Doesn't allow leading 0s
+                pass
+            else:
+                general.g_widthInput += charadd
+
+        if len(general.g_widthInput) > 0:
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_BACKSPACE:
+                    # Handles backspacing
+                    newstr = ""
+                    for i in range(0, len(general.g_widthInput) - 1):
+                        newstr += general.g_widthInput[i]
+                    general.g_widthInput = str(newstr)
+
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER:
+                if len(general.g_widthInput) == 0:
+                    # Same as canceling
+                    general.g_heightActive = 0
+                    general.g_heightInput = str(board.b_height)
+                    general.g_widthActive = 0
+                    general.g_widthInput = str(board.b_width)
+                else:
+                    # Input confirmed
+                    general.g_heightActive = 0
+                    general.g_widthActive = 0
+
+                    # Doesn't allow numbers higher or lower than the set range
+                    if int(general.g_widthInput) > general.g_boardSize_max:
+                        general.g_widthInput = str(general.g_boardSize_max)
+                    if int(general.g_widthInput) < general.g_boardSize_min:
+                        general.g_widthInput = str(general.g_boardSize_min)
+                    if int(general.g_heightInput) > general.g_boardSize_max:
+                        general.g_heightInput = str(general.g_boardSize_max)
+                    if int(general.g_heightInput) < general.g_boardSize_min:
+                        general.g_heightInput = str(general.g_boardSize_min)
+
+                    # Start making boards of that size before "Okay" is clicked
+                    boardpool.warm(int(general.g_widthInput), int(general.g_heightInput),
+                                   general.g_difficulty)
+
+    # For h editing
+    elif general.g_heightActive == 1:
+
+        # Basic addition of characters
+        if len(general.g_heightInput) < 2:
+            charadd = ""
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_0 or event.key == pygame.K_KP0:
+                    charadd = "0"
+                elif event.key == pygame.K_1 or event.key == pygame.K_KP1:
+                    charadd = "1"
+                elif event.key == pygame.K_2 or event.key == pygame.K_KP2:
+                    charadd = "2"
+                elif event.key == pygame.K_3 or event.key == pygame.K_KP3:
+                    charadd = "3"
+                elif event.key == pygame.K_4 or event.key == pygame.K_KP4:
+                    charadd = "4"
+                elif event.key == pygame.K_5 or event.key == pygame.K_KP5:
+                    charadd = "5"
+                elif event.key == pygame.K_6 or event.key == pygame.K_KP6:
+                    charadd = "6"
+                elif event.key == pygame.K_7 or event.key == pygame.K_KP7:
+                    charadd = "7"
+                elif event.key == pygame.K_8 or event.key == pygame.K_KP8:
+                    charadd = "8"
+                elif event.key == pygame.K_9 or event.key == pygame.K_KP9:
+                    charadd = "9"
+            if len(general.g_heightInput) == 0 and charadd == "0":
+
+                # Doesn't allow leading 0s
+                pass
+            else:
+                general.g_heightInput += charadd
+
+        if len(general.g_heightInput) > 0:
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_BACKSPACE:
+                    # Handles backspacing
+                    newstr = ""
+                    for i in range(0, len(general.g_heightInput) - 1):
+                        newstr += general.g_heightInput[i]
+                    general.g_heightInput = str(newstr)
+
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER:
+                if len(general.g_heightInput) == 0:
+                    # Same as canceling
+                    general.g_heightActive = 0
+                    general.g_heightInput = str(board.b_height)
+                    general.g_widthActive = 0
+                    general.g_widthInput = str(board.b_width)
+                else:
+                    # Input confirmed
+                    general.g_heightActive = 0
+                    general.g_widthActive = 0
+
+                    # Doesn't allow numbers higher or lower than the set range
+                    if int(general.g_widthInput) > general.g_boardSize_max:
+                        general.g_widthInput = str(general.g_boardSize_max)
+                    if int(general.g_widthInput) < general.g_boardSize_min:
+                        general.g_widthInput = str(general.g_boardSize_min)
+                    if int(general.g_heightInput) > general.g_boardSize_max:
+                        general.g_heightInput = str(general.g_boardSize_max)
+                    if int(general.g_heightInput) < general.g_boardSize_min:
+                        general.g_heightInput = str(general.g_boardSize_min)
 
-                # Basic addition of characters
-                if len(general.g_heightInput) < 2:
-                    charadd = ""
-                    if event.type == pygame.KEYDOWN:
-                        if event.key == pygame.K_0 or event.key == pygame.K_KP0:
-                            charadd = "0"
-                        elif event.key == pygame.K_1 or event.key == pygame.K_KP1:
-                            charadd = "1"
-                        elif event.key == pygame.K_2 or event.key == pygame.K_KP2:
-                            charadd = "2"
-                        elif event.key == pygame.K_3 or event.key == pygame.K_KP3:
-                            charadd = "3"
-                        elif event.key == pygame.K_4 or event.key == pygame.K_KP4:
-                            charadd = "4"
-                        elif event.key == pygame.K_5 or event.key == pygame.K_KP5:
-                            charadd = "5"
-                        elif event.key == pygame.K_6 or event.key == pygame.K_KP6:
-                            charadd = "6"
-                        elif event.key == pygame.K_7 or event.key == pygame.K_KP7:
-                            charadd = "7"
-                        elif event.key == pygame.K_8 or event.key == pygame.K_KP8:
-                            charadd = "8"
-                        elif event.key == pygame.K_9 or event.key == pygame.K_KP9:
-                            charadd = "9"
-                    if len(general.g_heightInput) == 0 and charadd == "0":
-
-                        # Doesn't allow leading 0s
-                        pass
-                    else:
-                        general.g_heightInput += charadd
-
-                if len(general.g_heightInput) > 0:
-                    if event.type == pygame.KEYDOWN:
-                        if event.key == pygame.K_BACKSPACE:
-                            # Handles backspacing
-                            newstr = ""
-                            for i in range(0, len(general.g_heightInput) - 1):
-                                newstr += general.g_heightInput[i]
-                            general.g_heightInput = str(newstr)
-
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER:
-                        if len(general.g_heightInput) == 0:
-                            # Same as canceling
-                            general.g_heightActive = 0
-                            general.g_heightInput = str(board.b_height)
-                            general.g_widthActive = 0
-                            general.g_widthInput = str(board.b_width)
-                        else:
-                            # Input confirmed
-                            general.g_heightActive = 0
-                            general.g_widthActive = 0
-
-                            # Doesn't allow numbers higher or lower than the set range
-                            if int(general.g_widthInput) > general.g_boardSize_max:
-                                general.g_widthInput = str(general.g_boardSize_max)
-                            if int(general.g_widthInput) < general.g_boardSize_min:
-                                general.g_widthInput = str(general.g_boardSize_min)
-                            if int(general.g_heightInput) > general.g_boardSize_max:
-                                general.g_heightInput = str(general.g_boardSize_max)
-                            if int(general.g_heightInput) < general.g_boardSize_min:
-                                general.g_heightInput = str(general.g_boardSize_min)
+                    # Start making boards of that size before "Okay" is clicked
+                    boardpool.warm(int(general.g_widthInput), int(general.g_heightInput),
+                                   general.g_difficulty)
 
 
 # Game Menu -> New Game -> Okay
+# Takes a board with one solution from the corpus, or from the pool if the corpus has none of that size and
+# difficulty, and starts it. board.txt is left alone: Restart goes back to the new board through startboard
 def newgameokay():
-    print("New Game Okay")
-    print(general.g_widthInput)
-    print(general.g_heightInput)
+    width = int(general.g_widthInput)
+    height = int(general.g_heightInput)
 
+    state = None
+    if corpus is not None:
+        state = corpus.randomboard(width, height, general.g_difficulty)
+    if state is None:
+        # If none are ready, big boards can take the generator a few seconds, so show that it's working first
+        if not boardpool.isready(width, height, general.g_difficulty):
+            general.g_message = "Making a new board..."
+            drawgame("", "none")
+        state = parseboard(boardpool.take(width, height, general.g_difficulty))
+    restart(state)
 
-# Game Menu -> Help
-def helpbutton():
-    while 1:
-        clock.tick(general.g_fps)
-        framelength = clock.get_time()
-        realfps = str(int(1000 / framelength))
-        mouse = pygame.mouse.get_pos()
-        drawgame(realfps, "help")
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                sys.exit()
-
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:
-                    if ((helpmenu.hm_x_borderRect[0] <= mouse[0] <=
-                         (helpmenu.hm_x_borderRect[0] + helpmenu.hm_x_borderRect[2])) and
-                            (helpmenu.hm_x_borderRect[1] <= mouse[1] <=
-                                (helpmenu.hm_x_borderRect[1] + helpmenu.hm_x_borderRect[3]))):
-                        gameloop()
+# Game Menu -> Help
+def helpevent(event):
+    if event.type == pygame.MOUSEBUTTONDOWN:
+        if event.button == 1:
+            clicked = buttonat("help", event.pos)
+            if clicked == "x":
+                general.g_screens.pop()
 
 
 # Solve with AI button
+# Puts the AI's slants on the board as normal moves, so they can be undone like the player's own
+# Cells the AI couldn't work out are cleared, since the player's slants there might not fit with the AI's
 def solvewithai():
-    print("SOLVE WITH AI")
-
-
-# Undo / Redo
-# The current move should match the index of the undoList
-# The undoList always has at least one item in it: no moves means the only item is [""]
-# Note that cellstate is the state AFTER the click
-def undoredo(option, cell, cellstate, click):
-    # If the player moved
-    if option == "move":
-        # Update list to only be current move plus previous moves
-        newmovelist = []
-        for i in range(0, len(general.g_moveList)):
-            if i <= general.g_currentMove:
-                newmovelist.append(general.g_moveList[i])
-        general.g_moveList = list(newmovelist)
-
-        # Current move gets incremented 1
-        general.g_currentMove += 1
-
-        # The newest move gets added to the move list
-        general.g_moveList.append([cell, cellstate, click])
-
-    # If the player clicked undo
-    elif option == "undo":
-        # If the current move is the starting position (blank board),
-        # do nothing
-        # Otherwise:
-        if general.g_currentMove != 0:
-            # cell, cellstate, and click all equal what the current move's attributes are
-            cell = general.g_moveList[general.g_currentMove][0]
-            cellstate = general.g_moveList[general.g_currentMove][1]
-            click = general.g_moveList[general.g_currentMove][2]
-
-            # the current move gets undone on the board (in slantDict)
-            if click == "left":
-                if cellstate == 0:
-                    general.g_slantDict[cell] = 2
-                else:
-                    general.g_slantDict[cell] -= 1
-            elif click == "right":
-                if cellstate == 2:
-                    general.g_slantDict[cell] = 0
-                else:
-                    general.g_slantDict[cell] += 1
-            else:  # This should never be reached
-                print("ERROR: undoredo() -> option == undo -> if currentMove != 0 -> else")
-                sys.exit()
+    state = general.g_state
 
-            # Re-checks solved numbers and loops
-            solvednumbertest(cell)
-            loopcheckmain()
-
-            # Subtracts 1 from current move
-            general.g_currentMove -= 1
-
-    # If the player clicked redo
-    elif option == "redo":
-        # This should never be reached
-        if general.g_currentMove > len(general.g_moveList) - 1:
-            print("ERROR: undoredo() -> option == redo -> if currentMove > len(moveList) - 1")
-            sys.exit()
-
-        # If the current move is the most recent move,
-        # do nothing
-        # Otherwise:
-        elif general.g_currentMove != len(general.g_moveList) - 1:
-            # cell, cellstate, and click all equal what the next move's attributes are
-            cell = general.g_moveList[general.g_currentMove + 1][0]
-            cellstate = general.g_moveList[general.g_currentMove + 1][1]
-            click = general.g_moveList[general.g_currentMove + 1][2]
-
-            # the next move gets redone on the board (in slantDict)
-            if click == "left":
-                if cellstate == 2:
-                    general.g_slantDict[cell] = 0
-                else:
-                    general.g_slantDict[cell] += 1
-            elif click == "right":
-                if cellstate == 0:
-                    general.g_slantDict[cell] = 2
-                else:
-                    general.g_slantDict[cell] -= 1
-            else:  # This should never be reached
-                print("ERROR: undoredo() -> option == redo -> if currentMove != len(moveList) -> else")
-                sys.exit()
+    # Big boards can take the AI a few seconds, so show that it's working first
+    general.g_message = "The AI is solving..."
+    drawgame("", "none")
 
-            # Re-checks solved numbers and loops
-            solvednumbertest(cell)
-            loopcheckmain()
+    ai = solver.solve(state, general.g_aiGuessLimit)
+    if ai.s_solutions:
+        slants = ai.s_solutions[0]
+    elif ai.s_gaveUp:
+        slants = ai.s_slants
+    else:
+        slants = None
+
+    if slants is None:
+        general.g_message = "The AI found no solution for this board"
+    else:
+        for cell in range(0, len(slants)):
+            if slants[cell] != state.bs_slants[cell]:
+                aimove(cell, slants[cell])
+
+        if ai.s_solutions:
+            general.g_message = ("Solved by the AI (" + str(ai.s_nodes) + " guesses, " +
+                                 str(ai.s_backtracks) + " dead ends)")
+            # Don't show the win screen for a board the AI solved
+            general.g_alreadywon = 1
+        else:
+            general.g_message = ("The AI gave up after " + str(ai.s_nodes) + " guesses with " +
+                                 str(slants.count(0)) + " cells left")
 
-            # Adds 1 to current move
-            general.g_currentMove += 1
+    # Back to the game from the menu
+    general.g_screens.pop()
+
+
+# Sets a cell to a slant as one move, which can be undone like a click
+def aimove(cell, slant):
+    general.g_engine.move(cell, slant)
+
+
+# Undo / Redo buttons
+# The moves are kept in the engine's journal (see engine.Journal), the last g_undolimit of them
+def undoredo(option):
+    if option == "undo":
+        cell = general.g_engine.undo()
+    else:
+        cell = general.g_engine.redo()
 
     # Testing undo/redo function
     if general.g_testing_undoredo == 1:
+        moves, done = general.g_engine.e_journal.moves()
         print("Undo/Redo Testing")
-        print("Option: " + str(option))
-        print("Cell: " + str(cell) + " CellState: " + str(cellstate) + " Click: " + str(click))
-        for move in general.g_moveList:
+        print("Option: " + str(option) + " Cell: " + str(cell))
+        for move in moves:
             print(move)
-        print(
-            "Current Move: " + str(general.g_currentMove) + " | " + str(general.g_moveList[general.g_currentMove]))
+        print("Moves Done: " + str(done) + " of " + str(len(moves)))
         print("")
 
 
-# Draw the screen once per frame
-def drawgame(rfps, menu):
-    win.fill(general.g_fillColor)
-    mouse = pygame.mouse.get_pos()
+# Returns a see-through layer the size of the window, with nothing on it
+def clearlayer():
+    layer = pygame.Surface([general.g_width, general.g_height])
+    layer.fill(general.g_colorkey)
+    layer.set_colorkey(general.g_colorkey)
+    return layer.convert()
 
-    # Fill solved cells
-    for xy in general.g_slantDict:
-        slant = general.g_slantDict[xy]
-        cell = board.b_cellDict[xy]
-        if slant != 0:
-            pygame.draw.rect(win, gamescreen.gs_cell_solvedColor,
-                             [cell[0],
-                              cell[1],
-                              board.b_cell_width,
-                              board.b_cell_height])
-
-    # Light up cells on mouse over
-    general.g_cellMouseover = "none"
-    if menu == "none":
-        for c in board.b_cellDict:
-            cell = board.b_cellDict[c]
-            if ((cell[0] <= mouse[0] <= cell[0] + board.b_cell_width - gamescreen.gs_lineWidth) and
-                    cell[1] <= mouse[1] <= cell[1] + board.b_cell_height - gamescreen.gs_lineWidth):
-                pygame.draw.rect(win, gamescreen.gs_cell_hoverColor,
-                                 [cell[0],
-                                  cell[1],
-                                  board.b_cell_width,
-                                  board.b_cell_height])
-                general.g_cellMouseover = str(c)
-                break
-
-    # Draw lines
+
+# The grey that goes over the game behind a menu, made the first time a menu opens
+dimlayer = []
+
+
+def dimmer():
+    if not dimlayer:
+        translayer = pygame.Surface([general.g_width, general.g_height])
+        translayer.set_alpha(general.g_transAlpha)
+        translayer.fill(general.g_transColor)
+        dimlayer.append(translayer.convert())
+        dimlayer[0].set_alpha(general.g_transAlpha)
+    return dimlayer[0]
+
+
+# The grid lines and the bottom bar (with no buttons lit up), on a see-through layer the size of the window
+# The cells are filled in under it, and the slants and numbers go over it
+def staticlayer():
+    layer = clearlayer()
     for ln in board.b_lineList:
-        pygame.draw.line(win, gamescreen.gs_lineColor, [ln[0], ln[1]], [ln[2], ln[3]], gamescreen.gs_lineWidth)
-
-    # Draw Slants
-    # Note that it draws looped slants and normal slants to separate surfaces then blits the two so that
-    # looped slants are on top
-    loopslants = pygame.Surface([general.g_width, general.g_height])
-    loopslants.fill(general.g_colorkey)
-    loopslants.set_colorkey(general.g_colorkey)
-    normslants = pygame.Surface([general.g_width, general.g_height])
-    normslants.fill(general.g_colorkey)
-    normslants.set_colorkey(general.g_colorkey)
-    for xy in general.g_slantDict:
-        slant = general.g_slantDict[xy]
-        cellx = ""
-        celly = ""
-        celladd = "x"
-        for c in xy:
-            if c == ",":
-                celladd = "y"
-            elif celladd == "x":
-                cellx += c
-            elif celladd == "y":
-                celly += c
-
-        line_left = board.b_lineDict_x[str(int(cellx) - 1)]
-        line_right = board.b_lineDict_x[cellx]
-        line_up = board.b_lineDict_y[str(int(celly) - 1)]
-        line_down = board.b_lineDict_y[celly]
-
-        if general.g_loopDict[xy] == 1:
-            slantcolor = gamescreen.gs_slantColor_loop
-            if slant == 0:
-                pass
-            elif slant == 1:
-                pygame.draw.line(loopslants, slantcolor,
-                                 [line_left[0],
-                                  line_up[1]],
-                                 [line_right[0],
-                                  line_down[1]],
-                                 gamescreen.gs_slantWidth)
-            else:
-                pygame.draw.line(loopslants, slantcolor,
-                                 [line_left[0],
-                                  line_down[1]],
-                                 [line_right[0],
-                                  line_up[1]],
-                                 gamescreen.gs_slantWidth)
+        pygame.draw.line(layer, gamescreen.gs_lineColor, [ln[0], ln[1]], [ln[2], ln[3]], gamescreen.gs_lineWidth)
+
+    pygame.draw.rect(layer, botbar.bb_fillColor, botbar.bb_rect)
+    for button, rect in buttons["none"]:
+        drawbarbutton(layer, button, 0)
+    return layer
+
+
+# Draws a bottom bar button, lit up or not
+def drawbarbutton(surface, button, lit):
+    if lit:
+        fillcolor = botbar.bb_button_hoverColor
+    else:
+        fillcolor = botbar.bb_button_fillColor
+
+    if button == "help":
+        pygame.draw.rect(surface, botbar.bb_button_borderColor, botbar.bb_help_borderRect)
+        pygame.draw.rect(surface, fillcolor, botbar.bb_help_rect)
+        surface.blit(botbar.bb_helpText, [botbar.bb_helpText_x, botbar.bb_helpText_y])
+    elif button == "menu":
+        pygame.draw.rect(surface, botbar.bb_button_borderColor, botbar.bb_menu_borderRect)
+        pygame.draw.rect(surface, fillcolor, botbar.bb_menu_rect)
+        pygame.draw.line(surface, botbar.bb_menu_graphic_color,
+                         botbar.bb_menu_graphic1_a, botbar.bb_menu_graphic1_b, botbar.bb_menu_graphic_width)
+        pygame.draw.line(surface, botbar.bb_menu_graphic_color,
+                         botbar.bb_menu_graphic2_a, botbar.bb_menu_graphic2_b, botbar.bb_menu_graphic_width)
+        pygame.draw.line(surface, botbar.bb_menu_graphic_color,
+                         botbar.bb_menu_graphic3_a, botbar.bb_menu_graphic3_b, botbar.bb_menu_graphic_width)
+    elif button == "undo":
+        pygame.draw.rect(surface, botbar.bb_button_borderColor, botbar.bb_undo_borderRect)
+        pygame.draw.rect(surface, fillcolor, botbar.bb_undo_rect)
+        surface.blit(botbar.bb_undo_graphic_file, [botbar.bb_undo_graphic_x, botbar.bb_undo_graphic_y])
+    elif button == "redo":
+        pygame.draw.rect(surface, botbar.bb_button_borderColor, botbar.bb_redo_borderRect)
+        pygame.draw.rect(surface, fillcolor, botbar.bb_redo_rect)
+        surface.blit(botbar.bb_redo_graphic_file, [botbar.bb_redo_graphic_x, botbar.bb_redo_graphic_y])
+
+
+# Returns the cell under the mouse, or -1 if there isn't one
+# Worked out from the cell size, so it doesn't have to look through every cell. The lines between cells don't count
+def cellat(mouse):
+    x = mouse[0] - board.b_gridx
+    y = mouse[1] - board.b_gridy
+    if x < 0 or y < 0:
+        return -1
+    cellx = x // board.b_cell_width
+    celly = y // board.b_cell_height
+    if cellx >= board.b_width or celly >= board.b_height:
+        return -1
+    if (x % board.b_cell_width > board.b_cell_width - gamescreen.gs_lineWidth or
+            y % board.b_cell_height > board.b_cell_height - gamescreen.gs_lineWidth):
+        return -1
+    return (celly * board.b_width) + cellx
+
+
+# Draws the slant in a cell
+def drawslant(surface, c, looped):
+    cellx, celly = general.g_state.cellxy(c)
+    margin = gamescreen.gs_slantWidth
+    picture = board.b_slantPictures[looped][general.g_state.bs_slants[c]]
+    surface.blit(picture, [board.b_lineList_x[cellx - 1][0] - margin, board.b_lineList_y[celly - 1][1] - margin])
+
+
+# The part of the window a cell's fill and slant can reach, with its lines
+def cellrect(c):
+    margin = max(gamescreen.gs_lineWidth, gamescreen.gs_slantWidth)
+    x = board.b_bufferx + ((c % board.b_width) * board.b_cell_width) - margin
+    y = board.b_buffery + ((c // board.b_width) * board.b_cell_height) - margin
+    return pygame.Rect(x, y, board.b_cell_width + (margin * 2), board.b_cell_height + (margin * 2))
+
+
+# The part of the window the picture of the number on a lattice point covers
+def glyphrect(point):
+    x, y = general.g_state.pointxy(point)
+    middle = board.b_clueGlyphs[0][general.g_state.bs_clues[point]][1]
+    return pygame.Rect(board.b_bufferx + (x * board.b_cell_width) - middle,
+                       board.b_buffery + (y * board.b_cell_height) - middle, (middle * 2) + 1, (middle * 2) + 1)
+
+
+# Returns [left, right, top, bottom] of the cells that can reach into the rect: the ones it covers and one more all
+# around, for slants that stick out. left > right or top > bottom if there aren't any
+def cellsin(rect):
+    left = max(0, ((rect[0] - board.b_bufferx) // board.b_cell_width) - 1)
+    right = min(board.b_width - 1, ((rect[0] + rect[2] - board.b_bufferx) // board.b_cell_width) + 1)
+    top = max(0, ((rect[1] - board.b_buffery) // board.b_cell_height) - 1)
+    bottom = min(board.b_height - 1, ((rect[1] + rect[3] - board.b_buffery) // board.b_cell_height) + 1)
+    return [left, right, top, bottom]
+
+
+# Draws the slants that reach into the rect again on the slant layers, after the slant or loop of a cell there changed
+# With no rect, draws every slant on the board again
+def drawslantlayers(rect=None):
+    state = general.g_state
+    slants = state.bs_slants
+    loops = general.g_loopChecker.lc_loops
+    if rect is None:
+        left, right, top, bottom = [0, board.b_width - 1, 0, board.b_height - 1]
+    else:
+        left, right, top, bottom = cellsin(rect)
+    for looped, layer in [[0, board.b_normLayer], [1, board.b_loopLayer]]:
+        layer.set_clip(rect)
+        layer.fill(general.g_colorkey)
+        for y in range(top, bottom + 1):
+            for c in range((y * board.b_width) + left, (y * board.b_width) + right + 1):
+                if slants[c] != 0 and loops[c] == looped:
+                    drawslant(layer, c, looped)
+        layer.set_clip(None)
+
+
+# Draws one part of the game screen (without a menu) the way a full frame would, clipped to the rect
+# Only the cells, lines, slants and numbers that can reach into the rect get drawn
+# texts = [[picture, x / y], ...] drawn last, for the message and the FPS
+def drawregion(rect, hover, button, texts):
+    state = general.g_state
+    slants = state.bs_slants
+    width = board.b_width
+    win.set_clip(rect)
+    win.fill(general.g_fillColor)
+
+    left, right, top, bottom = cellsin(rect)
+    cells = []
+    for y in range(top, bottom + 1):
+        cells.extend(range((y * width) + left, (y * width) + right + 1))
+
+    # Fill solved cells, and light up the one under the mouse
+    for c in cells:
+        if c == hover:
+            color = gamescreen.gs_cell_hoverColor
+        elif slants[c] != 0:
+            color = gamescreen.gs_cell_solvedColor
         else:
-            slantcolor = gamescreen.gs_slantColor
-            if slant == 0:
-                pass
-            elif slant == 1:
-                pygame.draw.line(normslants, slantcolor,
-                                 [line_left[0],
-                                  line_up[1]],
-                                 [line_right[0],
-                                  line_down[1]],
-                                 gamescreen.gs_slantWidth)
-            else:
-                pygame.draw.line(normslants, slantcolor,
-                                 [line_left[0],
-                                  line_down[1]],
-                                 [line_right[0],
-                                  line_up[1]],
-                                 gamescreen.gs_slantWidth)
-    win.blit(normslants, [0, 0])
-    win.blit(loopslants, [0, 0])
-
-    # Draw numbers
-    for y in range(0, board.b_height + 1):
-        for x in range(0, board.b_width + 1):
-            try:
-                num = board.b_numMatrix[y][x]
-            except IndexError:
-                pass
-            else:
-                if num != "x":
-                    if num == "0":
-                        adjust = board.b_adjust0
-                    elif num == "1":
-                        adjust = board.b_adjust1
-                    elif num == "2":
-                        adjust = board.b_adjust2
-                    elif num == "3":
-                        adjust = board.b_adjust3
-                    else:
-                        adjust = board.b_adjust4
-
-                    # Check if the number is solved or not
-                    state = general.g_solvedMatrix[y][x]
-                    if state == "0":
-                        circlecolor = gamescreen.gs_circleOutlineColor_neutral
-                        circlefill = general.g_fillColor
-                        numcolor = gamescreen.gs_numColor_neutral
-                    elif state == "1":
-                        circlecolor = gamescreen.gs_circleOutlineColor_solved
-                        circlefill = gamescreen.gs_circleFillColor_solved
-                        numcolor = gamescreen.gs_numColor_solved
-                    else:
-                        circlecolor = gamescreen.gs_circleOutlineColor_wrong
-                        circlefill = gamescreen.gs_circleFillColor_wrong
-                        numcolor = gamescreen.gs_numColor_wrong
-
-                    numx = int(board.b_bufferx + (x * board.b_cell_width))
+            continue
+        cell = board.b_cellList[c]
+        pygame.draw.rect(win, color, [cell[0], cell[1], board.b_cell_width, board.b_cell_height])
+
+    # Lines and bottom bar
+    win.blit(board.b_staticLayer, rect, rect)
+    if button != "":
+        drawbarbutton(win, button, 1)
+
+    # Slants, with looped slants on top
+    win.blit(board.b_normLayer, rect, rect)
+    win.blit(board.b_loopLayer, rect, rect)
+
+    # Numbers (circle and number in one picture, for how solved it is) on the corners of those cells
+    if cells:
+        pw = state.bs_pointWidth
+        for y in range(top, bottom + 2):
+            for point in range((y * pw) + left, (y * pw) + right + 2):
+                if state.bs_clues[point] != -1:
+                    glyph, middle = board.b_clueGlyphs[state.bs_status[point]][state.bs_clues[point]]
+                    numx = int(board.b_bufferx + ((point - (y * pw)) * board.b_cell_width))
                     numy = int(board.b_buffery + (y * board.b_cell_height))
-                    pygame.draw.circle(win, circlefill, [numx, numy], board.b_circleRadius)
-                    pygame.draw.circle(win, circlecolor, [numx, numy],
-                                       board.b_circleRadius, gamescreen.gs_circleWidth)
-                    numfont = pygame.font.Font(gamescreen.gs_numFont, board.b_num_textSize)
-                    numtext = numfont.render(num, 1, numcolor)
-                    numw = numtext.get_rect().width
-                    numh = numtext.get_rect().height
-                    win.blit(numtext, [numx - (numw / 2) + adjust, numy - (numh / 2)])
-
-    # Draw bottom bar
-    pygame.draw.rect(win, botbar.bb_fillColor, botbar.bb_rect)
-
-    # Draw bottom bar Help Button
-    pygame.draw.rect(win, botbar.bb_button_borderColor, botbar.bb_help_borderRect)
-    pygame.draw.rect(win, botbar.bb_button_fillColor, botbar.bb_help_rect)
-    if menu == "none":
-        if ((botbar.bb_help_borderRect[0] <= mouse[0] <=
-             botbar.bb_help_borderRect[0] + botbar.bb_help_borderRect[2]) and
-                (botbar.bb_help_borderRect[1] <= mouse[1] <=
-                 botbar.bb_help_borderRect[1] + botbar.bb_help_borderRect[3])):
-            pygame.draw.rect(win, botbar.bb_button_hoverColor, botbar.bb_help_rect)
+                    win.blit(glyph, [numx - middle, numy - middle])
 
-    win.blit(botbar.bb_helpText, [botbar.bb_helpText_x, botbar.bb_helpText_y])
+    for text, pos in texts:
+        win.blit(text, pos)
+    win.set_clip(None)
 
-    # Draw bottom bar Menu Button
-    pygame.draw.rect(win, botbar.bb_button_borderColor, botbar.bb_menu_borderRect)
-    pygame.draw.rect(win, botbar.bb_button_fillColor, botbar.bb_menu_rect)
-    if menu == "none":
-        if ((botbar.bb_menu_borderRect[0] <= mouse[0] <=
-             botbar.bb_menu_borderRect[0] + botbar.bb_menu_borderRect[2]) and
-                (botbar.bb_menu_borderRect[1] <= mouse[1] <=
-                 botbar.bb_menu_borderRect[1] + botbar.bb_menu_borderRect[3])):
-            pygame.draw.rect(win, botbar.bb_button_hoverColor, botbar.bb_menu_rect)
-
-    pygame.draw.line(win, botbar.bb_menu_graphic_color,
-                     botbar.bb_menu_graphic1_a, botbar.bb_menu_graphic1_b, botbar.bb_menu_graphic_width)
-    pygame.draw.line(win, botbar.bb_menu_graphic_color,
-                     botbar.bb_menu_graphic2_a, botbar.bb_menu_graphic2_b, botbar.bb_menu_graphic_width)
-    pygame.draw.line(win, botbar.bb_menu_graphic_color,
-                     botbar.bb_menu_graphic3_a, botbar.bb_menu_graphic3_b, botbar.bb_menu_graphic_width)
-
-    # Draw bottom bar Undo Button
-    pygame.draw.rect(win, botbar.bb_button_borderColor, botbar.bb_undo_borderRect)
-    pygame.draw.rect(win, botbar.bb_button_fillColor, botbar.bb_undo_rect)
-    if menu == "none":
-        if ((botbar.bb_undo_borderRect[0] <= mouse[0] <=
-             botbar.bb_undo_borderRect[0] + botbar.bb_undo_borderRect[2]) and
-                (botbar.bb_undo_borderRect[1] <= mouse[1] <=
-                 botbar.bb_undo_borderRect[1] + botbar.bb_undo_borderRect[3])):
-            pygame.draw.rect(win, botbar.bb_button_hoverColor, botbar.bb_undo_rect)
 
-    win.blit(botbar.bb_undo_graphic_file, [botbar.bb_undo_graphic_x, botbar.bb_undo_graphic_y])
+# The rect a menu is drawn in
+def menurect(menu):
+    if menu == "help":
+        return helpmenu.hm_borderRect
+    elif menu == "menu":
+        return gamemenu.gm_borderRect
+    elif menu == "new":
+        return newgame.ng_borderRect
+    else:
+        return winscreen.ws_borderRect
+
 
-    # Draw bottom bar Redo Button
-    pygame.draw.rect(win, botbar.bb_button_borderColor, botbar.bb_redo_borderRect)
-    pygame.draw.rect(win, botbar.bb_button_fillColor, botbar.bb_redo_rect)
-    if menu == "none":
-        if ((botbar.bb_redo_borderRect[0] <= mouse[0] <=
-             botbar.bb_redo_borderRect[0] + botbar.bb_redo_borderRect[2]) and
-                (botbar.bb_redo_borderRect[1] <= mouse[1] <=
-                 botbar.bb_redo_borderRect[1] + botbar.bb_redo_borderRect[3])):
-            pygame.draw.rect(win, botbar.bb_button_hoverColor, botbar.bb_redo_rect)
+# Draw the screen once per frame
+# The game screen is kept from the last frame, and only the parts that changed get drawn again: cells whose slant,
+# loop or hover changed, numbers whose solve state changed, the bottom bar button the mouse came onto or left, and the
+# message and FPS. Only those parts of the window are updated. A new board, or going back from a menu, draws everything
+# A menu only draws itself over the greyed out game, which is kept from when it opened
+def drawgame(rfps, menu):
+    mouse = pygame.mouse.get_pos()
+    state = general.g_state
+    slants = state.bs_slants
+    loops = general.g_loopChecker.lc_loops
 
-    win.blit(botbar.bb_redo_graphic_file, [botbar.bb_redo_graphic_x, botbar.bb_redo_graphic_y])
+    # Light up cells and buttons on mouse over
+    general.g_cellMouseover = -1
+    if menu == "none":
+        general.g_cellMouseover = cellat(mouse)
+    hover = general.g_cellMouseover
+    button = buttonat(menu, mouse)
+
+    # Message and FPS (for testing)
+    texts = []
+    messagerect = None
+    if general.g_message != "":
+        messagetext = gamescreen.gs_messageFont.render(general.g_message, 1, gamescreen.gs_message_textColor)
+        messagetext_w = messagetext.get_rect().width
+        messagepos = [int((general.g_width / 2) - (messagetext_w / 2)), gamescreen.gs_message_buffery]
+        texts.append([messagetext, messagepos])
+        messagerect = messagetext.get_rect(topleft=messagepos)
+    fpsrect = None
+    if general.g_testing_fps == 1:
+        if gamescreen.gs_fpsFont is None:
+            gamescreen.gs_fpsFont = pygame.font.SysFont("default", 20)
+        fpstxt = gamescreen.gs_fpsFont.render(rfps, 1, [0, 255, 0])
+        texts.append([fpstxt, [10, 10]])
+        fpsrect = fpstxt.get_rect(topleft=[10, 10])
+
+    # Bring the slant layers up to date with the cells whose slant or loop changed
+    # changed = the parts of the window those cells and the numbers that changed cover
+    changed = []
+    if board.b_drawnSlants is None:
+        drawslantlayers()
+    else:
+        if slants != board.b_drawnSlants or loops != board.b_drawnLoops:
+            drawnslants = board.b_drawnSlants
+            drawnloops = board.b_drawnLoops
+            for c in range(0, len(slants)):
+                if slants[c] != drawnslants[c] or loops[c] != drawnloops[c]:
+                    rect = cellrect(c)
+                    drawslantlayers(rect)
+                    changed.append(rect)
+        if state.bs_status != board.b_drawnStatus:
+            drawnstatus = board.b_drawnStatus
+            for point in state.bs_cluePoints:
+                if state.bs_status[point] != drawnstatus[point]:
+                    changed.append(glyphrect(point))
+
+    # The message and the FPS, if they changed
+    textrects = []
+    if general.g_message != board.b_drawnMessage[0]:
+        for rect in [board.b_drawnMessage[1], messagerect]:
+            if rect is not None:
+                textrects.append(rect)
+    for rect in [board.b_drawnFps, fpsrect]:
+        if rect is not None:
+            textrects.append(rect)
+
+    if menu != "none":
+        # The game behind a menu only gets drawn and greyed out when the menu opens, and is copied from then on
+        # Under a menu, the message and FPS go over it instead
+        if menu != board.b_drawnMenu or changed or board.b_drawnSlants is None:
+            rects = [win.get_rect()]
+            drawregion(rects[0], -1, "", [])
+            win.blit(dimmer(), [0, 0])
+            board.b_backdrop.blit(win, [0, 0])
+        else:
+            # The message goes over the menu every frame, so it's drawn again even if it didn't change
+            rects = [pygame.Rect(menurect(menu))] + textrects
+            if messagerect is not None:
+                rects.append(messagerect)
+            for rect in rects:
+                win.blit(board.b_backdrop, rect, rect)
+    elif board.b_drawnMenu != "none" or board.b_drawnSlants is None:
+        rects = [win.get_rect()]
+        drawregion(rects[0], hover, button, texts)
+    else:
+        rects = changed + textrects
+        if hover != board.b_drawnHover:
+            for c in [board.b_drawnHover, hover]:
+                if c != -1:
+                    rects.append(cellrect(c))
+        if button != board.b_drawnButton:
+            for b in [board.b_drawnButton, button]:
+                if b != "":
+                    rects.append(pygame.Rect(buttonrect("none", b)))
+        for rect in rects:
+            drawregion(rect, hover, button, texts)
+
+    board.b_drawnSlants = bytearray(slants)
+    board.b_drawnLoops = bytearray(loops)
+    board.b_drawnStatus = bytearray(state.bs_status)
+    board.b_drawnHover = hover
+    board.b_drawnButton = button
+    board.b_drawnMenu = menu
+    board.b_drawnMessage = [general.g_message, messagerect]
+    board.b_drawnFps = fpsrect
 
     # Draw Help Menu
     if menu == "help":
-        # Grey out the screen behind
-        translayer = pygame.Surface([general.g_width, general.g_height])
-        translayer.set_alpha(general.g_transAlpha)
-        translayer.fill(general.g_transColor)
-        win.blit(translayer, [0, 0])
+        helpmenu.render()
 
         # Menu block
         pygame.draw.rect(win, helpmenu.hm_borderColor, helpmenu.hm_borderRect)
@@ -2156,10 +2034,7 @@ def drawgame(rfps, menu):
         # X Button
         pygame.draw.rect(win, helpmenu.hm_x_borderColor, helpmenu.hm_x_borderRect)
         pygame.draw.rect(win, helpmenu.hm_x_fillColor, helpmenu.hm_x_rect)
-        if ((helpmenu.hm_x_borderRect[0] <= mouse[0] <=
-             helpmenu.hm_x_borderRect[0] + helpmenu.hm_x_borderRect[2]) and
-                (helpmenu.hm_x_borderRect[1] <= mouse[1] <=
-                 helpmenu.hm_x_borderRect[1] + helpmenu.hm_x_borderRect[3])):
+        if button == "x":
             pygame.draw.rect(win, helpmenu.hm_x_hoverColor, helpmenu.hm_x_rect)
         win.blit(helpmenu.hm_xText, [helpmenu.hm_xText_x, helpmenu.hm_xText_y])
 
@@ -2176,11 +2051,7 @@ def drawgame(rfps, menu):
 
     # Draw Game Menu
     if menu == "menu":
-        # Grey out the screen behind
-        translayer = pygame.Surface([general.g_width, general.g_height])
-        translayer.set_alpha(general.g_transAlpha)
-        translayer.fill(general.g_transColor)
-        win.blit(translayer, [0, 0])
+        gamemenu.render()
 
         # Menu block
         pygame.draw.rect(win, gamemenu.gm_borderColor, gamemenu.gm_borderRect)
@@ -2193,46 +2064,31 @@ def drawgame(rfps, menu):
         # Main Menu
         pygame.draw.rect(win, gamemenu.gm_button_borderColor, gamemenu.gm_mainmenu_borderRect)
         pygame.draw.rect(win, gamemenu.gm_button_fillColor, gamemenu.gm_mainmenu_rect)
-        if ((gamemenu.gm_mainmenu_borderRect[0] <= mouse[0] <=
-             gamemenu.gm_mainmenu_borderRect[0] + gamemenu.gm_mainmenu_borderRect[2]) and
-                (gamemenu.gm_mainmenu_borderRect[1] <= mouse[1] <=
-                 gamemenu.gm_mainmenu_borderRect[1] + gamemenu.gm_mainmenu_borderRect[3])):
+        if button == "mainmenu":
             pygame.draw.rect(win, gamemenu.gm_button_hoverColor, gamemenu.gm_mainmenu_rect)
 
         # New Game
         pygame.draw.rect(win, gamemenu.gm_button_borderColor, gamemenu.gm_newgame_borderRect)
         pygame.draw.rect(win, gamemenu.gm_button_fillColor, gamemenu.gm_newgame_rect)
-        if ((gamemenu.gm_newgame_borderRect[0] <= mouse[0] <=
-             gamemenu.gm_newgame_borderRect[0] + gamemenu.gm_newgame_borderRect[2]) and
-                (gamemenu.gm_newgame_borderRect[1] <= mouse[1] <=
-                 gamemenu.gm_newgame_borderRect[1] + gamemenu.gm_newgame_borderRect[3])):
+        if button == "newgame":
             pygame.draw.rect(win, gamemenu.gm_button_hoverColor, gamemenu.gm_newgame_rect)
 
         # Restart
         pygame.draw.rect(win, gamemenu.gm_button_borderColor, gamemenu.gm_restart_borderRect)
         pygame.draw.rect(win, gamemenu.gm_button_fillColor, gamemenu.gm_restart_rect)
-        if ((gamemenu.gm_restart_borderRect[0] <= mouse[0] <=
-             gamemenu.gm_restart_borderRect[0] + gamemenu.gm_restart_borderRect[2]) and
-                (gamemenu.gm_restart_borderRect[1] <= mouse[1] <=
-                 gamemenu.gm_restart_borderRect[1] + gamemenu.gm_restart_borderRect[3])):
+        if button == "restart":
             pygame.draw.rect(win, gamemenu.gm_button_hoverColor, gamemenu.gm_restart_rect)
 
         # Solve with AI
         pygame.draw.rect(win, gamemenu.gm_button_borderColor, gamemenu.gm_ai_borderRect)
         pygame.draw.rect(win, gamemenu.gm_button_fillColor, gamemenu.gm_ai_rect)
-        if ((gamemenu.gm_ai_borderRect[0] <= mouse[0] <=
-             gamemenu.gm_ai_borderRect[0] + gamemenu.gm_ai_borderRect[2]) and
-                (gamemenu.gm_ai_borderRect[1] <= mouse[1] <=
-                 gamemenu.gm_ai_borderRect[1] + gamemenu.gm_ai_borderRect[3])):
+        if button == "ai":
             pygame.draw.rect(win, gamemenu.gm_button_hoverColor, gamemenu.gm_ai_rect)
 
         # Back
         pygame.draw.rect(win, gamemenu.gm_button_borderColor, gamemenu.gm_back_borderRect)
         pygame.draw.rect(win, gamemenu.gm_button_fillColor, gamemenu.gm_back_rect)
-        if ((gamemenu.gm_back_borderRect[0] <= mouse[0] <=
-             gamemenu.gm_back_borderRect[0] + gamemenu.gm_back_borderRect[2]) and
-                (gamemenu.gm_back_borderRect[1] <= mouse[1] <=
-                 gamemenu.gm_back_borderRect[1] + gamemenu.gm_back_borderRect[3])):
+        if button == "back":
             pygame.draw.rect(win, gamemenu.gm_button_hoverColor, gamemenu.gm_back_rect)
 
         # Button Text
@@ -2244,11 +2100,7 @@ def drawgame(rfps, menu):
 
     # New Game menu
     if menu == "new":
-        # Grey out the screen behind
-        translayer = pygame.Surface([general.g_width, general.g_height])
-        translayer.set_alpha(general.g_transAlpha)
-        translayer.fill(general.g_transColor)
-        win.blit(translayer, [0, 0])
+        newgame.render()
 
         # Menu block
         pygame.draw.rect(win, newgame.ng_borderColor, newgame.ng_borderRect)
@@ -2265,10 +2117,7 @@ def drawgame(rfps, menu):
         pygame.draw.rect(win, newgame.ng_inputBox_borderColor, newgame.ng_width_borderRect)
         if general.g_widthActive == 0:
             pygame.draw.rect(win, newgame.ng_inputBox_fillColor, newgame.ng_width_rect)
-            if ((newgame.ng_width_borderRect[0] <= mouse[0] <=
-                 newgame.ng_width_borderRect[0] + newgame.ng_width_borderRect[2]) and
-                    (newgame.ng_width_borderRect[1] <= mouse[1] <=
-                     newgame.ng_width_borderRect[1] + newgame.ng_width_borderRect[3])):
+            if button == "width":
                 pygame.draw.rect(win, newgame.ng_inputBox_hoverColor, newgame.ng_width_rect)
         else:
             pygame.draw.rect(win, newgame.ng_inputBox_hoverColor, newgame.ng_width_rect)
@@ -2283,10 +2132,7 @@ def drawgame(rfps, menu):
         pygame.draw.rect(win, newgame.ng_inputBox_borderColor, newgame.ng_height_borderRect)
         if general.g_heightActive == 0:
             pygame.draw.rect(win, newgame.ng_inputBox_fillColor, newgame.ng_height_rect)
-            if ((newgame.ng_height_borderRect[0] <= mouse[0] <=
-                 newgame.ng_height_borderRect[0] + newgame.ng_height_borderRect[2]) and
-                    (newgame.ng_height_borderRect[1] <= mouse[1] <=
-                     newgame.ng_height_borderRect[1] + newgame.ng_height_borderRect[3])):
+            if button == "height":
                 pygame.draw.rect(win, newgame.ng_inputBox_hoverColor, newgame.ng_height_rect)
         else:
             pygame.draw.rect(win, newgame.ng_inputBox_hoverColor, newgame.ng_height_rect)
@@ -2301,10 +2147,7 @@ def drawgame(rfps, menu):
         pygame.draw.rect(win, newgame.ng_button_borderColor, newgame.ng_okay_borderRect)
         if general.g_widthActive == 0 and general.g_heightActive == 0:
             pygame.draw.rect(win, newgame.ng_button_fillColor, newgame.ng_okay_rect)
-            if ((newgame.ng_okay_borderRect[0] <= mouse[0] <=
-                 newgame.ng_okay_borderRect[0] + newgame.ng_okay_borderRect[2]) and
-                    (newgame.ng_okay_borderRect[1] <= mouse[1] <=
-                     newgame.ng_okay_borderRect[1] + newgame.ng_okay_borderRect[3])):
+            if button == "okay":
                 pygame.draw.rect(win, newgame.ng_button_hoverColor, newgame.ng_okay_rect)
         else:
             pygame.draw.rect(win, newgame.ng_button_noclickColor, newgame.ng_okay_rect)
@@ -2313,10 +2156,7 @@ def drawgame(rfps, menu):
         # Back Button
         pygame.draw.rect(win, newgame.ng_button_borderColor, newgame.ng_back_borderRect)
         pygame.draw.rect(win, newgame.ng_button_fillColor, newgame.ng_back_rect)
-        if ((newgame.ng_back_borderRect[0] <= mouse[0] <=
-             newgame.ng_back_borderRect[0] + newgame.ng_back_borderRect[2]) and
-                (newgame.ng_back_borderRect[1] <= mouse[1] <=
-                 newgame.ng_back_borderRect[1] + newgame.ng_back_borderRect[3])):
+        if button == "back":
             pygame.draw.rect(win, newgame.ng_button_hoverColor, newgame.ng_back_rect)
         win.blit(newgame.ng_backText, [newgame.ng_backText_x, newgame.ng_backText_y])
 
@@ -2326,11 +2166,7 @@ def drawgame(rfps, menu):
 
     # Win Screen
     if menu == "win":
-        # Grey out the screen behind
-        translayer = pygame.Surface([general.g_width, general.g_height])
-        translayer.set_alpha(general.g_transAlpha)
-        translayer.fill(general.g_transColor)
-        win.blit(translayer, [0, 0])
+        winscreen.render()
 
         # Menu block
         pygame.draw.rect(win, winscreen.ws_borderColor, winscreen.ws_borderRect)
@@ -2342,137 +2178,157 @@ def drawgame(rfps, menu):
         # New Game
         pygame.draw.rect(win, winscreen.ws_button_borderColor, winscreen.ws_newgame_borderRect)
         pygame.draw.rect(win, winscreen.ws_button_fillColor, winscreen.ws_newgame_rect)
-        if ((winscreen.ws_newgame_borderRect[0] <= mouse[0] <=
-             winscreen.ws_newgame_borderRect[0] + winscreen.ws_newgame_borderRect[2]) and
-                (winscreen.ws_newgame_borderRect[1] <= mouse[1] <=
-                 winscreen.ws_newgame_borderRect[1] + winscreen.ws_newgame_borderRect[3])):
+        if button == "newgame":
             pygame.draw.rect(win, winscreen.ws_button_hoverColor, winscreen.ws_newgame_rect)
         win.blit(winscreen.ws_newgameText, [winscreen.ws_newgameText_x, winscreen.ws_newgameText_y])
 
         # Main Menu
         pygame.draw.rect(win, winscreen.ws_button_borderColor, winscreen.ws_mainmenu_borderRect)
         pygame.draw.rect(win, winscreen.ws_button_fillColor, winscreen.ws_mainmenu_rect)
-        if ((winscreen.ws_mainmenu_borderRect[0] <= mouse[0] <=
-             winscreen.ws_mainmenu_borderRect[0] + winscreen.ws_mainmenu_borderRect[2]) and
-                (winscreen.ws_mainmenu_borderRect[1] <= mouse[1] <=
-                 winscreen.ws_mainmenu_borderRect[1] + winscreen.ws_mainmenu_borderRect[3])):
+        if button == "mainmenu":
             pygame.draw.rect(win, winscreen.ws_button_hoverColor, winscreen.ws_mainmenu_rect)
         win.blit(winscreen.ws_mainmenuText, [winscreen.ws_mainmenuText_x, winscreen.ws_mainmenuText_y])
 
         # Back
         pygame.draw.rect(win, winscreen.ws_button_borderColor, winscreen.ws_back_borderRect)
         pygame.draw.rect(win, winscreen.ws_button_fillColor, winscreen.ws_back_rect)
-        if ((winscreen.ws_back_borderRect[0] <= mouse[0] <=
-             winscreen.ws_back_borderRect[0] + winscreen.ws_back_borderRect[2]) and
-                (winscreen.ws_back_borderRect[1] <= mouse[1] <=
-                 winscreen.ws_back_borderRect[1] + winscreen.ws_back_borderRect[3])):
+        if button == "back":
             pygame.draw.rect(win, winscreen.ws_button_hoverColor, winscreen.ws_back_rect)
         win.blit(winscreen.ws_backText, [winscreen.ws_backText_x, winscreen.ws_backText_y])
 
-    # Draw FPS (for testing)
-    if general.g_testing_fps == 1:
-        fnt = pygame.font.SysFont("default", 20)
-        fpstxt = fnt.render(rfps, 1, [0, 255, 0])
-        win.blit(fpstxt, [10, 10])
+    # The message and FPS go over the menus too
+    if menu != "none":
+        for text, pos in texts:
+            win.blit(text, pos)
 
     # Display Update
-    pygame.display.update()
+    pygame.display.update(rects)
+
+
+# Draws a frame of a screen, at most g_fps times a second
+# However many mouse movements come in between, they only get drawn once
+def drawframe(menu):
+    clock.tick(general.g_fps)
+    framelength = max(1, clock.get_time())
+    realfps = str(int(1000 / framelength))
+    drawgame(realfps, menu)
+
+
+# Waits for input and returns it, so the screens only draw a frame when something happened
+# While the player is thinking, the game sleeps here instead of drawing the same frame over and over. It still wakes
+# up after g_idleWait ms with no events, and the screen draws a frame then
+def nextevents():
+    event = pygame.event.wait(general.g_idleWait)
+    events = pygame.event.get()
+    if event.type != pygame.NOEVENT:
+        events.insert(0, event)
+    return events
+
+
+# Game screen, with no menu open
+def gameevent(event):
+    # Click Handling
+    # The cell is found again where the click was, since the mouse can move between frames
+    if event.type == pygame.MOUSEBUTTONDOWN:
+        general.g_cellMouseover = cellat(event.pos)
+        if event.button == 1:
+            clicked = buttonat("none", event.pos)
+            # Left Click slant change
+            if general.g_cellMouseover != -1:
+                general.g_message = ""
+                general.g_engine.turn(general.g_cellMouseover, "left")
+
+            # Help Button click
+            if clicked == "help":
+                general.g_screens.append("help")
+
+            # Menu Button click
+            if clicked == "menu":
+                general.g_screens.append("menu")
+
+            # Undo Button click
+            if clicked == "undo":
+                undoredo("undo")
+
+            # Redo Button click
+            if clicked == "redo":
+                undoredo("redo")
+
+        if event.button == 3:
+            # Right Click slant change
+            if general.g_cellMouseover != -1:
+                general.g_message = ""
+                general.g_engine.turn(general.g_cellMouseover, "right")
+
+        # Testing Loops
+        if event.button == 2:
+            if general.g_testing_loops == 1:
+                if general.g_cellMouseover != -1:
+                    checker = general.g_loopChecker
+                    index = general.g_cellMouseover
+                    slant = general.g_state.bs_slants[index]
+                    print("Loop: " + str(checker.lc_loops[index]))
+                    if slant != 0:
+                        point = checker.endpoints(index, slant)[0]
+                        print("Group: " + str(checker.find(point)))
+                    print("")
+
+        # Testing Winscreen
+        if event.button == 7:
+            if general.g_testing_winscreen == 1:
+                general.g_screens.append("win")
+
+        # Slant change Win Check
+        if general.g_cellMouseover != -1:
+            if general.g_state.bs_slants[general.g_cellMouseover] != 0:
+                wincheck()
+
+
+# What each screen does with an event, by its name in g_screens
+screenevents = {"none": gameevent,
+                "help": helpevent,
+                "menu": menuevent,
+                "new": newgameevent,
+                "win": winevent}
 
 
 # Main gameloop
+# The only loop in the game. The open screens are a stack in g_screens, with the game ("none") at the bottom: a menu
+# opens by being pushed over the screen it was opened from, and goes back to it by being popped. Only the top screen
+# is drawn and handed the events, so switching screens never calls into another screen's loop
 def gameloop():
     while 1:
-        clock.tick(general.g_fps)
-        framelength = clock.get_time()
-        realfps = str(int(1000 / framelength))
-        mouse = pygame.mouse.get_pos()
-        drawgame(realfps, "none")
+        drawframe(general.g_screens[-1])
 
-        for event in pygame.event.get():
+        for event in nextevents():
             if event.type == pygame.QUIT:
                 sys.exit()
+            screenevents[general.g_screens[-1]](event)
+
 
-            # Click Handling
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:
-                    # Left Click slant change
-                    if general.g_cellMouseover != "none":
-                        if general.g_slantDict[general.g_cellMouseover] == 2:
-                            general.g_slantDict[general.g_cellMouseover] = 0
-                        else:
-                            general.g_slantDict[general.g_cellMouseover] += 1
-                        solvednumbertest(general.g_cellMouseover)
-                        loopcheckmain()
-                        undoredo("move", general.g_cellMouseover,
-                                 general.g_slantDict[general.g_cellMouseover], "left")
-
-                    # Help Button click
-                    if ((botbar.bb_help_borderRect[0] <= mouse[0] <=
-                         botbar.bb_help_borderRect[0] + botbar.bb_help_borderRect[2]) and
-                            (botbar.bb_help_borderRect[1] <= mouse[1] <=
-                             botbar.bb_help_borderRect[1] + botbar.bb_help_borderRect[3])):
-                        helpbutton()
-
-                    # Menu Button click
-                    if ((botbar.bb_menu_borderRect[0] <= mouse[0] <=
-                         botbar.bb_menu_borderRect[0] + botbar.bb_menu_borderRect[2]) and
-                            (botbar.bb_menu_borderRect[1] <= mouse[1] <=
-                             botbar.bb_menu_borderRect[1] + botbar.bb_menu_borderRect[3])):
-                        menuscreen()
-
-                    # Undo Button click
-                    if ((botbar.bb_undo_borderRect[0] <= mouse[0] <=
-                         botbar.bb_undo_borderRect[0] + botbar.bb_undo_borderRect[2]) and
-                            (botbar.bb_undo_borderRect[1] <= mouse[1] <=
-                             botbar.bb_undo_borderRect[1] + botbar.bb_undo_borderRect[3])):
-                        undoredo("undo", "", 0, "")
-
-                    # Redo Button click
-                    if ((botbar.bb_redo_borderRect[0] <= mouse[0] <=
-                         botbar.bb_redo_borderRect[0] + botbar.bb_redo_borderRect[2]) and
-                            (botbar.bb_redo_borderRect[1] <= mouse[1] <=
-                             botbar.bb_redo_borderRect[1] + botbar.bb_redo_borderRect[3])):
-                        undoredo("redo", "", 0, "")
-
-                if event.button == 3:
-                    # Right Click slant change
-                    if general.g_cellMouseover != "none":
-                        if general.g_slantDict[general.g_cellMouseover] == 0:
-                            general.g_slantDict[general.g_cellMouseover] = 2
-                        else:
-                            general.g_slantDict[general.g_cellMouseover] -= 1
-                        solvednumbertest(general.g_cellMouseover)
-                        loopcheckmain()
-                        undoredo("move", general.g_cellMouseover,
-                                 general.g_slantDict[general.g_cellMouseover], "right")
-
-                # Testing Loops
-                if event.button == 2:
-                    if general.g_testing_loops == 1:
-                        if general.g_cellMouseover != "none":
-                            print(general.g_pathDict[general.g_cellMouseover])
-                            print(general.g_connectDict[general.g_cellMouseover])
-                            print("")
-
-                # Testing Winscreen
-                if event.button == 7:
-                    if general.g_testing_winscreen == 1:
-                        winscreenmenu()
-
-                # Slant change Win Check
-                if general.g_cellMouseover != "none":
-                    if general.g_slantDict[general.g_cellMouseover] != 0:
-                        wincheck()
-
-
-# Starts / Restarts the game
-def restart():
+# Starts / Restarts the game, or starts a new board if one is given
+def restart(state=None):
     global board
     global general
+    global startboard
+    if state is not None:
+        startboard = state
     general = General()
     board = Board()
     boardbuilder()
-    gameloop()
 
 
-restart()
+# Only when run as the game, so tools like benchmark.py can import it
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play Slants.")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print how long each stage of starting up took, up to the first frame, and quit")
+    args = parser.parse_args()
+    restart()
+    startupstage("board")
+    if args.profile_startup:
+        drawframe("none")
+        startupstage("first frame")
+        startupreport()
+        sys.exit()
+    gameloop()
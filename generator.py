@@ -0,0 +1,269 @@
+"""
+The board generator for Slants (part 3 in game.py's list).
+
+Boards only have one solution, and how hard they are depends on what it takes to prove that:
+    - 0 (easy): the solver's work queue rules alone (clue saturation, adjacent numbers, no loops)
+    - 1 (medium): the way out rule and one step trials as well (each slant a cell could have is tried with the work
+      queue rules, and one that breaks the board means it's the other one)
+
+There's no harder level that needs guessing. Once the numbers are cut down to the ones the board can't do without,
+the trials almost always fill it in anyway: about 1 board in 250, from 5x5 to 15x15. So a level like that would mostly
+be medium boards.
+
+How a board gets made:
+    1. Fill every cell with a random slant, never closing a loop
+    2. Work out every number from those slants, and put them on the board in a random order until the rules fill in
+       the whole board. This is cheap, since the solver just keeps going from where it was after each number
+    3. Take numbers back off in a random order, keeping each one the board can't do without
+
+Step 3 is where the time goes. Checking each number by solving the whole board again would mean solving it once per
+number. Instead, the numbers are split in two: the second half goes on the board and the first half is checked on
+top of it, then the second half comes back off and is checked on top of the first half's keepers. Each half is split
+the same way until it's one number, which is needed if the rest of the board can't be filled in without it. If the
+board can already be filled in at any point, every number in that part can go. The solver's trail takes each half
+back off, so most of the board is only worked out once for every level of splitting instead of once per number.
+
+Medium boards go through step 3 twice: once the way easy boards do, then again for the numbers that were kept, with
+every rule. If the second round can't take any number off, the work queue rules could still fill in the board, so it's
+thrown away and started over. Numbers are only put on with the work queue rules either way, and the other rules only
+run once the rest of the board is on, since they're slow.
+
+A few things:
+    - cells, lattice points, and slants are numbered the same way as in boardstate.py
+    - a board that the rules can't fill in even with every number is thrown away and started over
+    - small boards might not have a medium one. After retries boards that the work queue rules could still fill in,
+      the last one is used as it is, so a medium board that small can be an easy one
+    - BoardPool keeps boards made ahead of time in other processes, so New Game doesn't have to wait for one
+"""
+
+import multiprocessing
+import os
+import random
+import signal
+from multiprocessing.pool import ThreadPool
+
+from bitboard import BitBoard
+from boardstate import BoardState
+from loopcheck import LoopChecker
+from solver import Solver
+
+
+# Boards made before giving up on a medium one (see the top of this file)
+retries = 20
+
+
+# Returns a random full board of slants with no loops, or None if it ran into a cell where both slants make one
+def randomsolution(width, height, rng):
+    checker = LoopChecker(width, height)
+    for cell in rng.sample(range(0, width * height), width * height):
+        slant = rng.choice([1, 2])
+        a, b = checker.endpoints(cell, slant)
+        if checker.find(a) == checker.find(b):
+            slant = 3 - slant
+            a, b = checker.endpoints(cell, slant)
+            if checker.find(a) == checker.find(b):
+                return None
+        checker.addslant(cell, slant)
+    return checker.lc_slants
+
+
+# Returns the number on every lattice point for a full board of slants, counted a row of points at a time
+def cluesfor(width, height, slants):
+    full = BitBoard(width, height)
+    full.setslants(slants)
+    return list(full.touchcounts())
+
+
+# Puts numbers on the board and fills in what the work queue rules can. Returns 0 if the board broke
+def addclues(solver, points, values):
+    for point in points:
+        if not solver.addclue(point, values[point]):
+            return 0
+    return solver.propagate()
+
+
+# Takes numbers back off, along with every slant filled in since the trail was the given length
+def takeclues(solver, points, mark):
+    solver.undo(mark)
+    for point in points:
+        solver.takeclue(point)
+
+
+# Works out which of the points' numbers are needed, in order, and returns those
+# The solver has to hold what the rules fill in from every other number on the board
+def neededclues(solver, points, values, difficulty):
+    if 0 not in solver.s_slants:
+        return []
+
+    if len(points) == 1:
+        if difficulty == 0:
+            return points
+        mark = len(solver.s_checker.lc_trail)
+        filled = solver.settle() and solver.trialrule() and 0 not in solver.s_slants
+        solver.undo(mark)
+        if filled:
+            return []
+        return points
+
+    mark = len(solver.s_checker.lc_trail)
+    half = len(points) // 2
+    first = points[0:half]
+    second = points[half:]
+
+    addclues(solver, second, values)
+    keptfirst = neededclues(solver, first, values, difficulty)
+    takeclues(solver, second, mark)
+
+    addclues(solver, keptfirst, values)
+    keptsecond = neededclues(solver, second, values, difficulty)
+    takeclues(solver, keptfirst, mark)
+    return keptfirst + keptsecond
+
+
+# Makes a board with one solution, easy (0) or medium (1)
+# Returns [BoardState with the numbers, the solution]
+def generate(width, height, difficulty=0, seed=None):
+    if difficulty not in (0, 1):
+        raise ValueError("difficulty has to be 0 (easy) or 1 (medium), not " + str(difficulty))
+    rng = random.Random(seed)
+    tries = 0
+    while True:
+        solution = randomsolution(width, height, rng)
+        if solution is None:
+            continue
+        values = cluesfor(width, height, solution)
+
+        # Add numbers until the rules fill in the board
+        state = BoardState(width, height)
+        solver = Solver(state)
+        solver.s_checker.lc_trail = []
+        points = []
+        for point in rng.sample(range(0, len(values)), len(values)):
+            for cell, touch, across in solver.s_pointCells[point]:
+                if solver.s_slants[cell] == 0:
+                    points.append(point)
+                    addclues(solver, [point], values)
+                    break
+            if 0 not in solver.s_slants:
+                break
+        if 0 in solver.s_slants:
+            continue
+
+        # Take them back off, and keep the ones that are needed
+        # Medium boards start from the easy board's numbers, and have to take at least one more off. After retries
+        # boards that don't, the last one is used anyway
+        takeclues(solver, points, 0)
+        rng.shuffle(points)
+        kept = neededclues(solver, points, values, 0)
+        if difficulty:
+            tries += 1
+            rng.shuffle(kept)
+            fewer = neededclues(solver, kept, values, difficulty)
+            if len(fewer) == len(kept) and tries < retries:
+                continue
+            kept = fewer
+
+        board = BoardState(width, height)
+        for point in kept:
+            board.bs_clues[point] = values[point]
+        board.bs_cluePoints = sorted(kept)
+        return [board, solution]
+
+
+# Returns the board as the lines of a board.txt
+def boardlines(state):
+    pw = state.bs_pointWidth
+    lines = ["w=" + str(state.bs_width), "h=" + str(state.bs_height)]
+    for y in range(0, state.bs_height + 1):
+        row = ""
+        for x in range(0, pw):
+            clue = state.bs_clues[(y * pw) + x]
+            if clue == -1:
+                row += "x"
+            else:
+                row += str(clue)
+        lines.append(str(y).zfill(2) + "=" + row)
+    lines.append("!")
+    return lines
+
+
+# Runs first in every forked pool worker
+# A worker forked from the game has pygame's SIGTERM / SIGINT handlers, which only queue a quit event that nothing
+# reads, so terminate() would wait on it forever. Put the normal ones back
+def poolstart():
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+
+# Makes a board in a pool worker. Returns the lines of its board.txt
+def poolboard(width, height, difficulty):
+    return boardlines(generate(width, height, difficulty)[0])
+
+
+# Keeps a few boards of each size and difficulty ready, made in the background
+# The workers are forked processes, so the frame loop keeps its core. Where there's no fork (Windows), a new process
+# would run game.py again, so threads are used instead
+class BoardPool:
+    def __init__(self, keep=2, workers=0):
+        self.bp_keep = keep
+        if workers == 0:
+            workers = max(1, (os.cpu_count() or 2) - 1)
+        self.bp_workers = workers
+        self.bp_pool = None
+
+        # Boards being made and boards that are ready (as board.txt lines), by (width, height, difficulty)
+        self.bp_pending = {}
+        self.bp_ready = {}
+
+    # Starts the workers the first time a board is asked for
+    def startpool(self):
+        if self.bp_pool is None:
+            if "fork" in multiprocessing.get_all_start_methods():
+                self.bp_pool = multiprocessing.get_context("fork").Pool(self.bp_workers, poolstart)
+            else:
+                self.bp_pool = ThreadPool(self.bp_workers)
+
+    # Moves the boards that are done for a size and difficulty over to the ready ones
+    def collect(self, key):
+        if key not in self.bp_pending:
+            self.bp_pending[key] = []
+            self.bp_ready[key] = []
+        pending = self.bp_pending[key]
+        for job in [job for job in pending if job.ready()]:
+            pending.remove(job)
+            self.bp_ready[key].append(job.get())
+
+    # Starts making boards until there are enough of that size and difficulty, counting the ones being made
+    def warm(self, width, height, difficulty):
+        key = (width, height, difficulty)
+        self.collect(key)
+        while len(self.bp_ready[key]) + len(self.bp_pending[key]) < self.bp_keep:
+            self.startpool()
+            self.bp_pending[key].append(self.bp_pool.apply_async(poolboard, key))
+
+    # Returns 1 if a board of that size and difficulty can be taken without waiting
+    def isready(self, width, height, difficulty):
+        key = (width, height, difficulty)
+        self.collect(key)
+        return len(self.bp_ready[key]) > 0
+
+    # Returns the board.txt lines of a board of that size and difficulty, and starts making another one
+    # Waits for the oldest board being made if none are ready
+    def take(self, width, height, difficulty):
+        key = (width, height, difficulty)
+        self.collect(key)
+        if not self.bp_ready[key]:
+            if not self.bp_pending[key]:
+                self.warm(width, height, difficulty)
+            self.bp_ready[key].append(self.bp_pending[key].pop(0).get())
+        lines = self.bp_ready[key].pop(0)
+        self.warm(width, height, difficulty)
+        return lines
+
+    # Stops the workers, throwing away any boards being made
+    def close(self):
+        if self.bp_pool is not None:
+            self.bp_pool.terminate()
+            self.bp_pool = None
+        self.bp_pending = {}
+        self.bp_ready = {}
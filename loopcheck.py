@@ -0,0 +1,227 @@
+"""
+Loop detection for Slants.
+
+Every slant joins two lattice points (the corners where the board's lines cross). The lattice points are kept in a
+disjoint set, so a slant closes a loop exactly when both of its lattice points are already in the same set.
+
+Slants can also be taken back out (undo, redo, and cycling a cell through 0 -> 1 -> 2 -> 0). The disjoint set can't
+split a set, so removing a slant rebuilds only the group the slant was in. Every change only costs as much as the
+group of slants it touches, never the whole board.
+
+A few things:
+    - cells are numbered the same way as in game.py: x and y start at 1, from left and top
+    - lattice points are numbered the same way as the lines: x and y start at 0, from left and top
+    - internally a cell is stored as index (y - 1) * width + (x - 1)
+    - internally a lattice point is stored as index y * (width + 1) + x
+    - slants: 0 = no slant, 1 = slant top left to bottom right, 2 = slant top right to bottom left
+    - a cell is "looped" when its slant is part of a closed loop, which is the same as its slant not being a bridge
+      in the graph of lattice points
+    - groups are merged smaller into bigger, and each group keeps the list of its points, so whoever placed a slant
+      can look at just the points that changed group (lc_merged)
+    - the solver's search turns on the trail (lc_trail), which records every join so it can be taken back with
+      undo() in reverse order. Paths aren't halved while the trail is on, since that would point moved points past the
+      group they get split back into (merging by size still keeps the paths short)
+"""
+
+from boardstate import geometry
+
+
+# Holds the disjoint set of lattice points and the loop flag of every cell
+class LoopChecker:
+    def __init__(self, width, height):
+        self.lc_width = width
+        self.lc_height = height
+
+        points = (width + 1) * (height + 1)
+        self.lc_parent = list(range(points))
+        self.lc_members = [[p] for p in range(0, points)]
+        self.lc_merged = []
+
+        # None when off, otherwise a [cell, root of the smaller group] for every slant placed since it was turned on
+        self.lc_trail = None
+
+        self.lc_cellPoints, self.lc_pointCells = geometry(width, height)
+
+        # One entry per cell
+        self.lc_slants = bytearray(width * height)
+        self.lc_loops = bytearray(width * height)
+        self.lc_loopCount = 0  # Cells whose loop flag is set
+
+    # Returns the two lattice points joined by the slant in the given cell
+    def endpoints(self, cell, slant):
+        ul, ur, dl, dr = self.lc_cellPoints[cell]
+        if slant == 1:
+            return ul, dr
+        else:
+            return ur, dl
+
+    # Returns [cell, other point] for every slant that touches the lattice point
+    def edges(self, point):
+        slants = self.lc_slants
+        found = []
+        for cell, touch, across in self.lc_pointCells[point]:
+            if slants[cell] == touch:
+                found.append([cell, across])
+        return found
+
+    # Returns the root of the set holding the point, halving the path on the way up (unless the trail is on)
+    def find(self, point):
+        parent = self.lc_parent
+        if self.lc_trail is not None:
+            while parent[point] != point:
+                point = parent[point]
+            return point
+        while parent[point] != point:
+            parent[point] = parent[parent[point]]
+            point = parent[point]
+        return point
+
+    # Joins the sets of two points, moving the smaller group into the bigger one
+    # Returns 0 if they were already joined (a loop), 1 otherwise
+    def union(self, a, b):
+        a = self.find(a)
+        b = self.find(b)
+        if a == b:
+            self.lc_merged = []
+            return 0
+        if len(self.lc_members[a]) < len(self.lc_members[b]):
+            a, b = b, a
+        self.lc_parent[b] = a
+        small = self.lc_members[b]
+        self.lc_members[a].extend(small)
+        if self.lc_trail is None:
+            self.lc_members[b] = []
+        else:
+            # undo() needs to know how many points to give back
+            self.lc_trail.append([-1, b])
+        self.lc_merged = small
+        return 1
+
+    # Places a slant in an empty cell
+    # Returns the list of cells whose loop flag changed
+    def addslant(self, cell, slant):
+        self.lc_slants[cell] = slant
+        a, b = self.endpoints(cell, slant)
+        if self.union(a, b):
+            if self.lc_trail is not None:
+                self.lc_trail[-1][0] = cell
+            # Joining two separate groups can't make a loop
+            return []
+        return self.markloops(a)
+
+    # Takes the slant out of a cell
+    # Returns the list of cells whose loop flag changed
+    def removeslant(self, cell):
+        slant = self.lc_slants[cell]
+        a, b = self.endpoints(cell, slant)
+        self.lc_slants[cell] = 0
+        self.regroup([a, b])
+
+        # Taking out a slant that wasn't looped can't change any other loop
+        if not self.lc_loops[cell]:
+            return []
+        self.lc_loops[cell] = 0
+        self.lc_loopCount -= 1
+        changed = self.markloops(a)
+        changed.append(cell)
+        return changed
+
+    # Sets a cell to any slant (0, 1, or 2)
+    # A flip from one slant to the other is a removal followed by a placement
+    # Returns the list of cells whose loop flag changed
+    def setslant(self, cell, slant):
+        old = self.lc_slants[cell]
+        if old == slant:
+            return []
+        if old == 0:
+            return self.addslant(cell, slant)
+        if slant == 0:
+            return self.removeslant(cell)
+
+        # Loop flags are only 0 or 1, so a cell that changed twice is back where it started
+        changed = set(self.removeslant(cell))
+        changed.symmetric_difference_update(self.addslant(cell, slant))
+        return list(changed)
+
+    # Takes back every slant placed since the trail was the given length, newest first
+    # Only for slants that joined two groups, which is all the solver ever places
+    def undo(self, mark):
+        trail = self.lc_trail
+        parent = self.lc_parent
+        members = self.lc_members
+        while len(trail) > mark:
+            cell, small = trail.pop()
+            big = parent[small]
+            del members[big][len(members[big]) - len(members[small]):]
+            parent[small] = small
+            self.lc_slants[cell] = 0
+
+    # Rebuilds the disjoint set for the groups holding the given points
+    # Used after a slant is taken out, since the group it was in might have split in two
+    def regroup(self, starts):
+        parent = self.lc_parent
+        members = self.lc_members
+        seen = set(starts)
+        stack = list(starts)
+        while stack:
+            point = stack.pop()
+            parent[point] = point
+            members[point] = [point]
+            for cell, other in self.edges(point):
+                if other not in seen:
+                    seen.add(other)
+                    stack.append(other)
+
+        for point in seen:
+            for cell, other in self.edges(point):
+                if other > point:
+                    self.union(point, other)
+
+    # Sets the loop flag of every slant in the group holding the point
+    # A slant is looped if it isn't a bridge, which is found with an iterative Tarjan lowlink search
+    # Returns the list of cells whose loop flag changed
+    def markloops(self, start):
+        order = {start: 0}
+        low = {start: 0}
+        count = 1
+        groupcells = set()
+        bridges = set()
+
+        # Each stack entry is [point, cell used to reach it, edges left to look at]
+        stack = [[start, -1, self.edges(start)]]
+        while stack:
+            entry = stack[-1]
+            point = entry[0]
+            if entry[2]:
+                cell, other = entry[2].pop()
+                if cell == entry[1]:
+                    continue
+                groupcells.add(cell)
+                if other in order:
+                    if order[other] < low[point]:
+                        low[point] = order[other]
+                else:
+                    order[other] = count
+                    low[other] = count
+                    count += 1
+                    stack.append([other, cell, self.edges(other)])
+            else:
+                stack.pop()
+                if stack:
+                    parent = stack[-1][0]
+                    if low[point] < low[parent]:
+                        low[parent] = low[point]
+                    if low[point] > order[parent]:
+                        bridges.add(entry[1])
+
+        changed = []
+        for cell in groupcells:
+            if cell in bridges:
+                flag = 0
+            else:
+                flag = 1
+            if self.lc_loops[cell] != flag:
+                self.lc_loops[cell] = flag
+                self.lc_loopCount += flag * 2 - 1
+                changed.append(cell)
+        return changed
@@ -0,0 +1,301 @@
+"""
+Rates how hard a Slants board is, by solving it the way a person would: the simplest rules first, and harder ones
+only once those get stuck.
+
+    python rater.py boards.corpus more/*.txt -o grades.jsonl -j 8
+
+Every argument is a corpus file (see corpus.py), whose boards are all rated, or board files, folders and globs (the
+same as batchsolve.py). The boards are split between worker processes, and each one gets a line in the output as
+soon as it's rated.
+
+The techniques, from easiest to hardest:
+    - saturation: a number in the middle of the board with all the touches it needs, or all it can do without
+    - patterns: the same on the edges and corners, where numbers only have 2 or 1 cells around them, then numbers
+      next to each other (1-1, 3-3)
+    - loops: a slant that would close a loop, and groups that would be shut in (the way out rule)
+    - lookahead: trying both slants in a cell and keeping the one that doesn't break the board (solver.trialrule())
+    - guessing: the search, once even lookahead is stuck
+
+Each output line is a JSON object:
+    - path, width, height (and difficulty and id for a board from a corpus file)
+    - uses: how many slants each technique filled in, and for guessing how many guesses it took
+    - backtracks, depth: the search's dead ends, and the most guesses it had on the board at once
+    - level: the hardest technique it needed: 0 = no lookahead or guessing and 1 = lookahead, the same as generator.py's
+      easy and medium, or 2 = guessing, which the generator doesn't make (see the top of generator.py)
+    - score: how much work each cell took on average, with the weights in weights below. Each slant counts the weight
+      of the technique that filled it in (cells the search filled in count as lookahead), and each guess and dead
+      end count on top of that. Easy boards come out around 1.5, and it goes up from there
+    - solved: 1 if it was solved, 0 if it has no solution or the search gave up
+    - error: what went wrong, if the board couldn't be read
+
+A few things:
+    - the rater is a Solver that counts what each rule filled in, so it uses the same rules as the solver and the
+      generator
+    - its work queues are taken easiest first, so a technique only gets a slant once the easier ones are stuck:
+      numbers in the middle, then numbers on the edges, then numbers next to each other (once, since that only
+      depends on the numbers), then loops. The way out rule is only used once all of those are stuck, as in settle()
+    - the slants the lookahead and the search try and take back aren't counted, only what they keep
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from batchsolve import boardpaths
+from boardstate import readboard
+from corpus import CORPUSMAGIC, Corpus
+from solver import Solver
+
+techniques = ["saturation", "patterns", "loops", "lookahead", "guessing"]
+
+# Work for each slant a technique fills in, and for each guess and dead end
+weights = {"saturation": 1, "patterns": 2, "loops": 3, "lookahead": 6, "guess": 20, "backtrack": 10}
+
+
+# A Solver that counts how many slants each of its rules fills in
+class Rater(Solver):
+    def __init__(self, state):
+        Solver.__init__(self, state)
+        self.r_uses = dict((technique, 0) for technique in techniques)
+
+        # Off while slants get filled in that might be taken back (inside a lookahead or the search)
+        self.r_counting = 1
+
+        # Numbers on the edges and corners wait on a queue of their own, after the ones in the middle (s_pointQueue)
+        self.r_edgeQueue = []
+
+        # 1 until the numbers next to each other have been looked at
+        self.r_pairsLeft = 0
+
+    def queuepoint(self, point):
+        if len(self.s_pointCells[point]) == 4:
+            Solver.queuepoint(self, point)
+        elif self.s_clues[point] != -1 and not self.s_pointQueued[point]:
+            self.s_pointQueued[point] = 1
+            self.r_edgeQueue.append(point)
+
+    # Runs the work queues easiest first (see the top of this file). Returns 0 if the board broke
+    def propagate(self):
+        while True:
+            if self.s_pointQueue:
+                point = self.s_pointQueue.pop()
+                self.s_pointQueued[point] = 0
+                if not self.saturate(point):
+                    return 0
+            elif self.r_edgeQueue:
+                point = self.r_edgeQueue.pop()
+                self.s_pointQueued[point] = 0
+                if not self.saturate(point):
+                    return 0
+            elif self.r_pairsLeft:
+                self.r_pairsLeft = 0
+                if not self.pairrules():
+                    return 0
+            elif self.s_cellQueue:
+                cell = self.s_cellQueue.pop()
+                self.s_cellQueued[cell] = 0
+                if not self.loopforce(cell):
+                    return 0
+            else:
+                return 1
+
+    def undo(self, mark):
+        for point in self.r_edgeQueue:
+            self.s_pointQueued[point] = 0
+        self.r_edgeQueue = []
+        Solver.undo(self, mark)
+
+    # The numbers next to each other wait in propagate() until saturation is stuck, instead of going first
+    def run(self):
+        for point in self.s_cluePoints:
+            self.queuepoint(point)
+        self.r_pairsLeft = 1
+        return self.settle()
+
+    # Counts the slants filled in since there were placed of them toward the technique
+    def counted(self, technique, placed):
+        if self.r_counting:
+            self.r_uses[technique] += self.s_placed - placed
+
+    def saturate(self, point):
+        placed = self.s_placed
+        ok = Solver.saturate(self, point)
+        if len(self.s_pointCells[point]) == 4:
+            self.counted("saturation", placed)
+        else:
+            self.counted("patterns", placed)
+        return ok
+
+    def pairrule(self, point, other, rest, shared):
+        placed = self.s_placed
+        ok = Solver.pairrule(self, point, other, rest, shared)
+        self.counted("patterns", placed)
+        return ok
+
+    def loopforce(self, cell):
+        placed = self.s_placed
+        ok = Solver.loopforce(self, cell)
+        self.counted("loops", placed)
+        return ok
+
+    def edgerule(self):
+        placed = self.s_placed
+        ok = Solver.edgerule(self)
+        self.counted("loops", placed)
+        return ok
+
+    # Only what the trials force is counted, along with what the rules fill in from it. s_placed also counts the
+    # slants the trials took back, so the empty cells are counted instead
+    def trialrule(self):
+        empty = self.s_slants.count(0)
+        self.r_counting = 0
+        ok = Solver.trialrule(self)
+        self.r_counting = 1
+        self.r_uses["lookahead"] += empty - self.s_slants.count(0)
+        return ok
+
+
+# Rates a board. maxnodes caps the guesses (0 = no limit)
+# Returns the rating as a dict: uses, backtracks, depth, level, score, solved (see the top of this file)
+def rate(state, maxnodes=0):
+    rater = Rater(state)
+    ok = rater.run()
+    if ok and 0 in rater.s_slants:
+        ok = rater.trialrule()
+    searched = 0
+    if ok and 0 in rater.s_slants:
+        searched = rater.s_slants.count(0)
+        rater.r_counting = 0
+        rater.search(1, maxnodes)
+        rater.r_uses["guessing"] = rater.s_nodes
+        ok = len(rater.s_solutions) > 0
+
+    uses = rater.r_uses
+    level = 0
+    if uses["lookahead"]:
+        level = 1
+    if uses["guessing"]:
+        level = 2
+    work = searched * weights["lookahead"]
+    work += uses["guessing"] * weights["guess"] + rater.s_backtracks * weights["backtrack"]
+    for technique in ["saturation", "patterns", "loops", "lookahead"]:
+        work += uses[technique] * weights[technique]
+    return {"uses": uses,
+            "backtracks": rater.s_backtracks,
+            "depth": rater.s_depth,
+            "level": level,
+            "score": round(work / len(rater.s_slants), 2),
+            "solved": int(ok)}
+
+
+# The corpus files open in this process, by path
+corpora = {}
+
+
+# Rates one board. Returns its output line as a dict
+# job = [path, guess limit], or [path, guess limit, width, height, difficulty, id] for a board in a corpus file
+def ratejob(job):
+    path = job[0]
+    result = {"path": path}
+    try:
+        if len(job) == 2:
+            state = readboard(path)
+        else:
+            if path not in corpora:
+                corpora[path] = Corpus(path)
+            width, height, difficulty, boardid = job[2:]
+            result["difficulty"] = difficulty
+            result["id"] = boardid
+            state = corpora[path].board(width, height, difficulty, boardid)
+        result["width"] = state.bs_width
+        result["height"] = state.bs_height
+        start = time.perf_counter()
+        result.update(rate(state, job[1]))
+        result["seconds"] = time.perf_counter() - start
+    except Exception as error:
+        result["error"] = type(error).__name__ + ": " + str(error)
+    return result
+
+
+# Returns 1 if the file is a corpus file
+def iscorpus(path):
+    if not os.path.isfile(path):
+        return 0
+    corpusfile = open(path, "rb")
+    magic = corpusfile.read(len(CORPUSMAGIC))
+    corpusfile.close()
+    return int(magic == CORPUSMAGIC)
+
+
+# Returns a job for every board the arguments name: every board in each corpus file, and the board files
+def ratejobs(args, maxnodes=0):
+    jobs = []
+    others = []
+    for arg in args:
+        if iscorpus(arg):
+            corpus = Corpus(arg)
+            for width, height, difficulty in corpus.groups():
+                for boardid in range(0, corpus.count(width, height, difficulty)):
+                    jobs.append([arg, maxnodes, width, height, difficulty, boardid])
+            corpus.close()
+        else:
+            others.append(arg)
+    for path in boardpaths(others):
+        jobs.append([path, maxnodes])
+    return jobs
+
+
+# Rates every board and writes a line for each one to the output (a path, or "-" for stdout)
+# Returns how many boards there were of each level
+def ratefiles(jobs, outpath, workers=0):
+    if workers == 0:
+        workers = os.cpu_count() or 1
+
+    if outpath == "-":
+        out = sys.stdout
+    else:
+        out = open(outpath, "w")
+    levels = [0, 0, 0]
+    try:
+        if workers == 1:
+            results = map(ratejob, jobs)
+            pool = None
+        else:
+            pool = multiprocessing.Pool(workers)
+            results = pool.imap_unordered(ratejob, jobs, max(1, min(16, len(jobs) // (workers * 8))))
+        for result in results:
+            if "level" in result:
+                levels[result["level"]] += 1
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+        if pool is not None:
+            pool.close()
+            pool.join()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return levels
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Rate how hard Slants boards are.")
+    parser.add_argument("boards", nargs="+", help="corpus files, board files, folders of them, or globs")
+    parser.add_argument("-o", "--out", default="-", help="JSONL file to write (default: stdout)")
+    parser.add_argument("-j", "--workers", type=int, default=0, help="worker processes (default: one per core)")
+    parser.add_argument("--maxnodes", type=int, default=0, help="give up on a board after this many guesses")
+    args = parser.parse_args(argv)
+
+    jobs = ratejobs(args.boards, args.maxnodes)
+    start = time.perf_counter()
+    levels = ratefiles(jobs, args.out, args.workers)
+    print(str(len(jobs)) + " boards rated in " + str(round(time.perf_counter() - start, 2)) + " s: " +
+          str(levels[0]) + " easy, " + str(levels[1]) + " medium, " + str(levels[2]) + " need guessing",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
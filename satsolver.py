@@ -0,0 +1,425 @@
+"""
+A second AI for Slants: the board written out as a SAT problem (CNF), and a small CDCL SAT solver to solve it.
+
+The board as CNF:
+    - every cell is one variable (numbered cell + 1, the way DIMACS wants): true = slant 1, false = slant 2
+    - a number k with n cells around it is "exactly k of these n slants touch it". Since n is at most 4, that's
+      written out directly: every k + 1 of the touching slants can't all be there (at most k), and every n - k + 1
+      of them can't all be missing (at least k)
+    - loops aren't written out up front, since there are far too many of them. The board is solved without them,
+      and every loop in the answer gets a clause saying "at least one of these cells is the other slant". Then it's
+      solved again, keeping everything learned so far, until the answer has no loops
+
+The CDCL solver (conflict driven clause learning):
+    - two watched literals per clause, so a clause is only looked at when one of its two watched literals goes false
+    - every conflict is traced back to its first unique implication point, and the clause that caused it is learned
+    - it jumps back to the level where the learned clause becomes unit, instead of just the last decision
+    - variables in conflicts get more activity and the most active free variable is decided on next, each one going
+      the way it last went
+    - it starts over (keeping learned clauses) after a growing number of conflicts (the Luby series)
+
+A few things:
+    - cells, lattice points, and slants are numbered the same way as in boardstate.py
+    - literals are +var / -var, and internally literal l is stored at index 2 * var + (l < 0) in the watch lists
+    - dimacs() writes the clauses in the DIMACS format other SAT solvers read, so boards can be tried on them
+"""
+
+import sys
+
+from boardstate import readboard
+from loopcheck import LoopChecker
+
+
+# Holds one SAT problem and everything the CDCL search needs
+class CDCL:
+    def __init__(self, numvars):
+        self.cd_numVars = numvars
+        self.cd_ok = 1
+
+        # Clauses given to the solver, then learned ones, all in one list. The first two literals are watched
+        self.cd_clauses = []
+        self.cd_added = []
+        self.cd_watches = [[] for i in range(0, 2 * numvars + 2)]
+
+        # One entry per variable (0 isn't used): 1 = true, -1 = false, 0 = free
+        self.cd_value = [0] * (numvars + 1)
+        self.cd_level = [0] * (numvars + 1)
+        self.cd_reason = [-1] * (numvars + 1)
+        self.cd_activity = [0.0] * (numvars + 1)
+        self.cd_phase = [-1] * (numvars + 1)
+        self.cd_bump = 1.0
+
+        # Assigned literals in order, where each decision level starts, and how far propagation has got
+        self.cd_trail = []
+        self.cd_trailLim = []
+        self.cd_head = 0
+
+        # Stats
+        self.cd_decisions = 0
+        self.cd_conflicts = 0
+        self.cd_propagations = 0
+        self.cd_learned = 0
+
+    # Returns 1 if the literal is true, -1 if false, 0 if free
+    def litvalue(self, lit):
+        if lit > 0:
+            return self.cd_value[lit]
+        return -self.cd_value[-lit]
+
+    # Makes a literal true, with the clause that forced it (-1 for a decision)
+    def enqueue(self, lit, reason):
+        var = abs(lit)
+        if lit > 0:
+            self.cd_value[var] = 1
+        else:
+            self.cd_value[var] = -1
+        self.cd_level[var] = len(self.cd_trailLim)
+        self.cd_reason[var] = reason
+        self.cd_trail.append(lit)
+
+    # Adds a clause. Only between searches, when nothing but level 0 is assigned
+    def addclause(self, lits):
+        self.cd_added.append(list(lits))
+        if not self.cd_ok:
+            return
+        clause = []
+        for lit in lits:
+            value = self.litvalue(lit)
+            if value == 1 or -lit in clause:
+                return
+            if value == 0 and lit not in clause:
+                clause.append(lit)
+
+        if not clause:
+            self.cd_ok = 0
+        elif len(clause) == 1:
+            self.enqueue(clause[0], -1)
+            if self.propagate() != -1:
+                self.cd_ok = 0
+        else:
+            self.attach(clause)
+
+    # Stores a clause and watches its first two literals. Returns its index
+    def attach(self, clause):
+        index = len(self.cd_clauses)
+        self.cd_clauses.append(clause)
+        for lit in clause[0:2]:
+            self.cd_watches[2 * abs(lit) + (lit < 0)].append(index)
+        return index
+
+    # Unit propagation with the watch lists. Returns the index of a clause that went false, or -1
+    def propagate(self):
+        trail = self.cd_trail
+        clauses = self.cd_clauses
+        watches = self.cd_watches
+        value = self.cd_value
+        while self.cd_head < len(trail):
+            false = -trail[self.cd_head]
+            self.cd_head += 1
+            self.cd_propagations += 1
+            watching = watches[2 * abs(false) + (false < 0)]
+            keep = []
+            for i in range(0, len(watching)):
+                index = watching[i]
+                clause = clauses[index]
+                if clause[0] == false:
+                    clause[0] = clause[1]
+                    clause[1] = false
+
+                # Already true through the other watch
+                first = clause[0]
+                if (value[first] if first > 0 else -value[-first]) == 1:
+                    keep.append(index)
+                    continue
+
+                # Look for another literal to watch
+                moved = 0
+                for k in range(2, len(clause)):
+                    lit = clause[k]
+                    if (value[lit] if lit > 0 else -value[-lit]) != -1:
+                        clause[1] = lit
+                        clause[k] = false
+                        watches[2 * abs(lit) + (lit < 0)].append(index)
+                        moved = 1
+                        break
+                if moved:
+                    continue
+
+                keep.append(index)
+                if (value[first] if first > 0 else -value[-first]) == -1:
+                    keep.extend(watching[i + 1:])
+                    watches[2 * abs(false) + (false < 0)] = keep
+                    return index
+                self.enqueue(first, index)
+            watches[2 * abs(false) + (false < 0)] = keep
+        return -1
+
+    # Takes back every assignment above the given decision level
+    def backtrack(self, level):
+        if len(self.cd_trailLim) <= level:
+            return
+        start = self.cd_trailLim[level]
+        for lit in self.cd_trail[start:]:
+            var = abs(lit)
+            self.cd_phase[var] = self.cd_value[var]
+            self.cd_value[var] = 0
+            self.cd_reason[var] = -1
+        del self.cd_trail[start:]
+        del self.cd_trailLim[level:]
+        self.cd_head = len(self.cd_trail)
+
+    # Finds the clause to learn from a conflict (first unique implication point)
+    # Returns the clause, with the literal that becomes true first, and the level to jump back to
+    def analyze(self, conflict):
+        level = self.cd_level
+        current = len(self.cd_trailLim)
+        seen = set()
+        learned = [0]
+        pending = 0
+        lit = 0
+        i = len(self.cd_trail) - 1
+        index = conflict
+        while True:
+            clause = self.cd_clauses[index]
+            for other in clause:
+                var = abs(other)
+                if var in seen or level[var] == 0:
+                    continue
+                seen.add(var)
+                self.bumpvar(var)
+                if level[var] == current:
+                    pending += 1
+                else:
+                    learned.append(other)
+
+            # Walk back along the trail to the next variable from this conflict
+            while abs(self.cd_trail[i]) not in seen:
+                i -= 1
+            lit = self.cd_trail[i]
+            i -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            index = self.cd_reason[abs(lit)]
+        learned[0] = -lit
+
+        # The second watch has to be the literal from the highest level, so it's the one that goes free first
+        jump = 0
+        for k in range(1, len(learned)):
+            if level[abs(learned[k])] > jump:
+                jump = level[abs(learned[k])]
+                learned[1], learned[k] = learned[k], learned[1]
+        return learned, jump
+
+    # Makes a variable more likely to be decided on next. Later conflicts count for more
+    def bumpvar(self, var):
+        self.cd_activity[var] += self.cd_bump
+        if self.cd_activity[var] > 1e100:
+            for v in range(1, self.cd_numVars + 1):
+                self.cd_activity[v] *= 1e-100
+            self.cd_bump *= 1e-100
+
+    # Returns the free variable with the most activity, or 0 if they're all assigned
+    def pickvar(self):
+        best = 0
+        bestactivity = -1.0
+        value = self.cd_value
+        activity = self.cd_activity
+        for var in range(1, self.cd_numVars + 1):
+            if value[var] == 0 and activity[var] > bestactivity:
+                bestactivity = activity[var]
+                best = var
+        return best
+
+    # Searches for an assignment that makes every clause true
+    # maxconflicts stops it early (0 = no limit)
+    # Returns 1 if it found one (in cd_value), 0 if there isn't one, -1 if it gave up
+    def solve(self, maxconflicts=0):
+        if not self.cd_ok:
+            return 0
+        self.backtrack(0)
+        if self.propagate() != -1:
+            self.cd_ok = 0
+            return 0
+
+        restart = 1
+        untilrestart = luby(restart) * 100
+        conflicts = 0
+        while True:
+            conflict = self.propagate()
+            if conflict != -1:
+                self.cd_conflicts += 1
+                conflicts += 1
+                untilrestart -= 1
+                if not self.cd_trailLim:
+                    self.cd_ok = 0
+                    return 0
+                learned, jump = self.analyze(conflict)
+                self.backtrack(jump)
+                if len(learned) == 1:
+                    self.enqueue(learned[0], -1)
+                else:
+                    self.enqueue(learned[0], self.attach(learned))
+                    self.cd_learned += 1
+                self.cd_bump *= 1.05
+            else:
+                if maxconflicts and conflicts >= maxconflicts:
+                    self.backtrack(0)
+                    return -1
+                if untilrestart <= 0:
+                    restart += 1
+                    untilrestart = luby(restart) * 100
+                    self.backtrack(0)
+                    continue
+                var = self.pickvar()
+                if var == 0:
+                    return 1
+                self.cd_decisions += 1
+                self.cd_trailLim.append(len(self.cd_trail))
+                self.enqueue(var * self.cd_phase[var], -1)
+
+
+# Returns the i-th number (starting at 1) of the Luby series: 1 1 2 1 1 2 4 1 1 2 1 1 2 4 8 ...
+def luby(i):
+    i -= 1
+    size = 1
+    value = 1
+    while size < i + 1:
+        size = 2 * size + 1
+        value *= 2
+    while size - 1 != i:
+        size = (size - 1) // 2
+        value //= 2
+        i = i % size
+    return value
+
+
+# Returns the literal for a cell having the given slant
+def slantlit(cell, slant):
+    if slant == 1:
+        return cell + 1
+    return -(cell + 1)
+
+
+# Returns the clauses for the numbers on a board
+def encode(state):
+    clauses = []
+    for point in state.bs_cluePoints:
+        num = state.bs_clues[point]
+        touching = []
+        for cell, touch, across in state.bs_pointCells[point]:
+            touching.append(slantlit(cell, touch))
+
+        # A number more than the cells around it (or less than 0) can't be met, which is the empty clause
+        if num < 0 or num > len(touching):
+            clauses.append([])
+            continue
+
+        # At most num touch, and at least num touch
+        for combo in combinations(touching, num + 1):
+            clauses.append([-lit for lit in combo])
+        for combo in combinations(touching, len(touching) - num + 1):
+            clauses.append(list(combo))
+    return clauses
+
+
+# Returns every way to pick count items out of the list, in order
+def combinations(items, count):
+    if count == 0:
+        return [[]]
+    if count > len(items):
+        return []
+    found = []
+    for i in range(0, len(items)):
+        for rest in combinations(items[i + 1:], count - 1):
+            found.append([items[i]] + rest)
+    return found
+
+
+# Returns a clause for every loop in a full board of slants, each one saying a cell in the loop has to change
+# Slants are placed one at a time, and one that would close a loop is left out and traced back along the
+# slants already placed to find the loop it closes
+def loopcuts(width, height, slants):
+    checker = LoopChecker(width, height)
+    cuts = []
+    for cell in range(0, len(slants)):
+        a, b = checker.endpoints(cell, slants[cell])
+        if checker.find(a) != checker.find(b):
+            checker.addslant(cell, slants[cell])
+            continue
+
+        # Walk from one end to the other
+        came = {a: -1}
+        stack = [a]
+        while b not in came:
+            point = stack.pop()
+            for c, other in checker.edges(point):
+                if other not in came:
+                    came[other] = [c, point]
+                    stack.append(other)
+        cut = [slantlit(cell, 3 - slants[cell])]
+        point = b
+        while point != a:
+            c, point = came[point]
+            cut.append(slantlit(c, 3 - slants[c]))
+        cuts.append(cut)
+    return cuts
+
+
+# Solves a board with the CDCL solver, adding loop clauses until the answer has no loops
+# maxconflicts caps each round (0 = no limit)
+# Returns [slants or None if there's no answer (or it gave up), the CDCL with its stats and clauses]
+def solve(state, maxconflicts=0):
+    width = state.bs_width
+    height = state.bs_height
+    cdcl = CDCL(width * height)
+    for clause in encode(state):
+        cdcl.addclause(clause)
+
+    while True:
+        if cdcl.solve(maxconflicts) != 1:
+            return [None, cdcl]
+        slants = bytearray(width * height)
+        for cell in range(0, width * height):
+            if cdcl.cd_value[cell + 1] == 1:
+                slants[cell] = 1
+            else:
+                slants[cell] = 2
+
+        cuts = loopcuts(width, height, slants)
+        if not cuts:
+            return [slants, cdcl]
+        cdcl.backtrack(0)
+        for cut in cuts:
+            cdcl.addclause(cut)
+
+
+# Returns the clauses as DIMACS text
+def dimacs(numvars, clauses, comment=""):
+    lines = []
+    if comment:
+        lines.append("c " + comment)
+    lines.append("p cnf " + str(numvars) + " " + str(len(clauses)))
+    for clause in clauses:
+        lines.append(" ".join(str(lit) for lit in clause) + " 0")
+    return "\n".join(lines) + "\n"
+
+
+# python satsolver.py [board.txt] [out.cnf]
+# Solves the board, and writes its clauses (with every loop clause the solve needed) to out.cnf if given
+if __name__ == "__main__":
+    boardpath = "board.txt"
+    if len(sys.argv) > 1:
+        boardpath = sys.argv[1]
+    board = readboard(boardpath)
+    solution, sat = solve(board)
+    if solution is None:
+        print("No solution")
+    else:
+        print("Solved")
+    print(str(sat.cd_decisions) + " decisions, " + str(sat.cd_conflicts) + " conflicts, " +
+          str(sat.cd_learned) + " learned clauses, " + str(len(sat.cd_added)) + " clauses")
+    if len(sys.argv) > 2:
+        cnf = open(sys.argv[2], "w")
+        cnf.write(dimacs(sat.cd_numVars, sat.cd_added, boardpath))
+        cnf.close()
@@ -0,0 +1,564 @@
+"""
+The AI that solves Slants boards (part 2 in game.py's list).
+
+The solver works off the numbers in a BoardState and fills in its own copy of the slants. It starts with pre-coded
+rules, run until nothing else can be filled in:
+
+    - Clue saturation: once a number has as many touching slants as it needs, every other cell around it can't
+      touch it. Once it has as many non-touching slants as it can afford, every other cell around it has to touch it.
+      Numbers on the edges and corners only have 2 or 1 cells around them, which is where most boards start.
+    - Adjacent numbers: two numbers next to each other share two cells, and each slant in those cells touches
+      exactly one of the two numbers. So a 1 next to a 1 can't be touched by any of their other cells, and a 3 next
+      to a 3 has to be touched by all of their other cells.
+    - No loops: if one slant in a cell would join two lattice points that are already connected, the cell has to
+      be the other slant.
+    - Way out: with no loops, every group of connected lattice points reaches the edge of the board once the board
+      is filled (a group shut in on all sides would need a loop around it). So a group that can't reach the edge
+      through the empty cells anymore breaks the board, and a group in the middle with only one empty cell it can
+      still join through has to use it.
+
+Instead of rescanning the board, every placed slant puts the numbers on its corners and the empty cells that
+might now close a loop on a work queue, and only those get looked at again. The way out rule looks at the whole
+board, so it's only used once the queues are empty.
+
+When the rules get stuck, the solver guesses (brute force, part 2 in game.py's list):
+    - it picks the empty cell that was part of the most dead ends so far, or before there are any, an empty cell
+      next to the number closest to being decided
+    - after each guess the rules run again, and a broken board takes back everything back to the last guess with
+      the other slant left, using the loop checker's trail instead of copying the board
+    - a wrong guess early on can leave a dead end that only shows up much later, and going back one guess at a time
+      would never get back to it. So when it's only looking for one solution, the search starts over every so
+      often (a bit later each time), keeping the dead end counts (halved) so it starts with the cells that caused
+      trouble
+    - s_nodes counts guesses and s_backtracks counts dead ends, and maxnodes stops the search early so the game
+      doesn't hang on a board that's too hard
+
+A few things:
+    - cells, lattice points, and slants are numbered the same way as in boardstate.py, and the corner tables come
+      from there too
+    - groups of connected lattice points come from a LoopChecker, which merges the smaller group into the bigger one,
+      so the empty cells that might close a loop are found by only looking at the smaller group
+"""
+
+from boardstate import geometry
+from loopcheck import LoopChecker
+
+
+# Tables for the adjacent numbers rule for each board size
+paircache = {}
+
+
+# Returns, for every lattice point, [other point, cells around only one of the two (as [cell, slant that touches its
+# number]), cells they share] for each lattice point next to it
+def pairtable(width, height):
+    key = (width, height)
+    if key not in paircache:
+        pw = width + 1
+        pointcells = geometry(width, height)[1]
+        pairs = []
+        for point in range(0, len(pointcells)):
+            px = point % pw
+            py = point // pw
+            neighbours = []
+            if px > 0:
+                neighbours.append(point - 1)
+            if px < width:
+                neighbours.append(point + 1)
+            if py > 0:
+                neighbours.append(point - pw)
+            if py < height:
+                neighbours.append(point + pw)
+
+            pairs.append([])
+            for other in neighbours:
+                pointtouch = {}
+                for cell, touch, across in pointcells[point]:
+                    pointtouch[cell] = touch
+                othertouch = {}
+                for cell, touch, across in pointcells[other]:
+                    othertouch[cell] = touch
+                rest = []
+                for cell in pointtouch:
+                    if cell not in othertouch:
+                        rest.append([cell, pointtouch[cell]])
+                for cell in othertouch:
+                    if cell not in pointtouch:
+                        rest.append([cell, othertouch[cell]])
+                shared = (len(pointtouch) + len(othertouch) - len(rest)) // 2
+                pairs[point].append([other, rest, shared])
+        paircache[key] = pairs
+    return paircache[key]
+
+
+# Holds everything the rules need to solve one board
+class Solver:
+    def __init__(self, state):
+        self.s_width = state.bs_width
+        self.s_height = state.bs_height
+        self.s_clues = state.bs_clues
+        self.s_cluePoints = state.bs_cluePoints
+        self.s_cellPoints = state.bs_cellPoints
+        self.s_pointCells = state.bs_pointCells
+
+        points = len(self.s_pointCells)
+
+        # The loop checker holds the solver's slants and the groups of connected lattice points
+        self.s_checker = LoopChecker(self.s_width, self.s_height)
+        self.s_slants = self.s_checker.lc_slants
+        self.s_contradiction = 0
+
+        # Slants touching / not touching each point
+        self.s_touching = bytearray(points)
+        self.s_nottouching = bytearray(points)
+
+        # Work queues, with flags so nothing is queued twice
+        self.s_pointQueue = []
+        self.s_pointQueued = bytearray(points)
+        self.s_cellQueue = []
+        self.s_cellQueued = bytearray(self.s_width * self.s_height)
+
+        # Lattice points on the edge of the board
+        self.s_edgePoints = []
+        for point in range(0, points):
+            if len(self.s_pointCells[point]) < 4:
+                self.s_edgePoints.append(point)
+
+        # Search info: slants placed so far (to tell if a rule did anything), guesses, dead ends, the most guesses on
+        # the board at once, how often each cell was part of a dead end, and the solutions found
+        self.s_placed = 0
+        self.s_nodes = 0
+        self.s_backtracks = 0
+        self.s_depth = 0
+        self.s_weights = [0] * (self.s_width * self.s_height)
+        self.s_solutions = []
+        self.s_gaveUp = 0
+
+        # The way out rule looks at the whole board, so it can be turned off where guessing is cheaper
+        self.s_edgeRule = 1
+
+    # Queues a number to be checked again
+    def queuepoint(self, point):
+        if self.s_clues[point] != -1 and not self.s_pointQueued[point]:
+            self.s_pointQueued[point] = 1
+            self.s_pointQueue.append(point)
+
+    # Queues an empty cell to be checked for loops again
+    def queuecell(self, cell):
+        if not self.s_cellQueued[cell]:
+            self.s_cellQueued[cell] = 1
+            self.s_cellQueue.append(cell)
+
+    # Places a slant. Returns 0 if that breaks the board, 1 otherwise
+    def assign(self, cell, slant):
+        current = self.s_slants[cell]
+        if current != 0:
+            if current != slant:
+                self.s_contradiction = 1
+                return 0
+            return 1
+
+        # If both ends are already in the same group, this slant closes a loop
+        checker = self.s_checker
+        a, b = checker.endpoints(cell, slant)
+        if checker.find(a) == checker.find(b):
+            self.s_contradiction = 1
+            return 0
+        checker.addslant(cell, slant)
+        self.s_placed += 1
+
+        # Update the counts of the four corners
+        ul, ur, dl, dr = self.s_cellPoints[cell]
+        if slant == 1:
+            self.s_touching[ul] += 1
+            self.s_touching[dr] += 1
+            self.s_nottouching[ur] += 1
+            self.s_nottouching[dl] += 1
+        else:
+            self.s_touching[ur] += 1
+            self.s_touching[dl] += 1
+            self.s_nottouching[ul] += 1
+            self.s_nottouching[dr] += 1
+        self.queuepoint(ul)
+        self.queuepoint(ur)
+        self.queuepoint(dl)
+        self.queuepoint(dr)
+
+        # Any empty cell with one corner in the smaller group and the other in the bigger group can now close a loop
+        root = checker.find(a)
+        slants = self.s_slants
+        for point in checker.lc_merged:
+            for c, touch, across in self.s_pointCells[point]:
+                if slants[c] == 0 and checker.find(across) == root:
+                    self.queuecell(c)
+        return 1
+
+    # Clue saturation for the number at the point. Returns 0 if the number can't be solved anymore
+    def saturate(self, point):
+        num = self.s_clues[point]
+        around = self.s_pointCells[point]
+        touching = self.s_touching[point]
+        nottouching = self.s_nottouching[point]
+        if touching > num or nottouching > len(around) - num:
+            self.s_contradiction = 1
+            return 0
+        if touching + nottouching == len(around):
+            return 1
+
+        if touching == num:
+            # Everything else can't touch
+            for cell, touch, across in around:
+                if self.s_slants[cell] == 0:
+                    if not self.assign(cell, 3 - touch):
+                        return 0
+        elif nottouching == len(around) - num:
+            # Everything else has to touch
+            for cell, touch, across in around:
+                if self.s_slants[cell] == 0:
+                    if not self.assign(cell, touch):
+                        return 0
+        return 1
+
+    # No-loop forcing for an empty cell. Returns 0 if both slants would close a loop
+    def loopforce(self, cell):
+        if self.s_slants[cell] != 0:
+            return 1
+        find = self.s_checker.find
+        ul, ur, dl, dr = self.s_cellPoints[cell]
+        loop1 = find(ul) == find(dr)
+        loop2 = find(ur) == find(dl)
+        if loop1 and loop2:
+            self.s_contradiction = 1
+            return 0
+        if loop1:
+            return self.assign(cell, 2)
+        if loop2:
+            return self.assign(cell, 1)
+        return 1
+
+    # Adjacent numbers. These only depend on the numbers, so they're used once at the start.
+    # Two numbers next to each other share two cells (one on the edge), and each of those gives exactly 1 touch
+    # between them, so the rest of their cells give them (a + b - shared) touches. If that's 0 none of them touch
+    # (1-1 in the middle), and if that's every one of them they all touch (3-3 in the middle).
+    # Returns 0 if that breaks the board
+    def pairrules(self):
+        clues = self.s_clues
+        pairs = pairtable(self.s_width, self.s_height)
+        for point in self.s_cluePoints:
+            for other, rest, shared in pairs[point]:
+                if other > point and clues[other] != -1:
+                    if not self.pairrule(point, other, rest, shared):
+                        return 0
+        return 1
+
+    # Adjacent numbers for one pair. Returns 0 if that breaks the board
+    def pairrule(self, point, other, rest, shared):
+        needed = self.s_clues[point] + self.s_clues[other] - shared
+        if needed == 0:
+            for cell, touch in rest:
+                if not self.assign(cell, 3 - touch):
+                    return 0
+        elif needed == len(rest):
+            for cell, touch in rest:
+                if not self.assign(cell, touch):
+                    return 0
+        return 1
+
+    # Puts a number on the board in the middle of solving (the generator adds them one at a time)
+    # It goes on the work queue, and the adjacent numbers rule is used with its neighbours.
+    # Returns 0 if that breaks the board
+    def addclue(self, point, value):
+        self.s_clues[point] = value
+        self.s_cluePoints.append(point)
+        self.queuepoint(point)
+        for other, rest, shared in pairtable(self.s_width, self.s_height)[point]:
+            if self.s_clues[other] != -1:
+                if not self.pairrule(point, other, rest, shared):
+                    return 0
+        return 1
+
+    # Takes a number added with addclue() back off. Slants it filled in have to be taken back with undo()
+    def takeclue(self, point):
+        self.s_clues[point] = -1
+        self.s_cluePoints.remove(point)
+        if self.s_pointQueued[point]:
+            self.s_pointQueued[point] = 0
+            self.s_pointQueue.remove(point)
+
+    # Way out rule for every group. Returns 0 if a group can't reach the edge anymore
+    # Only groups next to an empty cell are looked at. One that isn't and doesn't touch the edge would need a loop
+    # around it, which the loop checker already stops
+    def edgerule(self):
+        find = self.s_checker.find
+        slants = self.s_slants
+        cellpoints = self.s_cellPoints
+
+        # Every group that could join another through an empty cell, as (cell, slant, other group)
+        links = {}
+        cell = slants.find(0)
+        while cell != -1:
+            ul, ur, dl, dr = cellpoints[cell]
+            for slant, a, b in ((1, find(ul), find(dr)), (2, find(ur), find(dl))):
+                if a != b:
+                    if a in links:
+                        links[a].append((cell, slant, b))
+                    else:
+                        links[a] = [(cell, slant, b)]
+                    if b in links:
+                        links[b].append((cell, slant, a))
+                    else:
+                        links[b] = [(cell, slant, a)]
+            cell = slants.find(0, cell + 1)
+
+        # Spread out from the groups on the edge
+        edgegroups = set()
+        for point in self.s_edgePoints:
+            edgegroups.add(find(point))
+        reached = set(edgegroups)
+        stack = [group for group in edgegroups if group in links]
+        while stack:
+            for cell, slant, other in links[stack.pop()]:
+                if other not in reached:
+                    reached.add(other)
+                    stack.append(other)
+
+        forced = []
+        for group in links:
+            if group not in reached:
+                self.s_contradiction = 1
+                return 0
+            if group not in edgegroups and len(links[group]) == 1:
+                forced.append(links[group][0])
+        for cell, slant, other in forced:
+            if not self.assign(cell, slant):
+                return 0
+        return 1
+
+    # Trial rule: tries both slants in each empty cell with the work queue rules, and if one of them breaks the board
+    # the cell has to be the other one. Goes over the board again until a pass fills in nothing, with the way out rule
+    # in between, since it looks at the whole board
+    # Only for a settled board. Returns 0 if the board broke
+    def trialrule(self):
+        checker = self.s_checker
+        nested = checker.lc_trail is not None
+        if not nested:
+            checker.lc_trail = []
+        ok = 1
+        forced = 1
+        while ok and forced:
+            forced = 0
+            cell = self.s_slants.find(0)
+            while ok and cell != -1:
+                for slant in [1, 2]:
+                    mark = len(checker.lc_trail)
+                    broke = not (self.assign(cell, slant) and self.propagate())
+                    self.undo(mark)
+                    if broke:
+                        forced = 1
+                        ok = self.assign(cell, 3 - slant) and self.propagate()
+                        break
+                cell = self.s_slants.find(0, cell + 1)
+            if ok and forced:
+                ok = self.settle()
+        if not nested:
+            checker.lc_trail = None
+        return ok
+
+    # Runs every rule until nothing else can be filled in. Returns 0 if the board broke
+    def settle(self):
+        while True:
+            if not self.propagate():
+                return 0
+            if not self.s_edgeRule:
+                return 1
+            placed = self.s_placed
+            if not self.edgerule():
+                return 0
+            if self.s_placed == placed:
+                return 1
+
+    # Runs the work queues until nothing else can be filled in. Returns 0 if the board broke
+    def propagate(self):
+        while self.s_pointQueue or self.s_cellQueue:
+            if self.s_pointQueue:
+                point = self.s_pointQueue.pop()
+                self.s_pointQueued[point] = 0
+                if not self.saturate(point):
+                    return 0
+            else:
+                cell = self.s_cellQueue.pop()
+                self.s_cellQueued[cell] = 0
+                if not self.loopforce(cell):
+                    return 0
+        return 1
+
+    # Uses every rule from a blank board. Returns 0 if the board can't be solved
+    def run(self):
+        for point in self.s_cluePoints:
+            self.queuepoint(point)
+        if not self.pairrules():
+            return 0
+        return self.settle()
+
+    # Takes back every slant placed since the loop checker's trail was the given length
+    def undo(self, mark):
+        checker = self.s_checker
+        trail = checker.lc_trail
+        for i in range(len(trail) - 1, mark - 1, -1):
+            cell = trail[i][0]
+            ul, ur, dl, dr = self.s_cellPoints[cell]
+            if self.s_slants[cell] == 1:
+                self.s_touching[ul] -= 1
+                self.s_touching[dr] -= 1
+                self.s_nottouching[ur] -= 1
+                self.s_nottouching[dl] -= 1
+            else:
+                self.s_touching[ur] -= 1
+                self.s_touching[dl] -= 1
+                self.s_nottouching[ul] -= 1
+                self.s_nottouching[dr] -= 1
+        checker.undo(mark)
+
+        # Whatever was left on the queues belonged to the dead end
+        for point in self.s_pointQueue:
+            self.s_pointQueued[point] = 0
+        for cell in self.s_cellQueue:
+            self.s_cellQueued[cell] = 0
+        self.s_pointQueue = []
+        self.s_cellQueue = []
+        self.s_contradiction = 0
+
+    # Picks the next cell to guess, or -1 if the board is filled
+    # Takes the empty cell that was part of the most dead ends. If none of them were, looks for the number with the
+    # fewest ways left to go either way and takes a cell around it
+    def choosecell(self):
+        slants = self.s_slants
+        weights = self.s_weights
+        best = -1
+        bestweight = 0
+        for cell in range(0, len(slants)):
+            if slants[cell] == 0 and weights[cell] > bestweight:
+                bestweight = weights[cell]
+                best = cell
+        if best != -1:
+            return best
+
+        bestpoint = -1
+        bestslack = 5
+        for point in self.s_cluePoints:
+            around = len(self.s_pointCells[point])
+            empty = around - self.s_touching[point] - self.s_nottouching[point]
+            if empty:
+                need = self.s_clues[point] - self.s_touching[point]
+                slack = min(need, empty - need)
+                if slack < bestslack:
+                    bestslack = slack
+                    bestpoint = point
+
+        if bestpoint != -1:
+            for cell, touch, across in self.s_pointCells[bestpoint]:
+                if slants[cell] == 0:
+                    return cell
+        if 0 in slants:
+            return slants.index(0)
+        return -1
+
+    # Picks which slant to try first: the one that touches the corner number that needs the most touches for
+    # the cells it has left
+    def chooseslant(self, cell):
+        best = 1
+        bestneed = -1
+        for point in self.s_cellPoints[cell]:
+            if self.s_clues[point] != -1:
+                around = len(self.s_pointCells[point])
+                empty = around - self.s_touching[point] - self.s_nottouching[point]
+                need = (self.s_clues[point] - self.s_touching[point]) / empty
+                for c, touch, across in self.s_pointCells[point]:
+                    if c == cell:
+                        if need > bestneed:
+                            bestneed = need
+                            best = touch
+                        if 1 - need > bestneed:
+                            bestneed = 1 - need
+                            best = 3 - touch
+        return best
+
+    # Guesses until the board is filled, after run() has filled in what it can
+    # Stops after maxsolutions solutions (0 = find them all) or maxnodes guesses (0 = no limit)
+    # Solutions go in s_solutions
+    # If the trail is already on (the generator), the search only takes back its own slants
+    def search(self, maxsolutions=1, maxnodes=0):
+        checker = self.s_checker
+        nested = checker.lc_trail is not None
+        if not nested:
+            checker.lc_trail = []
+        start = len(checker.lc_trail)
+
+        # One entry per guess: [trail length before it, cell, the other slant or 0 if both were tried]
+        guesses = []
+
+        # Dead ends until the next start over
+        restartgap = 300
+        restartat = self.s_backtracks + restartgap
+        while True:
+            cell = self.choosecell()
+            if cell == -1:
+                self.s_solutions.append(bytearray(self.s_slants))
+                if len(self.s_solutions) == maxsolutions:
+                    break
+                ok = 0
+            else:
+                if maxnodes and self.s_nodes == maxnodes:
+                    # Only keep what the rules know for sure
+                    self.s_gaveUp = 1
+                    self.undo(start)
+                    break
+                self.s_nodes += 1
+                slant = self.chooseslant(cell)
+                guesses.append([len(checker.lc_trail), cell, 3 - slant])
+                if len(guesses) > self.s_depth:
+                    self.s_depth = len(guesses)
+                ok = self.assign(cell, slant) and self.settle()
+
+            while not ok:
+                if cell != -1:
+                    self.s_backtracks += 1
+                    # Every cell filled in since the last guess was part of this dead end
+                    for i in range(guesses[-1][0], len(checker.lc_trail)):
+                        self.s_weights[checker.lc_trail[i][0]] += 1
+                    self.s_weights[guesses[-1][1]] += 1
+
+                    if maxsolutions == 1 and self.s_backtracks >= restartat:
+                        self.undo(start)
+                        guesses = []
+                        for c in range(0, len(self.s_weights)):
+                            self.s_weights[c] //= 2
+                        restartgap = restartgap * 3 // 2
+                        restartat = self.s_backtracks + restartgap
+                        break
+                while guesses and guesses[-1][2] == 0:
+                    self.undo(guesses.pop()[0])
+                if not guesses:
+                    self.undo(start)
+                    if not nested:
+                        checker.lc_trail = None
+                    return
+                mark, cell, slant = guesses[-1]
+                self.undo(mark)
+                guesses[-1][2] = 0
+                ok = self.assign(cell, slant) and self.settle()
+
+        # The last solution found stays on the board
+        if not nested:
+            checker.lc_trail = None
+
+
+# Solves the board, with the rules first and guesses when they get stuck
+# maxnodes caps the guesses (0 = no limit), and maxsolutions how many solutions to look for
+# Returns the Solver: s_solutions holds the solutions found, s_slants where the rules or the search stopped,
+# s_nodes / s_backtracks / s_depth how many guesses and dead ends it took and how deep it went, and s_gaveUp if it hit
+# maxnodes
+def solve(state, maxnodes=0, maxsolutions=1):
+    solver = Solver(state)
+    if solver.run():
+        solver.search(maxsolutions, maxnodes)
+    return solver
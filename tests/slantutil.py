@@ -0,0 +1,112 @@
+"""
+Brute-force helpers the tests check the fast code against.
+"""
+
+import itertools
+
+from boardstate import BoardState, geometry
+
+
+# Returns the lattice point groups of the slants, by walking every slant
+def groups(width, height, slants):
+    cellpoints = geometry(width, height)[0]
+    neighbours = [[] for p in range(0, (width + 1) * (height + 1))]
+    for cell in range(0, len(slants)):
+        ul, ur, dl, dr = cellpoints[cell]
+        if slants[cell] == 1:
+            neighbours[ul].append(dr)
+            neighbours[dr].append(ul)
+        elif slants[cell] == 2:
+            neighbours[ur].append(dl)
+            neighbours[dl].append(ur)
+
+    group = [-1] * len(neighbours)
+    for start in range(0, len(neighbours)):
+        if group[start] == -1:
+            group[start] = start
+            stack = [start]
+            while stack:
+                point = stack.pop()
+                for other in neighbours[point]:
+                    if group[other] == -1:
+                        group[other] = start
+                        stack.append(other)
+    return group
+
+
+# Returns the loop flag of every cell: a slant is looped if its ends are still joined without it
+def loopflags(width, height, slants):
+    cellpoints = geometry(width, height)[0]
+    flags = bytearray(len(slants))
+    for cell in range(0, len(slants)):
+        if slants[cell] != 0:
+            without = bytearray(slants)
+            without[cell] = 0
+            group = groups(width, height, without)
+            ul, ur, dl, dr = cellpoints[cell]
+            if slants[cell] == 1:
+                flags[cell] = group[ul] == group[dr]
+            else:
+                flags[cell] = group[ur] == group[dl]
+    return flags
+
+
+# Returns a random full board of slants with no loops
+def randomsolution(width, height, rng):
+    cellpoints = geometry(width, height)[0]
+    group = list(range(0, (width + 1) * (height + 1)))
+    slants = bytearray(width * height)
+    for cell in rng.sample(range(0, width * height), width * height):
+        ul, ur, dl, dr = cellpoints[cell]
+        slant = rng.choice([1, 2])
+        if slant == 1 and group[ul] == group[dr]:
+            slant = 2
+        elif slant == 2 and group[ur] == group[dl]:
+            slant = 1
+        if slant == 1:
+            a, b = group[ul], group[dr]
+        else:
+            a, b = group[ur], group[dl]
+        group = [a if g == b else g for g in group]
+        slants[cell] = slant
+    return slants
+
+
+# Returns a BoardState with the numbers of the solution, each kept with the given chance
+def cluesfor(width, height, solution, keep, rng):
+    full = BoardState(width, height)
+    full.bs_slants[:] = solution
+    rows = []
+    for y in range(0, height + 1):
+        row = ""
+        for x in range(0, width + 1):
+            if rng.random() < keep:
+                row += str(full.cluecounts((y * (width + 1)) + x)[0])
+            else:
+                row += "x"
+        rows.append(row)
+    state = BoardState(width, height)
+    state.setclues(rows)
+    return state
+
+
+# Returns 1 if the slants fill the board, solve every number, and have no loops
+def issolution(state, slants):
+    if 0 in slants:
+        return 0
+    check = BoardState(state.bs_width, state.bs_height)
+    check.bs_clues = state.bs_clues
+    check.bs_slants[:] = slants
+    for point in state.bs_cluePoints:
+        if check.cluestatus(point) != 1:
+            return 0
+    return 1 not in loopflags(state.bs_width, state.bs_height, slants)
+
+
+# Returns every solution of a (small) board
+def allsolutions(state):
+    found = []
+    for combo in itertools.product([1, 2], repeat=state.bs_width * state.bs_height):
+        if issolution(state, bytearray(combo)):
+            found.append(bytes(combo))
+    return found
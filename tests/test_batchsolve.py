@@ -0,0 +1,54 @@
+import json
+
+from batchsolve import boardpaths, main, solvefiles
+from generator import boardlines, generate
+from slantutil import issolution
+
+
+# Writes generated boards to the folder. Returns [their paths, their solutions]
+def writeboards(folder, count):
+    paths = []
+    solutions = []
+    for seed in range(0, count):
+        state, solution = generate(4 + seed % 3, 3 + seed % 2, seed % 2, seed)
+        path = folder / ("board" + str(seed).zfill(2) + ".txt")
+        path.write_text("\n".join(boardlines(state)))
+        paths.append(str(path))
+        solutions.append([state, solution])
+    return [paths, solutions]
+
+
+def test_board_paths(tmp_path):
+    paths, solutions = writeboards(tmp_path, 3)
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "notes.md").write_text("")
+    assert boardpaths([str(tmp_path)]) == paths
+    assert boardpaths([str(tmp_path / "*01.txt"), paths[1], paths[0]]) == [paths[1], paths[0]]
+
+
+def test_solves_every_board(tmp_path):
+    paths, solutions = writeboards(tmp_path, 12)
+    (tmp_path / "broken.txt").write_text("w=x\n")
+    for workers in [1, 3]:
+        out = tmp_path / ("out" + str(workers) + ".jsonl")
+        assert solvefiles(boardpaths([str(tmp_path / "*.txt")]), str(out), workers, 0, 1) == [12, 13]
+        results = {}
+        for line in out.read_text().splitlines():
+            result = json.loads(line)
+            results[result["path"]] = result
+        assert "error" in results[str(tmp_path / "broken.txt")]
+        for path, [state, solution] in zip(paths, solutions):
+            result = results[path]
+            assert result["solved"] == 1 and result["unique"] == 1 and result["seconds"] >= 0
+            slants = bytearray(int(c) for c in "".join(result["solution"]))
+            assert slants == solution and issolution(state, slants)
+
+
+def test_sat(tmp_path, capsys):
+    paths, solutions = writeboards(tmp_path, 3)
+    out = tmp_path / "out.jsonl"
+    assert main([str(tmp_path), "-o", str(out), "-j", "1", "--sat"]) == 0
+    for line in out.read_text().splitlines():
+        result = json.loads(line)
+        assert bytearray(int(c) for c in "".join(result["solution"])) == solutions[paths.index(result["path"])][1]
+    assert "3 of 3 boards solved" in capsys.readouterr().err
@@ -0,0 +1,47 @@
+import io
+import json
+import os
+import subprocess
+import sys
+
+from benchmark import benchmarks, runbenchmarks
+
+
+def test_runs_are_added_to_the_results_file(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+    for run in range(0, 2):
+        out = io.StringIO()
+        results = runbenchmarks(path, [4], ["loopcheck", "cluecheck", "wincheck", "solve"], 0.01, out)
+        assert [result["name"] for result in results] == ["loopcheck", "cluecheck", "wincheck", "solve"]
+        for result in results:
+            assert result["size"] == 4 and result["opsPerSec"] > 0 and result["calls"] > 0
+        if run == 1:
+            assert "%" in out.getvalue()
+
+    lines = open(path).read().splitlines()
+    assert len(lines) == 2
+    assert json.loads(lines[1])["results"][0]["name"] == "loopcheck"
+
+
+def test_every_benchmark_sets_up():
+    for name, bench in benchmarks:
+        if name in ["drawgame", "drawfull", "drawmenu"]:
+            continue
+        setup = bench(4)
+        if setup is not None:
+            func, ops = setup
+            func()
+            assert ops > 0
+
+
+# drawgame, drawfull and drawmenu start pygame and the game, which can't be undone, so they run in their own process
+# It's either drawn or skipped (no pygame, or no assets/ for the game to load), but never an error
+def test_drawgame(tmp_path):
+    here = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+    done = subprocess.run([sys.executable, os.path.join(here, "benchmark.py"), "-o", str(tmp_path / "results.jsonl"),
+                           "--only", "drawgame", "drawfull", "drawmenu", "--sizes", "4", "--mintime", "0.01"],
+                          cwd=here, env=env, timeout=120, capture_output=True, text=True)
+    assert done.returncode == 0, done.stderr
+    for name in ["drawgame", "drawfull", "drawmenu"]:
+        assert name in done.stdout
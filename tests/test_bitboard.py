@@ -0,0 +1,49 @@
+import random
+
+from bitboard import BitBoard, fromstate
+from slantutil import cluesfor, issolution, loopflags, randomsolution
+
+
+# Filled, part filled, looped and real solutions, against BoardState and checking them the slow way
+def test_matches_boardstate():
+    rng = random.Random(9)
+    for trial in range(0, 150):
+        width = rng.randint(1, 9)
+        height = rng.randint(1, 9)
+        state = cluesfor(width, height, randomsolution(width, height, rng), rng.choice([0.3, 1]), rng)
+        for board in range(0, 6):
+            if board < 4:
+                slants = bytearray(rng.choice([0, 1, 2, 1, 2]) for cell in range(0, width * height))
+            else:
+                slants = randomsolution(width, height, rng)
+            state.bs_slants[:] = slants
+            state.recount()
+            bits = fromstate(state)
+            assert bits.slants() == slants
+            assert list(bits.touchcounts()) == [state.cluecounts(p)[0] for p in range(0, len(state.bs_clues))]
+            for point in range(0, len(state.bs_clues)):
+                assert bits.cluecounts(point) == state.cluecounts(point)
+            assert bits.isfilled() == state.isfilled()
+            assert bits.allsolved() == state.allsolved()
+            assert bits.loopfree() == (not any(loopflags(width, height, slants)))
+            assert bits.issolution() == int(bool(issolution(state, slants)))
+
+
+def test_setslant():
+    board = BitBoard(3, 2)
+    slants = bytearray(6)
+    rng = random.Random(10)
+    for move in range(0, 50):
+        cell = rng.randrange(0, 6)
+        slants[cell] = rng.randrange(0, 3)
+        board.setslant(cell, slants[cell])
+        assert board.slants() == slants
+
+
+# A loop of four slants around one point, and the same board with it broken
+def test_loop():
+    board = BitBoard(2, 2)
+    board.setslants(bytes([2, 1, 1, 2]))
+    assert not board.loopfree()
+    board.setslant(3, 1)
+    assert board.loopfree()
@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from boardpack import boardoffsets, boards, convert, main, openboards, packboard, saveboards, unpackboard
+from boardstate import readboard
+from generator import boardlines, generate
+from slantutil import cluesfor, randomsolution
+
+
+def sameboard(a, b):
+    return (a.bs_width == b.bs_width and a.bs_height == b.bs_height and list(a.bs_clues) == list(b.bs_clues) and
+            a.bs_cluePoints == b.bs_cluePoints)
+
+
+# Boards from empty to full of numbers, in both encodings
+def test_pack_and_unpack():
+    rng = random.Random(4)
+    for trial in range(0, 200):
+        width = rng.randint(1, 40)
+        height = rng.randint(1, 40)
+        state = cluesfor(width, height, randomsolution(width, height, rng), rng.choice([0, 0.05, 0.3, 1]), rng)
+        for rle in [0, 1, None]:
+            packed = packboard(state, rle)
+            unpacked, end = unpackboard(b"junk" + packed, 4)
+            assert end == len(packed) + 4
+            assert sameboard(unpacked, state)
+
+
+def test_smaller_encoding_is_picked():
+    state, solution = generate(40, 40, 0, 1)
+    assert len(packboard(state)) == min(len(packboard(state, 0)), len(packboard(state, 1)))
+    assert len(packboard(state)) < len("\n".join(boardlines(state))) / 3
+
+
+def test_save_and_stream(tmp_path):
+    path = str(tmp_path / "boards.slants")
+    states = [generate(4 + seed % 5, 3 + seed % 4, 0, seed)[0] for seed in range(0, 30)]
+    assert saveboards(path, states) == 30
+    assert all(sameboard(a, b) for a, b in zip(boards(path), states))
+    assert len(list(boards(path))) == 30
+
+    mapped = openboards(path)
+    offsets = boardoffsets(mapped)
+    assert sameboard(unpackboard(mapped, offsets[17])[0], states[17])
+    mapped.close()
+
+
+def test_not_packed(tmp_path):
+    path = tmp_path / "board.txt"
+    path.write_text("w=1\nh=1\n00=xx\n01=xx\n!")
+    with pytest.raises(ValueError):
+        openboards(str(path))
+
+
+def test_convert(tmp_path):
+    paths = []
+    states = []
+    for seed in range(0, 5):
+        state = generate(5, 4, 0, seed)[0]
+        path = tmp_path / ("board" + str(seed) + ".txt")
+        path.write_bytes("\r\n".join(boardlines(state)).encode())
+        paths.append(str(path))
+        states.append(state)
+    assert convert(paths, str(tmp_path / "a.slants")) == 5
+    assert main([str(tmp_path), "-o", str(tmp_path / "b.slants"), "--plain"]) == 0
+    for name in ["a.slants", "b.slants"]:
+        assert all(sameboard(a, b) for a, b in zip(boards(str(tmp_path / name)), states))
+
+    # A packed file reads like a board.txt, as its first board
+    assert sameboard(readboard(str(tmp_path / "a.slants")), states[0])
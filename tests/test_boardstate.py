@@ -0,0 +1,120 @@
+import random
+
+from boardstate import BoardState, parseboard, readboard
+
+
+# The rules solvednumbertest() used before the board state existed, written out the long way
+def oldstatus(state, x, y):
+    w = state.bs_width
+    h = state.bs_height
+    slants = state.bs_slants
+    num = state.bs_clues[(y * (w + 1)) + x]
+    touching = 0
+    nottouching = 0
+    empty = 0
+    around = []
+    if x > 0 and y > 0:
+        around.append([slants[((y - 1) * w) + x - 1], 1])
+    if x < w and y > 0:
+        around.append([slants[((y - 1) * w) + x], 2])
+    if x > 0 and y < h:
+        around.append([slants[(y * w) + x - 1], 2])
+    if x < w and y < h:
+        around.append([slants[(y * w) + x], 1])
+    for slant, touch in around:
+        if slant == 0:
+            empty += 1
+        elif slant == touch:
+            touching += 1
+        else:
+            nottouching += 1
+    if empty:
+        if touching > num or nottouching > 4 - num:
+            return 2
+        return 0
+    if touching == num:
+        return 1
+    return 2
+
+
+def test_setclues_reads_board_rows():
+    state = BoardState(3, 2)
+    state.setclues(["x1xx", "2xx0", "xxx3"])
+    assert list(state.bs_clues) == [-1, 1, -1, -1, 2, -1, -1, 0, -1, -1, -1, 3]
+    assert state.bs_cluePoints == [1, 4, 7, 11]
+
+
+def test_cellpoints_and_coordinates():
+    state = BoardState(4, 3)
+    assert state.cellpoints(0) == (0, 1, 5, 6)
+    assert state.cellpoints(11) == (13, 14, 18, 19)
+    assert state.cellxy(6) == (3, 2)
+    assert state.pointxy(13) == (3, 2)
+
+
+def test_updatestatus_matches_old_rules():
+    rng = random.Random(7)
+    for trial in range(0, 50):
+        width = rng.randint(1, 8)
+        height = rng.randint(1, 8)
+        rows = []
+        for y in range(0, height + 1):
+            rows.append("".join(rng.choice("x01234") for x in range(0, width + 1)))
+        state = BoardState(width, height)
+        state.setclues(rows)
+        for move in range(0, 100):
+            cell = rng.randrange(0, width * height)
+            state.bs_slants[cell] = rng.randrange(0, 3)
+            state.updatestatus(cell)
+            for point in state.bs_cluePoints:
+                x, y = state.pointxy(point)
+                assert state.bs_status[point] == oldstatus(state, x, y)
+            assert state.bs_empty == state.bs_slants.count(0)
+            assert state.bs_unsolved == len([p for p in state.bs_cluePoints if state.bs_status[p] != 1])
+            for point in range(0, len(state.bs_clues)):
+                assert [state.bs_touching[point], state.bs_notTouching[point]] == list(state.cluecounts(point)[0:2])
+
+
+def test_filled_and_solved():
+    state = BoardState(1, 1)
+    state.setclues(["1x", "x1"])
+    assert not state.isfilled()
+    state.bs_slants[0] = 1
+    state.updatestatus(0)
+    assert state.isfilled()
+    assert state.allsolved()
+    state.bs_slants[0] = 2
+    state.updatestatus(0)
+    assert not state.allsolved()
+
+
+# Slants copied in all at once are counted by recount()
+def test_recount():
+    state = BoardState(2, 2)
+    state.setclues(["1x1", "x4x", "1x1"])
+    state.bs_slants[:] = bytes([1, 2, 2, 1])
+    assert not state.isfilled()
+    state.recount()
+    assert state.isfilled()
+    assert state.allsolved()
+    assert list(state.bs_touching) == [1, 0, 1, 0, 4, 0, 1, 0, 1]
+    state.bs_slants[0] = 0
+    state.updatestatus(0)
+    assert state.bs_empty == 1 and state.bs_unsolved == 2
+
+
+def test_readboard(tmp_path):
+    path = tmp_path / "board.txt"
+    path.write_bytes(b"w=2\r\nh=1\r\n00=x1x\r\n01=2xx\r\n!")
+    state = readboard(str(path))
+    assert state.bs_width == 2
+    assert state.bs_height == 1
+    assert state.bs_cluePoints == [1, 3]
+    assert list(state.bs_clues) == [-1, 1, -1, 2, -1, -1]
+
+
+# No "!" at the end, and rows in any order
+def test_parseboard():
+    state = parseboard(["w=2", "h=1", "01=2xx", "00=x1x", ""])
+    assert state.bs_cluePoints == [1, 3]
+    assert list(state.bs_clues) == [-1, 1, -1, 2, -1, -1]
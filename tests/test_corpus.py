@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from boardpack import packboard
+from corpus import Corpus, main, writecorpus
+from generator import generate
+
+
+def sameboard(a, b):
+    return (a.bs_width == b.bs_width and a.bs_height == b.bs_height and list(a.bs_clues) == list(b.bs_clues) and
+            a.bs_cluePoints == b.bs_cluePoints)
+
+
+# Boards of a few sizes and difficulties written in a mixed up order, and every one read back by its id
+def test_write_and_read(tmp_path):
+    path = str(tmp_path / "boards.corpus")
+    rng = random.Random(5)
+    boards = []
+    for seed in range(0, 40):
+        width = rng.choice([3, 4, 6])
+        difficulty = rng.choice([0, 1])
+        boards.append([difficulty, generate(width, 4, difficulty, seed)[0]])
+    # Packed and not packed boards can be mixed
+    assert writecorpus(path, [[d, packboard(b) if i % 2 else b] for i, (d, b) in enumerate(boards)]) == 40
+
+    corpus = Corpus(path)
+    ids = {}
+    for difficulty, state in boards:
+        key = (state.bs_width, state.bs_height, difficulty)
+        ids[key] = ids.get(key, -1) + 1
+        assert sameboard(corpus.board(key[0], key[1], difficulty, ids[key]), state)
+    assert corpus.groups() == sorted(ids)
+    for key in ids:
+        assert corpus.count(*key) == ids[key] + 1
+        assert corpus.board(key[0], key[1], key[2], ids[key] + 1) is None
+    assert len(list(corpus.entries())) == 40
+    corpus.close()
+
+
+def test_missing_group(tmp_path):
+    path = str(tmp_path / "boards.corpus")
+    writecorpus(path, [[1, generate(5, 5, 1, 1)[0]]])
+    corpus = Corpus(path)
+    assert corpus.count(5, 5, 0) == 0
+    assert corpus.randomboard(5, 5, 0) is None
+    assert corpus.board(5, 5, 1, -1) is None
+    assert corpus.randomboard(5, 5, 1).bs_width == 5
+    corpus.close()
+
+
+def test_not_a_corpus(tmp_path):
+    path = tmp_path / "board.txt"
+    path.write_text("w=1\nh=1\n00=xx\n01=xx\n!" + " " * 40)
+    with pytest.raises(ValueError):
+        Corpus(str(path))
+
+
+def test_build(tmp_path):
+    path = str(tmp_path / "boards.corpus")
+    assert main(["build", "-o", path, "--sizes", "4x4", "5x3", "--difficulties", "0", "1", "--count", "2",
+                 "-j", "1"]) == 0
+    corpus = Corpus(path)
+    assert corpus.groups() == [(4, 4, 0), (4, 4, 1), (5, 3, 0), (5, 3, 1)]
+    assert sameboard(corpus.board(5, 3, 1, 1), generate(5, 3, 1, 7)[0])
+    corpus.close()
+    assert main(["info", path]) == 0
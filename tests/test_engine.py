@@ -0,0 +1,110 @@
+import os
+import random
+import subprocess
+import sys
+
+from engine import Engine, Journal, loadgame
+from generator import boardlines, generate
+from slantutil import issolution, loopflags
+
+
+# The engine's idea of the board after every move, against checking the whole board from scratch
+def test_moves_match_full_checks():
+    rng = random.Random(3)
+    for trial in range(0, 20):
+        state, solution = generate(rng.randint(2, 6), rng.randint(2, 6), 0, trial)
+        game = Engine(state)
+        for move in range(0, 60):
+            cell = rng.randrange(0, len(state.bs_slants))
+            if rng.random() < 0.5:
+                game.turn(cell, rng.choice(["left", "right"]))
+            else:
+                game.setslant(cell, solution[cell])
+            for point in state.bs_cluePoints:
+                assert state.bs_status[point] == state.cluestatus(point)
+            assert bytes(game.e_loopChecker.lc_loops) == bytes(loopflags(state.bs_width, state.bs_height,
+                                                                          state.bs_slants))
+            assert game.iswon() == issolution(state, state.bs_slants)
+            assert game.e_loopChecker.lc_loopCount == sum(game.e_loopChecker.lc_loops)
+            assert state.bs_empty == state.bs_slants.count(0)
+            assert state.bs_unsolved == len([p for p in state.bs_cluePoints if state.bs_status[p] != 1])
+
+
+def test_turn():
+    state, solution = generate(3, 3, 0, 1)
+    game = Engine(state)
+    assert [game.turn(0, "left") for i in range(0, 3)] == [1, 2, 0]
+    assert [game.turn(0, "right") for i in range(0, 3)] == [2, 1, 0]
+
+
+def test_win(tmp_path):
+    state, solution = generate(5, 4, 1, 2)
+    path = tmp_path / "board.txt"
+    path.write_text("\n".join(boardlines(state)))
+    game = loadgame(str(path))
+    for cell in range(0, len(solution)):
+        assert not game.iswon()
+        game.setslant(cell, solution[cell])
+    assert game.iswon()
+
+
+# Undo and redo against the whole board as it was after every move
+def test_undo_redo():
+    rng = random.Random(6)
+    state, solution = generate(5, 5, 0, 6)
+    game = Engine(state)
+    history = [bytes(state.bs_slants)]
+    at = 0
+    for step in range(0, 2000):
+        choice = rng.random()
+        if choice < 0.5:
+            game.turn(rng.randrange(0, 25), rng.choice(["left", "right"]))
+            history = history[:at + 1] + [bytes(state.bs_slants)]
+            at += 1
+        elif choice < 0.75:
+            assert (game.undo() == -1) == (at == 0)
+            at = max(0, at - 1)
+        else:
+            assert (game.redo() == -1) == (at == len(history) - 1)
+            at = min(len(history) - 1, at + 1)
+        assert bytes(state.bs_slants) == history[at]
+        for point in state.bs_cluePoints:
+            assert state.bs_status[point] == state.cluestatus(point)
+
+
+# Past the limit, the oldest moves are forgotten and the rest still undo in order
+def test_undo_limit():
+    state, solution = generate(4, 4, 0, 7)
+    game = Engine(state, 5)
+    for cell in range(0, 16):
+        game.move(cell, solution[cell])
+    moves, done = game.e_journal.moves()
+    assert [move[0] for move in moves] == [11, 12, 13, 14, 15] and done == 5
+    assert len(game.e_journal.j_cells) == 5
+    assert [game.undo() for i in range(0, 6)] == [15, 14, 13, 12, 11, -1]
+    assert list(state.bs_slants[11:]) == [0] * 5
+    assert game.redo() == 11
+    game.move(0, 0)
+    assert game.redo() == -1
+    assert game.e_journal.moves() == [[[11, 0, solution[11]], [0, solution[0], 0]], 2]
+
+
+def test_no_undo():
+    journal = Journal(0)
+    journal.record(3, 0, 1)
+    assert journal.undo() is None and journal.redo() is None
+
+
+# Slants the board already has are counted when the engine starts
+def test_starts_from_slants():
+    state, solution = generate(4, 4, 0, 4)
+    state.bs_slants[:] = solution
+    assert Engine(state).iswon()
+
+
+# Nothing about the engine needs pygame
+def test_no_pygame():
+    here = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = "import sys, engine; print('pygame' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=here, timeout=60, capture_output=True, text=True)
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,93 @@
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+
+from boardstate import BoardState
+from generator import BoardPool, boardlines, generate
+from solver import Solver, solve
+from slantutil import allsolutions, issolution
+
+
+# Small boards have one solution, the one the generator made them from
+def test_boards_have_one_solution():
+    rng = random.Random(9)
+    for trial in range(0, 60):
+        width = rng.randint(1, 4)
+        height = rng.randint(1, 3)
+        state, solution = generate(width, height, trial % 2, rng.random())
+        assert allsolutions(state) == [bytes(solution)]
+
+
+# Easy boards are filled in by the work queue rules and medium ones by every rule, but not the work queue rules alone
+def test_difficulty():
+    for difficulty in [0, 1]:
+        for seed in range(0, 4):
+            state, solution = generate(7, 6, difficulty, seed)
+            assert solve(state, maxsolutions=2).s_solutions == [solution]
+
+            solver = Solver(state)
+            for point in state.bs_cluePoints:
+                solver.queuepoint(point)
+            assert solver.pairrules() and solver.propagate()
+            if difficulty == 0:
+                assert solver.s_slants == solution
+                continue
+            assert 0 in solver.s_slants
+            assert solver.settle() and solver.trialrule() and solver.s_slants == solution
+    with pytest.raises(ValueError):
+        generate(7, 6, 2, 0)
+
+
+def test_big_board():
+    state, solution = generate(40, 40, 0, 1)
+    assert issolution(state, solution)
+    assert Solver(state).run()
+
+
+def test_board_lines():
+    state, solution = generate(3, 2, 0, 2)
+    lines = boardlines(state)
+    assert lines[0:2] == ["w=3", "h=2"]
+    assert lines[-1] == "!"
+    assert len(lines) == 6
+    loaded = BoardState(3, 2)
+    loaded.setclues([line[3:] for line in lines[2:-1]])
+    assert loaded.bs_clues == state.bs_clues
+
+
+def test_board_pool():
+    pool = BoardPool(2, 1)
+    pool.warm(5, 4, 1)
+    assert len(pool.bp_pending[(5, 4, 1)]) == 2
+    for trial in range(0, 3):
+        lines = pool.take(5, 4, 1)
+        assert lines[0:2] == ["w=5", "h=4"]
+        state = BoardState(5, 4)
+        state.setclues([line[3:] for line in lines[2:-1]])
+        assert len(solve(state, maxsolutions=2).s_solutions) == 1
+        assert len(pool.bp_ready[(5, 4, 1)]) + len(pool.bp_pending[(5, 4, 1)]) == 2
+    pool.close()
+    assert pool.bp_pool is None
+
+
+# The game starts pygame before the pool forks its workers, and closing the pool (or quitting) mustn't hang after that
+# In its own process, since pygame can't be shut down again once started
+def test_board_pool_after_pygame():
+    pytest.importorskip("pygame")
+    script = """
+import pygame
+pygame.init()
+pygame.display.set_mode([100, 100])
+import generator
+pool = generator.BoardPool(1, 1)
+pool.take(4, 4, 0)
+pool.close()
+pool.take(4, 4, 0)
+"""
+    here = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+    done = subprocess.run([sys.executable, "-c", script], cwd=here, env=env, timeout=60, capture_output=True)
+    assert done.returncode == 0, done.stderr
@@ -0,0 +1,73 @@
+import random
+
+from loopcheck import LoopChecker
+from slantutil import groups, loopflags
+
+
+# Only placing slants in empty cells, which only ever joins groups
+def test_addslant_loop_flags():
+    rng = random.Random(1)
+    for trial in range(0, 200):
+        width = rng.randint(1, 6)
+        height = rng.randint(1, 6)
+        checker = LoopChecker(width, height)
+        for cell in rng.sample(range(0, width * height), width * height):
+            before = bytes(checker.lc_loops)
+            changed = checker.addslant(cell, rng.choice([1, 2]))
+            expected = loopflags(width, height, checker.lc_slants)
+            assert bytes(checker.lc_loops) == bytes(expected)
+            assert sorted(changed) == [c for c in range(0, width * height) if before[c] != expected[c]]
+
+
+def test_addslant_groups():
+    rng = random.Random(2)
+    for trial in range(0, 200):
+        width = rng.randint(1, 6)
+        height = rng.randint(1, 6)
+        checker = LoopChecker(width, height)
+        for cell in rng.sample(range(0, width * height), width * height):
+            checker.addslant(cell, rng.choice([1, 2]))
+        group = groups(width, height, checker.lc_slants)
+        for a in range(0, len(group)):
+            for b in range(0, len(group)):
+                assert (checker.find(a) == checker.find(b)) == (group[a] == group[b])
+
+
+def test_small_loop():
+    # A diamond of four slants around the middle point of a 2x2 board
+    checker = LoopChecker(2, 2)
+    assert checker.addslant(0, 2) == []
+    assert checker.addslant(1, 1) == []
+    assert checker.addslant(2, 1) == []
+    assert sorted(checker.addslant(3, 2)) == [0, 1, 2, 3]
+
+
+# Placing, taking out, and flipping slants in any order
+def test_setslant_loop_flags():
+    rng = random.Random(5)
+    for trial in range(0, 300):
+        width = rng.randint(1, 6)
+        height = rng.randint(1, 6)
+        checker = LoopChecker(width, height)
+        for move in range(0, 60):
+            cell = rng.randrange(0, width * height)
+            before = bytes(checker.lc_loops)
+            changed = checker.setslant(cell, rng.randrange(0, 3))
+            expected = loopflags(width, height, checker.lc_slants)
+            assert bytes(checker.lc_loops) == bytes(expected)
+            assert sorted(changed) == [c for c in range(0, width * height) if before[c] != expected[c]]
+
+
+def test_setslant_groups():
+    rng = random.Random(6)
+    for trial in range(0, 200):
+        width = rng.randint(1, 6)
+        height = rng.randint(1, 6)
+        checker = LoopChecker(width, height)
+        for move in range(0, 60):
+            checker.setslant(rng.randrange(0, width * height), rng.randrange(0, 3))
+            group = groups(width, height, checker.lc_slants)
+            for a in range(0, len(group)):
+                b = rng.randrange(0, len(group))
+                assert (checker.find(a) == checker.find(b)) == (group[a] == group[b])
+                assert a in checker.lc_members[checker.find(a)]
@@ -0,0 +1,62 @@
+import json
+
+from boardstate import BoardState
+from corpus import writecorpus
+from generator import boardlines, generate
+from rater import main, rate, ratejobs, techniques
+
+
+# Boards the rules fill in: every cell is counted toward exactly one technique, and the level is the difficulty
+def test_rule_boards():
+    for difficulty in [0, 1]:
+        for seed in range(0, 4):
+            state, solution = generate(7, 6, difficulty, seed)
+            rating = rate(state)
+            assert rating["solved"] == 1
+            assert sum(rating["uses"][technique] for technique in techniques) == 42
+            assert rating["uses"]["guessing"] == 0 and rating["depth"] == 0
+            assert rating["level"] == difficulty == int(rating["uses"]["lookahead"] > 0)
+            assert rating["score"] >= 1
+
+
+# The 4 fills in every cell by saturation, so the 4-0 pairs next to it aren't counted even though they'd do the same
+def test_easiest_first():
+    state = BoardState(2, 2)
+    state.setclues(["x0x", "x4x", "x0x"])
+    rating = rate(state)
+    assert rating["solved"] == 1 and rating["level"] == 0
+    assert rating["uses"]["saturation"] == 4 and rating["uses"]["patterns"] == 0
+
+
+# With no numbers at all, nothing but guessing fills the board in
+def test_guessing():
+    rating = rate(BoardState(4, 4))
+    assert rating["solved"] == 1 and rating["level"] == 2
+    assert rating["uses"]["guessing"] > 0 and rating["depth"] > 0
+    assert rating["score"] > rate(generate(4, 4, 0, 1)[0])["score"]
+
+
+def test_no_solution():
+    # The corner 1 needs the slant that touches the 0
+    state = BoardState(2, 2)
+    state.setclues(["1xx", "x0x", "xxx"])
+    assert rate(state)["solved"] == 0
+
+
+# A corpus file and board files rated together across workers
+def test_batch(tmp_path):
+    path = str(tmp_path / "boards.corpus")
+    writecorpus(path, [[seed % 2, generate(5, 5, seed % 2, seed)[0]] for seed in range(0, 6)])
+    (tmp_path / "boards").mkdir()
+    for seed in range(0, 3):
+        state = generate(4, 4, 0, seed)[0]
+        (tmp_path / "boards" / ("board" + str(seed) + ".txt")).write_text("\n".join(boardlines(state)))
+    assert len(ratejobs([path, str(tmp_path / "boards")])) == 9
+
+    out = tmp_path / "grades.jsonl"
+    assert main([path, str(tmp_path / "boards"), "-o", str(out), "-j", "2"]) == 0
+    results = [json.loads(line) for line in out.read_text().splitlines()]
+    assert len(results) == 9
+    assert sorted([result["difficulty"], result["id"]] for result in results if "id" in result) == [
+        [0, 0], [0, 1], [0, 2], [1, 0], [1, 1], [1, 2]]
+    assert all(result["solved"] == 1 and "score" in result for result in results)
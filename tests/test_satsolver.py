@@ -0,0 +1,80 @@
+import itertools
+import random
+
+from boardstate import BoardState
+from satsolver import CDCL, dimacs, loopcuts, luby, solve
+from slantutil import allsolutions, cluesfor, issolution, loopflags, randomsolution
+
+
+# Returns 1 if some assignment makes every clause true, trying all of them
+def satisfiable(numvars, clauses):
+    for combo in itertools.product([1, -1], repeat=numvars):
+        if all(any(combo[abs(lit) - 1] * lit > 0 for lit in clause) for clause in clauses):
+            return 1
+    return 0
+
+
+def test_cdcl_matches_brute_force():
+    rng = random.Random(7)
+    for trial in range(0, 300):
+        numvars = rng.randint(1, 8)
+        clauses = []
+        for c in range(0, rng.randint(1, 40)):
+            clauses.append([rng.choice([1, -1]) * rng.randint(1, numvars) for k in range(0, rng.randint(1, 3))])
+        cdcl = CDCL(numvars)
+        for clause in clauses:
+            cdcl.addclause(clause)
+        result = cdcl.solve()
+        assert result == satisfiable(numvars, clauses)
+        if result:
+            for clause in clauses:
+                assert any(cdcl.litvalue(lit) == 1 for lit in clause)
+
+
+def test_solves_boards():
+    rng = random.Random(8)
+    for trial in range(0, 200):
+        width = rng.randint(1, 4)
+        height = rng.randint(1, 3)
+        state = cluesfor(width, height, randomsolution(width, height, rng), rng.random(), rng)
+        solutions = allsolutions(state)
+        slants, sat = solve(state)
+        assert bytes(slants) in solutions
+
+    for size in [10, 25]:
+        state = cluesfor(size, size, randomsolution(size, size, rng), 0.5, rng)
+        slants, sat = solve(state)
+        assert issolution(state, slants)
+
+
+def test_impossible_board():
+    state = BoardState(2, 2)
+    state.setclues(["xxx", "x0x", "xxx"])
+    slants, sat = solve(state)
+    assert slants is None
+
+    # A 3 in a corner has only one cell around it
+    state = BoardState(2, 2)
+    state.setclues(["3xx", "xxx", "xxx"])
+    slants, sat = solve(state)
+    assert slants is None
+
+
+# Every loop clause is false for the board it came from, and only names looped cells
+def test_loopcuts():
+    rng = random.Random(9)
+    for trial in range(0, 100):
+        slants = bytearray(rng.choice([1, 2]) for cell in range(0, 20))
+        flags = loopflags(5, 4, slants)
+        cuts = loopcuts(5, 4, slants)
+        assert (len(cuts) > 0) == any(flags)
+        for cut in cuts:
+            for lit in cut:
+                cell = abs(lit) - 1
+                assert flags[cell]
+                assert (lit > 0) == (slants[cell] == 2)
+
+
+def test_luby_and_dimacs():
+    assert [luby(i) for i in range(1, 16)] == [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8]
+    assert dimacs(3, [[1, -2], [3]], "board") == "c board\np cnf 3 2\n1 -2 0\n3 0\n"
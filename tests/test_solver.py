@@ -0,0 +1,74 @@
+import random
+
+from solver import Solver, solve
+from slantutil import allsolutions, cluesfor, issolution, randomsolution
+
+
+# Every slant the rules fill in has to be the same in every solution of the board
+def test_rules_only_make_sound_deductions():
+    rng = random.Random(3)
+    for trial in range(0, 300):
+        width = rng.randint(1, 4)
+        height = rng.randint(1, 3)
+        state = cluesfor(width, height, randomsolution(width, height, rng), rng.random(), rng)
+        solutions = allsolutions(state)
+        solver = Solver(state)
+        assert solver.run() and solver.trialrule()
+        assert solver.s_checker.lc_trail is None
+        for cell in range(0, width * height):
+            if solver.s_slants[cell] != 0:
+                for solution in solutions:
+                    assert solution[cell] == solver.s_slants[cell]
+
+
+def test_board_with_every_number_is_solved():
+    rng = random.Random(4)
+    for trial in range(0, 20):
+        solution = randomsolution(12, 9, rng)
+        state = cluesfor(12, 9, solution, 1.0, rng)
+        solver = solve(state)
+        assert solver.s_nodes == 0
+        assert issolution(state, solver.s_solutions[0])
+
+
+def test_impossible_board():
+    # A 0 in the middle of a 2x2 board can only be kept by closing a diamond around it
+    from boardstate import BoardState
+    state = BoardState(2, 2)
+    state.setclues(["xxx", "x0x", "xxx"])
+    assert solve(state).s_solutions == []
+
+
+# The search finds every solution, each one once
+def test_search_finds_every_solution():
+    rng = random.Random(5)
+    for trial in range(0, 200):
+        width = rng.randint(1, 4)
+        height = rng.randint(1, 3)
+        state = cluesfor(width, height, randomsolution(width, height, rng), rng.random() * 0.6, rng)
+        expected = sorted(bytes(solution) for solution in allsolutions(state))
+        found = sorted(bytes(solution) for solution in solve(state, maxsolutions=0).s_solutions)
+        assert found == expected
+
+
+def test_search_solves_big_boards():
+    rng = random.Random(3)
+    for keep in [0.6, 0.5]:
+        state = cluesfor(40, 40, randomsolution(40, 40, rng), keep, rng)
+        solver = solve(state)
+        assert len(solver.s_solutions) == 1
+        assert issolution(state, solver.s_solutions[0])
+        assert solver.s_slants == solver.s_solutions[0]
+
+
+# Hitting the guess limit leaves only what the rules found
+def test_search_gives_up():
+    rng = random.Random(6)
+    state = cluesfor(30, 30, randomsolution(30, 30, rng), 0.3, rng)
+    rules = Solver(state)
+    rules.run()
+    solver = solve(state, maxnodes=5)
+    assert solver.s_gaveUp
+    assert solver.s_nodes == 5
+    assert solver.s_solutions == []
+    assert solver.s_slants == rules.s_slants
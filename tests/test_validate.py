@@ -0,0 +1,92 @@
+import json
+import random
+
+import pytest
+
+import validate as validatemodule
+from batchsolve import solvefiles
+from generator import boardlines, generate
+from slantutil import cluesfor, issolution, loopflags, randomsolution
+from validate import checkfile, checksolutions, cluegrid, loopfree, slantgrid, touchcounts, validate
+
+numpy = validatemodule.numpy
+
+# Every test but the last needs numpy, which is optional
+needsnumpy = pytest.mark.skipif(numpy is None, reason="numpy isn't installed")
+
+
+# Filled, part filled, looped and real solutions, against checking them one at a time
+@needsnumpy
+def test_matches_issolution():
+    rng = random.Random(8)
+    for trial in range(0, 100):
+        width = rng.randint(1, 7)
+        height = rng.randint(1, 7)
+        state = cluesfor(width, height, randomsolution(width, height, rng), rng.choice([0.3, 1]), rng)
+        solutions = [bytearray(rng.choice([0, 1, 2, 1, 2]) for cell in range(0, width * height))
+                     for i in range(0, 20)]
+        solutions += [randomsolution(width, height, rng) for i in range(0, 5)]
+        assert checksolutions(state, solutions) == [int(bool(issolution(state, s))) for s in solutions]
+        assert list(loopfree(slantgrid(width, height, solutions))) == [not any(loopflags(width, height, s))
+                                                                       for s in solutions]
+
+
+@needsnumpy
+def test_touchcounts():
+    state, solution = generate(6, 5, 0, 3)
+    counts = touchcounts(slantgrid(6, 5, solution))
+    state.bs_slants[:] = solution
+    assert [int(count) for count in counts.ravel()] == [state.cluecounts(p)[0] for p in range(0, 42)]
+    assert ((cluegrid(state) == -1) | (counts == cluegrid(state))).all()
+
+
+# A stack of boards with their own numbers
+@needsnumpy
+def test_stack():
+    boards = [generate(4, 4, 0, seed) for seed in range(0, 6)]
+    clues = numpy.stack([cluegrid(state) for state, solution in boards])
+    slants = slantgrid(4, 4, [solution for state, solution in boards])
+    assert loopfree(slants).all()
+    assert checksolutions(boards[0][0], [boards[1][1]]) == [int(boards[0][1] == boards[1][1])]
+    assert validate(clues, slants).all()
+    assert not validate(clues[::-1], slants)[0]
+
+
+@needsnumpy
+def test_checkfile(tmp_path):
+    paths = []
+    for seed in range(0, 6):
+        path = tmp_path / ("board" + str(seed) + ".txt")
+        path.write_text("\n".join(boardlines(generate(4 + seed % 2, 4, 0, seed)[0])))
+        paths.append(str(path))
+    out = tmp_path / "solved.jsonl"
+    solvefiles(paths, str(out), 1)
+    assert checkfile(str(out)) == []
+
+    # One solution with every slant turned the other way is wrong, since each board has only one solution
+    lines = out.read_text().splitlines()
+    result = json.loads(lines[2])
+    result["solution"] = [row.translate(str.maketrans("12", "21")) for row in result["solution"]]
+    lines[2] = json.dumps(result)
+    out.write_text("\n".join(lines) + "\n")
+    assert len(checkfile(str(out))) == 1
+
+
+# Without numpy, the boards are checked one at a time with a BitBoard
+def test_without_numpy(tmp_path, monkeypatch):
+    monkeypatch.setattr(validatemodule, "numpy", None)
+    state, solution = generate(5, 4, 0, 2)
+    wrong = bytearray(solution)
+    wrong[0] = 3 - wrong[0]
+    valid = checksolutions(state, [solution, wrong])
+    assert valid == [1, 0] and all(type(ok) is int for ok in valid)
+
+    path = tmp_path / "board.txt"
+    path.write_text("\n".join(boardlines(state)))
+    out = tmp_path / "solved.jsonl"
+    solvefiles([str(path)], str(out), 1)
+    assert checkfile(str(out)) == []
+    result = json.loads(out.read_text())
+    result["solution"] = [row.translate(str.maketrans("12", "21")) for row in result["solution"]]
+    out.write_text(json.dumps(result) + "\n")
+    assert len(checkfile(str(out))) == 1
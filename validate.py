@@ -0,0 +1,199 @@
+"""
+Checks whole boards of slants at once with NumPy, for checking a lot of solutions in one go (grading, corpus checks,
+the output of batchsolve.py).
+
+    python validate.py solved.jsonl
+
+checks every solution in a batchsolve.py output file against its board, and prints the ones that are wrong.
+
+A few things:
+    - numbers are a grid of (height + 1) x (width + 1) lattice points, -1 where there's no number; slants are a grid of
+      height x width cells (see cluegrid() and slantgrid())
+    - every function takes a stack of boards of the same size (a leading batch axis) as well as a single board, and
+      one grid of numbers can be checked against a whole stack of slants
+    - a solution is valid when every cell has a slant, every number has that many slants touching it, and there are
+      no loops
+    - slants: 0 = no slant, 1 = slant top left to bottom right, 2 = slant top right to bottom left
+    - numpy is only needed here, so nothing else in Slants needs it installed. Without it, checksolutions() and
+      checkfile() check the boards one at a time with bitboard.py instead
+"""
+
+import argparse
+import json
+import sys
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from bitboard import fromstate
+from boardstate import readboard
+
+
+# Raises ImportError if numpy isn't installed
+def neednumpy():
+    if numpy is None:
+        raise ImportError("validate.py needs numpy (pip install numpy)")
+
+
+# Returns the numbers of a BoardState as a (height + 1) x (width + 1) grid
+def cluegrid(state):
+    neednumpy()
+    return numpy.frombuffer(state.bs_clues, dtype=numpy.int8).reshape(state.bs_height + 1, state.bs_width + 1)
+
+
+# Returns slants (a bytearray / bytes in cell order, or a list of them) as a height x width grid, or a stack of them
+def slantgrid(width, height, slants):
+    neednumpy()
+    if isinstance(slants, (bytes, bytearray)):
+        return numpy.frombuffer(bytes(slants), dtype=numpy.uint8).reshape(height, width)
+    return numpy.frombuffer(b"".join(bytes(board) for board in slants), dtype=numpy.uint8).reshape(-1, height, width)
+
+
+# Returns how many slants touch each lattice point, for every board in the stack
+# Slant 1 touches the up left and down right corners of its cell, slant 2 the other two, so each kind is added to the
+# point grid shifted to each of its corners
+def touchcounts(slants):
+    neednumpy()
+    slants = numpy.asarray(slants)
+    down = (slants == 1).astype(numpy.int8)
+    up = (slants == 2).astype(numpy.int8)
+    counts = numpy.zeros(slants.shape[:-2] + (slants.shape[-2] + 1, slants.shape[-1] + 1), dtype=numpy.int8)
+    counts[..., :-1, :-1] += down
+    counts[..., 1:, 1:] += down
+    counts[..., :-1, 1:] += up
+    counts[..., 1:, :-1] += up
+    return counts
+
+
+# Returns the lattice point group of every point, for every board in the stack, as the lowest point in the group
+# Each pass hooks the group of one end of every slant onto the lower group of the two, then follows every point's
+# label to the end of its chain, so it takes a few passes rather than one per point in the longest path
+def pointgroups(slants):
+    neednumpy()
+    slants = numpy.asarray(slants)
+    height, width = slants.shape[-2:]
+    flat = slants.reshape(-1, height * width)
+    boards = flat.shape[0]
+    points = (width + 1) * (height + 1)
+
+    # The two ends of the slant in every cell, with both ends the same point where there's no slant
+    cells = numpy.arange(0, height * width)
+    ul = cells + cells // width
+    ur = ul + 1
+    dl = ul + width + 1
+    dr = dl + 1
+    a = numpy.where(flat == 1, ul, numpy.where(flat == 2, ur, ul))
+    b = numpy.where(flat == 1, dr, numpy.where(flat == 2, dl, ul))
+
+    # Every board's points numbered after the last board's, so the whole stack is one graph
+    offsets = (numpy.arange(0, boards) * points)[:, None]
+    a = (a + offsets).ravel()
+    b = (b + offsets).ravel()
+    labels = numpy.arange(0, boards * points)
+    while True:
+        la = labels[a]
+        lb = labels[b]
+        if numpy.array_equal(la, lb):
+            break
+        low = numpy.minimum(la, lb)
+        numpy.minimum.at(labels, la, low)
+        numpy.minimum.at(labels, lb, low)
+        while True:
+            jumped = labels[labels]
+            if numpy.array_equal(jumped, labels):
+                break
+            labels = jumped
+    return (labels.reshape(boards, points) - offsets).reshape(slants.shape[:-2] + (points,))
+
+
+# Returns True for every board in the stack with no loops
+# The slants are the edges of a graph on the lattice points, which has no loops exactly when it's a forest: when
+# it has as many groups as points minus slants
+def loopfree(slants):
+    neednumpy()
+    slants = numpy.asarray(slants)
+    groups = pointgroups(slants)
+    points = groups.shape[-1]
+    count = (groups == numpy.arange(0, points)).sum(axis=-1)
+    edges = (slants != 0).sum(axis=(-2, -1))
+    return count == points - edges
+
+
+# Returns True for every board in the stack whose numbers all have the right number of slants touching them
+def cluesmet(clues, slants):
+    neednumpy()
+    clues = numpy.asarray(clues)
+    met = (clues == -1) | (touchcounts(slants) == clues)
+    return met.all(axis=(-2, -1))
+
+
+# Returns True for every board in the stack that's a solution: filled in, every number met, and no loops
+def validate(clues, slants):
+    neednumpy()
+    slants = numpy.asarray(slants)
+    filled = (slants != 0).all(axis=(-2, -1))
+    return filled & cluesmet(clues, slants) & loopfree(slants)
+
+
+# Checks a list of solutions (bytearrays in cell order) for a BoardState. Returns 1 or 0 for each one
+def checksolutions(state, solutions):
+    if not solutions:
+        return []
+    if numpy is None:
+        board = fromstate(state)
+        valid = []
+        for solution in solutions:
+            board.setslants(solution)
+            valid.append(int(board.issolution()))
+        return valid
+    valid = validate(cluegrid(state), slantgrid(state.bs_width, state.bs_height, solutions))
+    return [int(ok) for ok in valid]
+
+
+# Checks every solution in a batchsolve.py output file. Returns the output lines whose solution is wrong
+# The solutions are checked a board size at a time, all the boards of a size in one stack
+def checkfile(path):
+    sizes = {}
+    results = open(path)
+    for line in results:
+        result = json.loads(line)
+        if "solution" in result:
+            key = (result["width"], result["height"])
+            if key not in sizes:
+                sizes[key] = []
+            sizes[key].append(result)
+    results.close()
+
+    wrong = []
+    for (width, height), found in sizes.items():
+        if numpy is None:
+            for result in found:
+                solution = bytes(int(slant) for slant in "".join(result["solution"]))
+                if not checksolutions(readboard(result["path"]), [solution])[0]:
+                    wrong.append(result)
+            continue
+        clues = numpy.stack([cluegrid(readboard(result["path"])) for result in found])
+        slants = slantgrid(width, height, [bytes(int(slant) for slant in "".join(result["solution"]))
+                                           for result in found])
+        for result, ok in zip(found, validate(clues, slants)):
+            if not ok:
+                wrong.append(result)
+    return wrong
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Check the solutions in a batchsolve.py output file.")
+    parser.add_argument("results", help="JSONL file written by batchsolve.py")
+    args = parser.parse_args(argv)
+
+    wrong = checkfile(args.results)
+    for result in wrong:
+        print(result["path"])
+    print(str(len(wrong)) + " wrong solutions", file=sys.stderr)
+    return int(len(wrong) > 0)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))